@@ -3,7 +3,7 @@ FastAPI-based API for AI Service
 Exposes ML endpoints for classification, summarization, and clustering
 """
 from typing import List, Optional
-from fastapi import FastAPI, HTTPException, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, status, File, UploadFile, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from loguru import logger
@@ -17,7 +17,18 @@ from ai_service.pipelines.cluster import ClusteringPipeline
 from ai_service.pipelines.verification import VerificationPipeline
 from ai_service.pipelines.fact_check import FactCheckPipeline
 from ai_service.pipelines.processor import UnifiedProcessor
-from ai_service.utils import setup_logging
+from ai_service.pipelines.online_cluster import online_clusterer
+from ai_service.pipelines.cluster_model import cluster_model
+from ai_service.pipelines.triage import triage_pipeline
+from ai_service.utils import setup_logging, model_caches
+from ai_service.utils.verdict_store import verdict_store
+from ai_service.utils.vector_index import corpus_registry
+from ai_service.utils.model_residency import model_residency
+from ai_service.utils.job_queue import JobQueue, JobWorkerPool
+from ai_service.utils.micro_batcher import micro_batchers, run_grouped, QueueFullError
+from ai_service.utils.inference_executor import inference_executor
+from ai_service.utils.deadline import Deadline
+from ai_service.utils.result_cache import result_caches
 import asyncio
 import json
 
@@ -48,7 +59,14 @@ clustering_pipeline = None
 verification_pipeline = None
 factcheck_pipeline = None
 unified_processor = None
+job_queue = JobQueue(path=os.getenv("AI_JOB_DB", "ai_service/data/jobs.sqlite3"))
+job_workers = None
 REALTIME_DATA_FILE = "ai_service/data/realtime_news.json"
+# Micro-batching per model: concurrent single-item requests share one padded forward pass
+BATCHER_OPTIONS = {
+    "classify": {"max_batch_size": 32, "max_wait_ms": 10.0, "max_batch_tokens": 16384},
+    "verify": {"max_batch_size": 32, "max_wait_ms": 10.0, "max_batch_tokens": 16384}
+}
 REFRESH_INTERVAL_SECONDS = 86400 # Refresh news every 24 hours (24 * 3600)
 
 
@@ -100,6 +118,7 @@ class ClusterRequest(BaseModel):
     method: str = Field("hdbscan", description="Clustering method: 'hdbscan' or 'kmeans'")
     n_clusters: Optional[int] = Field(None, description="Number of clusters (for kmeans)", ge=2)
     min_cluster_size: int = Field(5, description="Minimum cluster size (for hdbscan)", ge=2)
+    response_mode: str = Field("full", description="'full' echoes texts; 'compact' returns only indices, sizes and representative indices")
 
 
 class ClusterResponse(BaseModel):
@@ -109,6 +128,23 @@ class ClusterResponse(BaseModel):
     error: Optional[str] = None
 
 
+class ClusterModelFitRequest(BaseModel):
+    texts: List[str] = Field(..., description="Reference texts", min_items=10)
+    n_components: int = Field(5, description="UMAP output dimensions", ge=2, le=50)
+    min_cluster_size: int = Field(5, description="Minimum cluster size", ge=2)
+    min_samples: int = Field(3, description="Minimum samples for core points", ge=1)
+    sample_size: int = Field(5000, description="Maximum reference points", ge=10)
+
+
+class ClusterPredictRequest(BaseModel):
+    texts: List[str] = Field(..., description="Texts to label with the persisted model", min_items=1)
+
+
+class OnlineClusterRequest(BaseModel):
+    texts: List[str] = Field(..., description="Texts to assign to event clusters", min_items=1)
+    ids: Optional[List[str]] = Field(None, description="Optional caller ids, one per text")
+
+
 class SimilarityRequest(BaseModel):
     query_text: str = Field(..., description="Query text")
     corpus_texts: List[str] = Field(..., description="Corpus of texts to search")
@@ -116,9 +152,50 @@ class SimilarityRequest(BaseModel):
     threshold: float = Field(0.5, description="Minimum similarity threshold", ge=0.0, le=1.0)
 
 
+class BatchSimilarityRequest(BaseModel):
+    query_texts: List[str] = Field(..., description="Query texts", min_items=1)
+    corpus_texts: List[str] = Field(..., description="Corpus of texts to search")
+    top_k: int = Field(5, description="Number of similar texts to return per query", ge=1, le=50)
+    threshold: float = Field(0.5, description="Minimum similarity threshold", ge=0.0, le=1.0)
+    block_size: int = Field(16384, description="Corpus rows per score block (bounds memory)", ge=256)
+    quantization: str = Field("none", description="First pass over 'int8' or 'binary' codes with exact re-ranking, or 'none' (exact)")
+    rerank_factor: int = Field(4, description="Candidates re-ranked at full precision = top_k * rerank_factor", ge=1, le=64)
+
+
+class QuantizationReportRequest(BaseModel):
+    query_texts: List[str] = Field(..., description="Sample queries", min_items=1)
+    corpus_texts: List[str] = Field(..., description="Sample corpus", min_items=1)
+    top_k: int = Field(10, description="k for recall@k", ge=1, le=50)
+    rerank_factor: int = Field(4, description="Candidates re-ranked at full precision = top_k * rerank_factor", ge=1, le=64)
+
+
+class CorpusItem(BaseModel):
+    id: str = Field(..., description="Caller-defined item id")
+    text: str = Field(..., description="Text to embed")
+    metadata: Optional[dict] = Field(None, description="Extra fields returned with query matches")
+
+
+class CorpusAddRequest(BaseModel):
+    items: List[CorpusItem] = Field(..., description="Items to insert or replace", min_items=1)
+    max_items: Optional[int] = Field(None, description="Keep only the newest N items (applies when the corpus is created)", ge=1)
+    quantization: str = Field("none", description="Keep 'int8' or 'binary' codes in RAM, re-ranked exactly from disk (applies when the corpus is created)")
+    rerank_factor: int = Field(4, description="Candidates re-ranked at full precision = top_k * rerank_factor (applies when the corpus is created)", ge=1, le=64)
+
+
+class CorpusRemoveRequest(BaseModel):
+    ids: List[str] = Field(..., description="Ids of items to remove", min_items=1)
+
+
+class CorpusQueryRequest(BaseModel):
+    texts: List[str] = Field(..., description="Query texts", min_items=1)
+    top_k: int = Field(5, description="Number of matches per query", ge=1, le=100)
+    threshold: float = Field(0.5, description="Minimum similarity threshold", ge=0.0, le=1.0)
+
+
 class VerificationRequest(BaseModel):
     text: str = Field(..., description="Text to verify", min_length=10)
     source_url: Optional[str] = Field(None, description="URL of the news source")
+    async_fact_check: bool = Field(False, description="Return immediately and corroborate via web search in the background")
 
 class VerificationResponse(BaseModel):
     success: bool
@@ -128,6 +205,13 @@ class VerificationResponse(BaseModel):
     explanation: Optional[str] = None
     error: Optional[str] = None
     details: Optional[dict] = None
+    verdict_id: Optional[str] = None
+    corroboration_status: Optional[str] = None
+
+class BatchVerificationRequest(BaseModel):
+    texts: List[str] = Field(..., description="List of texts to verify", min_items=1)
+    source_urls: Optional[List[Optional[str]]] = Field(None, description="Source URL per text (aligned with texts)")
+    async_fact_check: bool = Field(False, description="Corroborate URL-less items via web search in the background")
 
 class UnifiedProcessResponse(BaseModel):
     success: bool
@@ -135,6 +219,35 @@ class UnifiedProcessResponse(BaseModel):
     error: Optional[str] = None
     report_id: Optional[str] = None
 
+class ProcessReportRequest(BaseModel):
+    text: str = Field(..., description="Report text or news link", min_length=10)
+    source_url: Optional[str] = Field(None, description="URL of the news source")
+    deadline_ms: Optional[float] = Field(None, gt=0, description="Time budget; stages that cannot finish in time return degraded output")
+
+class ProcessItem(BaseModel):
+    text: str = Field(..., description="Report text or news link", min_length=10)
+    source_url: Optional[str] = Field(None, description="URL of the news source")
+    headline: Optional[str] = Field(None, description="Headline, used by triage")
+
+class BatchProcessRequest(BaseModel):
+    items: List[ProcessItem] = Field(..., description="Reports to process", min_items=1, max_items=256)
+
+class BatchProcessResponse(BaseModel):
+    results: List[UnifiedProcessResponse]
+    succeeded: int
+    failed: int
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+
+class TriageRequest(BaseModel):
+    text: str = Field(..., description="Report text", min_length=1)
+    headline: Optional[str] = Field(None, description="Optional headline")
+    use_embeddings: bool = Field(True, description="Check keyword-less text against topic prototypes")
+
 
 # Helper functions
 def get_classification_pipeline():
@@ -145,11 +258,16 @@ def get_classification_pipeline():
     return classification_pipeline
 
 
+# Opt-in: greedy summaries from the continuous-batching decoder instead of 5-beam search
+SUMMARY_CONTINUOUS_BATCHING = os.getenv("AI_SUMMARY_CONTINUOUS_BATCHING", "0").lower() in ("1", "true", "yes")
+# Opt-in: split torch's process-wide intra-op threads between the unified processor's parallel stages
+LIMIT_STAGE_THREADS = os.getenv("AI_LIMIT_STAGE_THREADS", "0").lower() in ("1", "true", "yes")
+
 def get_summarization_pipeline():
     global summarization_pipeline
     if summarization_pipeline is None:
         logger.info("Initializing summarization pipeline")
-        summarization_pipeline = SummarizationPipeline()
+        summarization_pipeline = SummarizationPipeline(continuous_batching=SUMMARY_CONTINUOUS_BATCHING)
     return summarization_pipeline
 
 
@@ -178,9 +296,60 @@ def get_unified_processor():
     global unified_processor
     if unified_processor is None:
         logger.info("Initializing Unified Processor (Lazy Loading)...")
-        unified_processor = UnifiedProcessor()
+        unified_processor = UnifiedProcessor(
+            idempotency_window=float(os.getenv("AI_IDEMPOTENCY_WINDOW", "300")),
+            summary_continuous_batching=SUMMARY_CONTINUOUS_BATCHING,
+            limit_stage_threads=LIMIT_STAGE_THREADS
+        )
     return unified_processor
 
+async def run_batched(model: str, key: str, batch_fn, item, **params):
+    """
+    Await one item's result from the micro-batcher registered under key (one
+    fixed batcher per endpoint, configured by model). Request parameters travel
+    with the item, and each batch calls batch_fn(items, **params) once per
+    distinct set of parameters. Batches are scheduled on the inference executor
+    as interactive work.
+    """
+    batcher = micro_batchers.get(
+        key,
+        lambda entries: inference_executor.submit(run_grouped, batch_fn, entries, priority="interactive").result(),
+        **BATCHER_OPTIONS[model]
+    )
+    return await asyncio.wrap_future(batcher.submit((item, tuple(sorted(params.items())))))
+
+def queue_full_error(e: QueueFullError) -> HTTPException:
+    logger.warning(f"Rejecting request: {e}")
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(e),
+        headers={"Retry-After": str(int(e.retry_after + 0.999))}
+    )
+
+def run_process_report_job(payload: dict) -> dict:
+    """Job handler: full unified processing; failing raises so the queue retries"""
+    # Queued report submissions are user-facing, so they run as interactive work
+    result = inference_executor.submit(
+        get_unified_processor().process_report,
+        text=payload.get("text"),
+        source_url=payload.get("source_url"),
+        headline=payload.get("headline"),
+        priority="interactive"
+    ).result()
+    if not result.get("success", True) or "error" in result:
+        raise RuntimeError(result.get("error") or "Processing failed")
+    return result
+
+def get_job_workers():
+    global job_workers
+    if job_workers is None:
+        job_workers = JobWorkerPool(
+            job_queue,
+            {"process_report": run_process_report_job},
+            workers=int(os.getenv("AI_JOB_WORKERS", "2"))
+        )
+    return job_workers
+
 
 # API Endpoints
 @app.get("/")
@@ -196,9 +365,25 @@ async def root():
             "batch_summarize": "/api/summarize/batch",
             "cluster": "/api/cluster",
             "similarity": "/api/similarity",
+            "batch_similarity": "/api/similarity/batch",
+            "quantization_report": "/api/similarity/quantization",
+            "online_clusters": "/api/cluster/online",
+            "cluster_model": "/api/cluster/model",
+            "corpora": "/api/corpus/{name}",
             "verify_news": "/api/verify/news",
             "verify_report": "/api/verify/report",
-            "process_report": "/api/process/report"
+            "batch_verify_news": "/api/verify/news/batch",
+            "batch_verify_report": "/api/verify/report/batch",
+            "verdict": "/api/verify/verdicts/{verdict_id}",
+            "process_report": "/api/process/report",
+            "batch_process": "/api/process/batch",
+            "model_residency": "/api/models/residency",
+            "micro_batching": "/api/models/batching",
+            "inference_executor": "/api/models/executor",
+            "prediction_caches": "/api/models/caches",
+            "submit_job": "/api/jobs/process",
+            "job": "/api/jobs/{job_id}",
+            "triage": "/api/triage"
         }
     }
 
@@ -209,19 +394,74 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/api/models/residency", tags=["Models"])
+async def model_residency_status():
+    """
+    RAM budget, resident models, per-model footprint and load/eviction counts
+    """
+    return {"success": True, "residency": model_residency.stats()}
+
+
+@app.get("/api/models/executor", tags=["Models"])
+async def inference_executor_stats():
+    """
+    Inference executor queue depth, running calls, rejections and wait / run times
+    """
+    return {"success": True, "executor": inference_executor.stats()}
+
+@app.get("/api/models/caches", tags=["Models"])
+async def prediction_cache_stats():
+    """
+    Per-pipeline prediction cache entries, approximate bytes and hit / miss / eviction counters
+    (with disk rows, hits and writes for caches that have the shared disk tier)
+    """
+    caches = {name: cache.stats() for name, cache in list(model_caches.items())}
+    caches.update({f"{namespace}@{version}": cache.stats() for (namespace, version), cache in list(result_caches.items())})
+    return {"success": True, "caches": caches}
+
+@app.get("/api/models/batching", tags=["Models"])
+async def micro_batching_stats():
+    """
+    Per-model micro-batcher queue depth, batch-size histogram and queue wait
+    """
+    decoders = {}
+    if summarization_pipeline is not None and summarization_pipeline.summarizer.decoder is not None:
+        decoders["summarize"] = summarization_pipeline.summarizer.decoder.stats()
+    if unified_processor is not None and model_residency.is_resident("summarize"):
+        decoder = unified_processor.summarize_p.summarizer.decoder
+        if decoder is not None:
+            decoders["unified_summarize"] = decoder.stats()
+    return {"success": True, "batchers": micro_batchers.stats(), "continuous_decoders": decoders}
+
+@app.post("/api/models/residency/evict", tags=["Models"])
+async def evict_models(name: Optional[str] = None):
+    """
+    Evict one model by name (or every resident model); it reloads on next use
+    """
+    if name is not None and not model_residency.is_registered(name):
+        raise HTTPException(status_code=404, detail=f"Unknown model: {name}")
+    evicted = await asyncio.to_thread(model_residency.evict, name)
+    return {"success": True, "evicted": evicted, "residency": model_residency.stats()}
+
+
 @app.post("/api/classify", response_model=ClassifyResponse)
 async def classify_text(request: ClassifyRequest):
     """
     Classify a single text into categories
     """
     try:
-        pipeline = get_classification_pipeline()
-        result = pipeline.process(
-            text=request.text,
+        pipeline = await inference_executor.run(get_classification_pipeline)
+        result = await run_batched(
+            "classify",
+            "classify",
+            pipeline.batch_process,
+            request.text,
             top_k=request.top_k,
             threshold=request.threshold
         )
         return ClassifyResponse(**result)
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Classification endpoint error: {e}")
         raise HTTPException(
@@ -236,8 +476,9 @@ async def batch_classify_texts(request: BatchClassifyRequest):
     Classify multiple texts
     """
     try:
-        pipeline = get_classification_pipeline()
-        results = pipeline.batch_process(
+        pipeline = await inference_executor.run(get_classification_pipeline)
+        results = await inference_executor.run(
+            pipeline.batch_process,
             texts=request.texts,
             top_k=request.top_k,
             threshold=request.threshold
@@ -248,6 +489,8 @@ async def batch_classify_texts(request: BatchClassifyRequest):
             "results": results,
             "statistics": statistics
         }
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Batch classification endpoint error: {e}")
         raise HTTPException(
@@ -262,13 +505,16 @@ async def summarize_text(request: SummarizeRequest):
     Summarize a single text
     """
     try:
-        pipeline = get_summarization_pipeline()
-        result = pipeline.process(
+        pipeline = await inference_executor.run(get_summarization_pipeline)
+        result = await inference_executor.run(
+            pipeline.process,
             text=request.text,
             max_length=request.max_length,
             min_length=request.min_length
         )
         return SummarizeResponse(**result)
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Summarization endpoint error: {e}")
         raise HTTPException(
@@ -283,8 +529,9 @@ async def batch_summarize_texts(request: BatchSummarizeRequest):
     Summarize multiple texts
     """
     try:
-        pipeline = get_summarization_pipeline()
-        results = pipeline.batch_process(
+        pipeline = await inference_executor.run(get_summarization_pipeline)
+        results = await inference_executor.run(
+            pipeline.batch_process,
             texts=request.texts,
             max_length=request.max_length,
             min_length=request.min_length
@@ -295,6 +542,8 @@ async def batch_summarize_texts(request: BatchSummarizeRequest):
             "results": results,
             "statistics": statistics
         }
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Batch summarization endpoint error: {e}")
         raise HTTPException(
@@ -309,12 +558,21 @@ async def cluster_texts(request: ClusterRequest):
     Cluster similar texts together
     """
     try:
-        pipeline = get_clustering_pipeline()
+        if request.response_mode not in ("full", "compact"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid response_mode. Use 'full' or 'compact'"
+            )
+        include_texts = request.response_mode == "full"
+        
+        pipeline = await inference_executor.run(get_clustering_pipeline)
         
         if request.method == "hdbscan":
-            result = pipeline.cluster_hdbscan(
+            result = await inference_executor.run(
+                pipeline.cluster_hdbscan,
                 texts=request.texts,
-                min_cluster_size=request.min_cluster_size
+                min_cluster_size=request.min_cluster_size,
+                include_texts=include_texts
             )
         elif request.method == "kmeans":
             if request.n_clusters is None:
@@ -322,9 +580,11 @@ async def cluster_texts(request: ClusterRequest):
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="n_clusters is required for kmeans method"
                 )
-            result = pipeline.cluster_kmeans(
+            result = await inference_executor.run(
+                pipeline.cluster_kmeans,
                 texts=request.texts,
-                n_clusters=request.n_clusters
+                n_clusters=request.n_clusters,
+                include_texts=include_texts
             )
         else:
             raise HTTPException(
@@ -339,6 +599,8 @@ async def cluster_texts(request: ClusterRequest):
         )
     except HTTPException:
         raise
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Clustering endpoint error: {e}")
         raise HTTPException(
@@ -347,14 +609,167 @@ async def cluster_texts(request: ClusterRequest):
         )
 
 
+@app.get("/api/cluster/model", tags=["Cluster Model"])
+async def cluster_model_status():
+    """
+    Persisted UMAP/HDBSCAN model version, age and drift
+    """
+    return {"success": True, "model": await asyncio.to_thread(cluster_model.status)}
+
+
+@app.post("/api/cluster/model/fit", tags=["Cluster Model"])
+async def fit_cluster_model(request: ClusterModelFitRequest):
+    """
+    Fit and persist a new model version on reference texts
+    """
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        model = await inference_executor.run(
+            pipeline.fit_cluster_model,
+            request.texts,
+            request.n_components,
+            request.min_cluster_size,
+            request.min_samples,
+            request.sample_size,
+            priority="bulk"
+        )
+        return {"success": True, "model": model}
+    except (ImportError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Cluster model fit error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/cluster/model/refit", tags=["Cluster Model"])
+async def refit_cluster_model(force: bool = False):
+    """
+    Refit on the reservoir of recently seen embeddings if stale or drifted (or forced)
+    """
+    try:
+        model = await inference_executor.run(cluster_model.refit_if_needed, force, priority="bulk")
+        return {
+            "success": True,
+            "refitted": model is not None,
+            "model": model or await asyncio.to_thread(cluster_model.status)
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Cluster model refit error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/cluster/model/predict", tags=["Cluster Model"])
+async def predict_clusters(request: ClusterPredictRequest):
+    """
+    Label new texts with the persisted model (transform + approximate_predict, no re-clustering)
+    """
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        result = await inference_executor.run(pipeline.predict_clusters, request.texts)
+        return {"success": True, **result}
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Cluster predict error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/cluster/online", tags=["Online Clustering"])
+async def assign_online_clusters(request: OnlineClusterRequest):
+    """
+    Assign texts to persistent event clusters incrementally (no refit)
+    """
+    if request.ids is not None and len(request.ids) != len(request.texts):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids must match texts")
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        embeddings = await inference_executor.run(pipeline.generate_embeddings, request.texts)
+        assignments = await inference_executor.run(
+            online_clusterer.assign, embeddings, item_ids=request.ids, texts=request.texts
+        )
+        
+        return {
+            "success": True,
+            "assignments": assignments,
+            "num_clusters": online_clusterer.stats()["num_clusters"]
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Online clustering endpoint error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.get("/api/cluster/online", tags=["Online Clustering"])
+async def list_online_clusters(min_size: int = 2, limit: int = 50):
+    """
+    Current event clusters, largest first
+    """
+    try:
+        clusters = await inference_executor.run(online_clusterer.clusters, min_size=min_size, limit=limit)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    return {
+        "success": True,
+        "clusters": clusters,
+        "stats": online_clusterer.stats()
+    }
+
+
+@app.get("/api/cluster/online/{cluster_id}", tags=["Online Clustering"])
+async def get_online_cluster(cluster_id: int):
+    """
+    One event cluster (ids of merged clusters resolve to the surviving cluster)
+    """
+    try:
+        cluster = await inference_executor.run(online_clusterer.get, cluster_id)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    if cluster is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Cluster {cluster_id} not found")
+    return {"success": True, "cluster": cluster}
+
+
+@app.post("/api/cluster/online/consolidate", tags=["Online Clustering"])
+async def consolidate_online_clusters():
+    """
+    Merge converged clusters now instead of waiting for the background task
+    """
+    try:
+        result = await inference_executor.run(online_clusterer.consolidate)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    await asyncio.to_thread(online_clusterer.save_if_dirty)
+    return {"success": True, **result}
+
+
 @app.post("/api/similarity")
 async def find_similar_texts(request: SimilarityRequest):
     """
     Find similar texts to a query
     """
     try:
-        pipeline = get_clustering_pipeline()
-        results = pipeline.find_similar(
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        results = await inference_executor.run(
+            pipeline.find_similar,
             query_text=request.query_text,
             corpus_texts=request.corpus_texts,
             top_k=request.top_k,
@@ -367,6 +782,8 @@ async def find_similar_texts(request: SimilarityRequest):
             "similar_texts": results,
             "num_results": len(results)
         }
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Similarity endpoint error: {e}")
         raise HTTPException(
@@ -375,18 +792,227 @@ async def find_similar_texts(request: SimilarityRequest):
         )
 
 
+@app.post("/api/similarity/batch")
+async def find_similar_texts_batch(request: BatchSimilarityRequest):
+    """
+    Find similar texts for many queries against one corpus
+    """
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        results = await inference_executor.run(
+            pipeline.find_similar_batch,
+            query_texts=request.query_texts,
+            corpus_texts=request.corpus_texts,
+            top_k=request.top_k,
+            threshold=request.threshold,
+            block_size=request.block_size,
+            quantization=request.quantization,
+            rerank_factor=request.rerank_factor
+        )
+        
+        return {
+            "success": True,
+            "results": [
+                {
+                    "query_index": i,
+                    "similar_texts": matches,
+                    "num_results": len(matches)
+                }
+                for i, matches in enumerate(results)
+            ],
+            "num_queries": len(results)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Batch similarity endpoint error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/similarity/quantization")
+async def quantization_report(request: QuantizationReportRequest):
+    """
+    Recall@k and memory use of each vector quantization mode on a sample
+    """
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        report = await inference_executor.run(
+            pipeline.quantization_report,
+            query_texts=request.query_texts,
+            corpus_texts=request.corpus_texts,
+            top_k=request.top_k,
+            rerank_factor=request.rerank_factor
+        )
+        
+        return {
+            "success": True,
+            "modes": report
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Quantization report endpoint error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.get("/api/corpus", tags=["Corpora"])
+async def list_corpora():
+    """
+    List the registered similarity corpora (loading any not yet in memory)
+    """
+    try:
+        return {"corpora": await inference_executor.run(corpus_registry.list)}
+    except QueueFullError as e:
+        raise queue_full_error(e)
+
+
+async def get_corpus_or_404(name: str):
+    """
+    A registered corpus, loaded on the inference executor (the first access reads
+    its files); 400 for an invalid name, 404 when missing, 429 when the pool is full
+    """
+    try:
+        corpus = await inference_executor.run(corpus_registry.get, name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    if corpus is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Corpus not found")
+    return corpus
+
+
+@app.get("/api/corpus/{name}", tags=["Corpora"])
+async def get_corpus(name: str):
+    """
+    Describe a registered similarity corpus
+    """
+    corpus = await get_corpus_or_404(name)
+    return corpus.info()
+
+
+@app.post("/api/corpus/{name}/add", tags=["Corpora"])
+async def add_to_corpus(name: str, request: CorpusAddRequest):
+    """
+    Embed items and insert them into a named corpus (created on first use)
+    """
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        embeddings = await inference_executor.run(pipeline.generate_embeddings, [item.text for item in request.items])
+        corpus = await inference_executor.run(
+            corpus_registry.get_or_create,
+            name,
+            dim=embeddings.shape[1],
+            max_items=request.max_items,
+            quantization=request.quantization,
+            rerank_factor=request.rerank_factor
+        )
+        # Adding writes the corpus files, so it runs on the pool like the embedding
+        added = await inference_executor.run(
+            corpus.add,
+            [item.id for item in request.items],
+            embeddings,
+            [{"text": item.text, **(item.metadata or {})} for item in request.items]
+        )
+        return {"success": True, "added": added, "corpus": corpus.info()}
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Corpus add error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/corpus/{name}/remove", tags=["Corpora"])
+async def remove_from_corpus(name: str, request: CorpusRemoveRequest):
+    """
+    Remove items from a named corpus
+    """
+    corpus = await get_corpus_or_404(name)
+    try:
+        removed = await inference_executor.run(corpus.remove, request.ids)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    return {"success": True, "removed": removed, "corpus": corpus.info()}
+
+
+@app.post("/api/corpus/{name}/query", tags=["Corpora"])
+async def query_corpus(name: str, request: CorpusQueryRequest):
+    """
+    Find the nearest corpus items for each query text
+    """
+    corpus = await get_corpus_or_404(name)
+
+    try:
+        pipeline = await inference_executor.run(get_clustering_pipeline)
+        embeddings = await inference_executor.run(pipeline.generate_embeddings, request.texts)
+        results = await inference_executor.run(corpus.query, embeddings, top_k=request.top_k, threshold=request.threshold)
+        return {
+            "success": True,
+            "results": [
+                {"query_index": i, "matches": matches, "num_results": len(matches)}
+                for i, matches in enumerate(results)
+            ]
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Corpus query error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.delete("/api/corpus/{name}", tags=["Corpora"])
+async def delete_corpus(name: str):
+    """
+    Delete a named corpus and its files
+    """
+    try:
+        deleted = await inference_executor.run(corpus_registry.drop, name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Corpus not found")
+    return {"success": True}
+
+
 @app.post("/api/verify/news", response_model=VerificationResponse)
 async def verify_news_credibility(request: VerificationRequest):
     """
     Verify the credibility of a news article
     """
     try:
-        pipeline = get_verification_pipeline()
-        result = pipeline.verify_news(
-            text=request.text,
-            source_url=request.source_url
+        pipeline = await inference_executor.run(get_verification_pipeline)
+        result = await run_batched(
+            "verify",
+            "verify_news",
+            lambda items, async_fact_check: pipeline.verify_news_batch(
+                [text for text, _ in items],
+                [url for _, url in items],
+                async_fact_check=async_fact_check
+            ),
+            (request.text, request.source_url),
+            async_fact_check=request.async_fact_check
         )
         return VerificationResponse(**result)
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"News verification error: {e}")
         raise HTTPException(
@@ -395,15 +1021,62 @@ async def verify_news_credibility(request: VerificationRequest):
         )
 
 
+async def wait_for_verdict(verdict_id: str, timeout: float) -> Optional[dict]:
+    """
+    Latest verdict once it leaves the pending state or timeout passes, without
+    holding a thread: the store's subscriber callback wakes the waiting coroutine.
+    Verdicts corroborated by another worker process are re-read every second.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+
+    def on_update(_verdict_id, _verdict):
+        loop.call_soon_threadsafe(changed.set)
+
+    verdict_store.subscribe(verdict_id, on_update)
+    try:
+        deadline = loop.time() + timeout
+        while True:
+            changed.clear()
+            verdict = await asyncio.to_thread(verdict_store.get, verdict_id)
+            remaining = deadline - loop.time()
+            if verdict is None or verdict.get("corroboration_status") != "pending_corroboration" or remaining <= 0:
+                return verdict
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        verdict_store.unsubscribe(verdict_id, on_update)
+
+
+@app.get("/api/verify/verdicts/{verdict_id}", tags=["Verification"])
+async def get_verdict(verdict_id: str, wait: float = 0.0):
+    """
+    Poll a verdict that is being corroborated in the background.
+    Pass wait (seconds, max 60) to long-poll until the fact check completes.
+    """
+    if wait > 0:
+        verdict = await wait_for_verdict(verdict_id, min(wait, 60.0))
+    else:
+        verdict = await asyncio.to_thread(verdict_store.get, verdict_id)
+
+    if verdict is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Verdict not found")
+    return verdict
+
+
 @app.post("/api/verify/report", response_model=VerificationResponse, tags=["Verification"])
 async def verify_civic_report(request: VerificationRequest):
     """
     Verify if a civic report is valid (Actionable) or Spam/Nonsense
     """
     try:
-        pipeline = get_verification_pipeline()
-        result = pipeline.verify_report(request.text)
-        
+        pipeline = await inference_executor.run(get_verification_pipeline)
+        result = await run_batched("verify", "verify_report", pipeline.verify_report_batch, request.text)
+        if not result.get("success", True):
+            raise RuntimeError(result.get("error"))
+
         return VerificationResponse(
             success=True,
             status=result["status"],
@@ -411,6 +1084,8 @@ async def verify_civic_report(request: VerificationRequest):
             confidence=result.get("confidence", 0.0),
             explanation=result.get("explanation", None)
         )
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Report verification error: {e}")
         raise HTTPException(
@@ -418,6 +1093,59 @@ async def verify_civic_report(request: VerificationRequest):
             detail=str(e)
         )
 
+@app.post("/api/verify/news/batch", tags=["Verification"])
+async def batch_verify_news(request: BatchVerificationRequest):
+    """
+    Verify the credibility of many news articles in one batched pass
+    """
+    if request.source_urls is not None and len(request.source_urls) != len(request.texts):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="source_urls must be the same length as texts"
+        )
+    try:
+        pipeline = await inference_executor.run(get_verification_pipeline)
+        results = await inference_executor.run(
+            pipeline.verify_news_batch,
+            texts=request.texts,
+            source_urls=request.source_urls,
+            async_fact_check=request.async_fact_check
+        )
+        return {
+            "results": results,
+            "statistics": pipeline.get_statistics(results)
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Batch news verification error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+@app.post("/api/verify/report/batch", tags=["Verification"])
+async def batch_verify_reports(request: BatchVerificationRequest):
+    """
+    Verify many civic reports in one batched zero-shot pass
+    """
+    try:
+        pipeline = await inference_executor.run(get_verification_pipeline)
+        results = await inference_executor.run(pipeline.verify_report_batch, request.texts)
+        return {
+            "results": results,
+            "statistics": pipeline.get_statistics(results)
+        }
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Batch report verification error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @app.post("/api/verify/factcheck", tags=["Verification"])
 async def fact_check_news(request: VerificationRequest):
     """
@@ -425,9 +1153,11 @@ async def fact_check_news(request: VerificationRequest):
     Returns found sources and verification status.
     """
     try:
-        pipeline = get_factcheck_pipeline()
-        result = pipeline.verify_claim(request.text)
+        pipeline = await inference_executor.run(get_factcheck_pipeline)
+        result = await inference_executor.run(pipeline.verify_claim, request.text)
         return result
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Fact-checking endpoint error: {e}")
         raise HTTPException(
@@ -437,22 +1167,38 @@ async def fact_check_news(request: VerificationRequest):
 
 
 @app.post("/api/process/report", response_model=UnifiedProcessResponse, tags=["Unified"], status_code=status.HTTP_201_CREATED)
-async def process_full_report(request: VerificationRequest):
+async def process_full_report(
+    request: ProcessReportRequest,
+    deadline_header: Optional[float] = Header(None, alias="X-Deadline-Ms")
+):
     """
     Unified endpoint that runs classification, summarization, NER, and verification
     in a single call. Returns structured data for DB storage and frontend.
     Accepts raw text or a news link in the text field.
+    An optional deadline (deadline_ms field or X-Deadline-Ms header, the smaller
+    wins) bounds the whole request; stages that cannot finish within it return
+    degraded output, listed in degraded_fields.
     """
     logger.info(f"Received process report request. Text length: {len(request.text if request.text else '')}")
+    # The budget starts when the request arrives, so queueing counts against it
+    budgets = [b for b in (request.deadline_ms, deadline_header) if b and b > 0]
+    deadline = Deadline.from_ms(min(budgets) if budgets else None)
     try:
-        processor = get_unified_processor()
-        result = processor.process_report(
+        processor = await inference_executor.run(get_unified_processor)
+        # Single reports skip the micro-batcher: their stages already run in parallel
+        # (with per-stage timings), while a batch would run at the pace of its slowest
+        # item behind the one batcher thread. Bulk callers use /api/process/batch.
+        result = await inference_executor.run(
+            processor.process_report,
             text=request.text,
-            source_url=request.source_url
+            source_url=request.source_url,
+            deadline=deadline
         )
         if "error" in result:
              return UnifiedProcessResponse(success=False, error=result["error"])
         return UnifiedProcessResponse(success=True, data=result, report_id=result.get("report_id"))
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"Unified processing endpoint error: {e}")
         raise HTTPException(
@@ -460,6 +1206,130 @@ async def process_full_report(request: VerificationRequest):
             detail=str(e)
         )
 
+@app.post("/api/process/batch", response_model=BatchProcessResponse, tags=["Unified"])
+async def process_reports_batch(request: BatchProcessRequest):
+    """
+    Unified processing for many reports at once. Every stage runs batched over
+    the whole request; each item succeeds or fails on its own with the same
+    per-item schema as /api/process/report.
+    """
+    logger.info(f"Received batch process request with {len(request.items)} items")
+    try:
+        processor = await inference_executor.run(get_unified_processor)
+        results = await inference_executor.run(
+            processor.process_reports,
+            [{"text": item.text, "source_url": item.source_url, "headline": item.headline} for item in request.items],
+            priority="bulk"
+        )
+        responses = [
+            UnifiedProcessResponse(success=True, data=result, report_id=result.get("report_id"))
+            if result.get("success") else
+            UnifiedProcessResponse(success=False, error=result.get("error"), report_id=result.get("report_id"))
+            for result in results
+        ]
+        succeeded = sum(1 for r in responses if r.success)
+        return BatchProcessResponse(results=responses, succeeded=succeeded, failed=len(responses) - succeeded)
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Batch processing endpoint error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@app.post("/api/jobs/process", response_model=JobSubmitResponse, tags=["Jobs"], status_code=status.HTTP_202_ACCEPTED)
+async def submit_process_job(item: ProcessItem):
+    """
+    Queue a report for unified processing and return its job ID immediately.
+    The job is persisted, run by the worker pool and retried on failure.
+    """
+    try:
+        job_id = await asyncio.to_thread(
+            job_queue.submit,
+            "process_report",
+            {"text": item.text, "source_url": item.source_url, "headline": item.headline}
+        )
+        return JobSubmitResponse(
+            job_id=job_id,
+            status="queued",
+            status_url=f"/api/jobs/{job_id}",
+            result_url=f"/api/jobs/{job_id}/result"
+        )
+    except Exception as e:
+        logger.error(f"Job submit error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@app.get("/api/jobs", tags=["Jobs"])
+async def job_queue_stats():
+    """
+    Job counts by status and worker pool counters
+    """
+    return {"success": True, "stats": await asyncio.to_thread(get_job_workers().stats)}
+
+@app.get("/api/jobs/{job_id}", tags=["Jobs"])
+async def get_job_status(job_id: str):
+    """
+    Status of a queued job (queued / running / succeeded / failed) with attempts and last error
+    """
+    job = await asyncio.to_thread(job_queue.get, job_id, False)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {"success": True, "job": job}
+
+@app.get("/api/jobs/{job_id}/result", response_model=UnifiedProcessResponse, tags=["Jobs"])
+async def get_job_result(job_id: str, response: Response):
+    """
+    Result of a finished job in the /api/process/report schema (202 while it is still pending)
+    """
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job["status"] == "succeeded":
+        result = job["result"]
+        return UnifiedProcessResponse(success=True, data=result, report_id=result.get("report_id"))
+    if job["status"] == "failed":
+        return UnifiedProcessResponse(success=False, error=job["error"])
+    response.status_code = status.HTTP_202_ACCEPTED
+    return UnifiedProcessResponse(success=False, error=f"Job is {job['status']}")
+
+@app.post("/api/triage", tags=["Unified"])
+async def triage_text(request: TriageRequest):
+    """
+    Triage decision (reject / fast_path / full) for a text, without processing it
+    """
+    try:
+        embed = (await inference_executor.run(get_clustering_pipeline)).generate_embeddings if request.use_embeddings else None
+        result = await inference_executor.run(triage_pipeline.assess, request.text, request.headline, embed)
+        return {"success": True, "triage": result}
+    except QueueFullError as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        logger.error(f"Triage endpoint error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@app.get("/api/triage/stats", tags=["Unified"])
+async def triage_stats():
+    """
+    Triage decision counts, skipped stages and estimated compute saved
+    """
+    return {"success": True, "stats": triage_pipeline.stats()}
+
+@app.get("/api/process/dedup", tags=["Unified"])
+async def process_dedup_stats():
+    """
+    Single-flight coalescing and idempotency window counters of the unified processor
+    """
+    if unified_processor is None:
+        return {"success": True, "stats": None}
+    return {"success": True, "stats": unified_processor.flights.stats()}
+
 @app.post("/api/process/upload", response_model=UnifiedProcessResponse, tags=["Unified"], status_code=status.HTTP_201_CREATED)
 async def process_upload(file: UploadFile = File(...)):
     """
@@ -470,13 +1340,15 @@ async def process_upload(file: UploadFile = File(...)):
         
     try:
         content = await file.read()
-        processor = get_unified_processor()
-        result = processor.process_report(file_bytes=content)
+        processor = await inference_executor.run(get_unified_processor)
+        result = await inference_executor.run(processor.process_report, file_bytes=content)
         
         if "error" in result:
              return UnifiedProcessResponse(success=False, error=result["error"])
              
         return UnifiedProcessResponse(success=True, data=result, report_id=result.get("report_id"))
+    except QueueFullError as e:
+        raise queue_full_error(e)
     except Exception as e:
         logger.error(f"File upload processing failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -504,7 +1376,7 @@ async def fetch_all_intelligence(news_api_key: Optional[str] = None):
     # Production Mode: Fetches all available news stories
     fetcher = MultiSourceFetcher(news_api_key=key, test_mode=False)
     try:
-        results = fetcher.poll_all_sources()
+        results = await asyncio.to_thread(fetcher.poll_all_sources)
         output = {
             "success": True, 
             "last_updated": datetime.datetime.now().isoformat(),
@@ -560,10 +1432,86 @@ async def background_refresh_task():
             
         await asyncio.sleep(REFRESH_INTERVAL_SECONDS)
 
+JOB_PURGE_INTERVAL_SECONDS = 3600
+
+async def background_job_purge_task():
+    """
+    Periodically delete finished jobs past their retention window
+    """
+    while True:
+        await asyncio.sleep(JOB_PURGE_INTERVAL_SECONDS)
+        try:
+            purged = await asyncio.to_thread(job_queue.purge)
+            if purged:
+                logger.info(f"Purged {purged} finished jobs")
+            if unified_processor is not None:
+                unified_processor.flights.purge()
+            for cache in list(result_caches.values()):
+                await asyncio.to_thread(cache.purge)
+            await asyncio.to_thread(verdict_store.purge)
+        except Exception as e:
+            logger.error(f"Job purge ERROR: {e}")
+
+CLUSTER_CONSOLIDATION_INTERVAL_SECONDS = 300
+
+async def background_cluster_consolidation_task():
+    """
+    Periodically merge converged event clusters and persist the online cluster state
+    """
+    while True:
+        await asyncio.sleep(CLUSTER_CONSOLIDATION_INTERVAL_SECONDS)
+        try:
+            await inference_executor.run(online_clusterer.consolidate, priority="background")
+            await asyncio.to_thread(online_clusterer.save_if_dirty)
+            await asyncio.to_thread(corpus_registry.save_dirty)
+        except Exception as e:
+            logger.error(f"Cluster consolidation ERROR: {e}")
+
+CLUSTER_MODEL_CHECK_INTERVAL_SECONDS = 3600
+
+async def background_cluster_model_task():
+    """
+    Periodically refit the persisted UMAP/HDBSCAN model when it is stale or has drifted
+    """
+    while True:
+        await asyncio.sleep(CLUSTER_MODEL_CHECK_INTERVAL_SECONDS)
+        try:
+            await inference_executor.run(cluster_model.refit_if_needed, priority="bulk")
+            await asyncio.to_thread(cluster_model.save_reservoir)
+        except Exception as e:
+            logger.error(f"Cluster model refit ERROR: {e}")
+
+async def resume_pending_verdicts():
+    """
+    Restart the background fact checks that a stopped process left pending
+    (loads the verification pipeline only when there are any)
+    """
+    try:
+        orphans = await asyncio.to_thread(verdict_store.recover_orphans)
+        if orphans:
+            pipeline = await inference_executor.run(get_verification_pipeline, priority="background")
+            pipeline.resume_verdicts(orphans)
+    except Exception as e:
+        logger.error(f"Resuming pending verdicts failed: {e}")
+
 @app.on_event("startup")
 async def startup_event():
-    """Start the background task when API begins"""
+    """Start the background tasks when API begins"""
     asyncio.create_task(background_refresh_task())
+    asyncio.create_task(background_cluster_consolidation_task())
+    asyncio.create_task(background_cluster_model_task())
+    asyncio.create_task(background_job_purge_task())
+    asyncio.create_task(resume_pending_verdicts())
+    get_job_workers().start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the job workers and persist online cluster state and similarity corpora"""
+    await asyncio.to_thread(get_job_workers().stop)
+    await asyncio.to_thread(micro_batchers.stop)
+    inference_executor.shutdown()
+    online_clusterer.save_if_dirty()
+    corpus_registry.save_dirty()
 
 @app.get("/api/realtime/news", tags=["Fetching"])
 async def get_realtime_news():
@@ -9,6 +9,12 @@ from ai_service.fetchers.reliefweb_client import ReliefWebFetcher
 from ai_service.fetchers.usgs_client import USGSFetcher
 from ai_service.fetchers.news_client import NewsFetcher
 from ai_service.pipelines.processor import UnifiedProcessor
+from ai_service.utils import stable_digest
+from ai_service.utils.near_duplicate import near_duplicate_detector
+from ai_service.utils.inference_executor import inference_executor
+
+# News items per background inference call; interactive requests are scheduled between chunks
+BACKGROUND_CHUNK_SIZE = 4
 
 class MultiSourceFetcher:
     """
@@ -26,6 +32,9 @@ class MultiSourceFetcher:
         # Load our fine-tuned AI brain
         self.ai = UnifiedProcessor()
         
+        # Wire stories repeat under many links; duplicates reuse the canonical item's AI results
+        self.dedup = near_duplicate_detector
+        
     def poll_all_sources(self) -> Dict[str, List]:
         """
         Execute the full 4-Level polling cycle.
@@ -53,24 +62,86 @@ class MultiSourceFetcher:
         # 5. The "Intelligence" Layer: Cross-Reference
         # We process news reports through our AI to see if they match Level 1
         processed_news = []
-        for report in news_reports:
-            verified_report = self._verify_against_anchor(report, official_data)
+        ai_results = [self._canonical_ai_result(report) for report in news_reports]
+        duplicates_suppressed = sum(1 for r in ai_results if r is not None)
+        
+        # Everything that is not a near-duplicate goes through the models in small batches
+        # at background priority, so interactive requests do not wait for the whole cycle
+        to_process = [
+            i for i, (report, result) in enumerate(zip(news_reports, ai_results))
+            if result is None and report.get("text")
+        ]
+        for start in range(0, len(to_process), BACKGROUND_CHUNK_SIZE):
+            chunk = to_process[start:start + BACKGROUND_CHUNK_SIZE]
+            batch_results = inference_executor.submit(
+                self.ai.process_reports,
+                [
+                    {
+                        "text": news_reports[i]["text"],
+                        "source_url": news_reports[i].get("url"),
+                        "headline": news_reports[i].get("title")
+                    }
+                    for i in chunk
+                ],
+                priority="background"
+            ).result()
+            for i, result in zip(chunk, batch_results):
+                if result.get("success", False):
+                    self.dedup.set_result(self._item_key(news_reports[i]), result)
+                ai_results[i] = result
+        
+        for report, ai_result in zip(news_reports, ai_results):
+            verified_report = self._verify_against_anchor(report, official_data, ai_result=ai_result)
             
             # ONLY include it if it's a real disaster (not skipped or rejected)
-            if verified_report.get("status") not in ["Skipped (Not a Disaster)", "Rejected (AI Detected Fake)", "Skipped (No Text)", "Skipped (Not Nepal Related)"]:
+            if verified_report.get("status") not in ["Skipped (Not a Disaster)", "Rejected (AI Detected Fake)", "Skipped (No Text)", "Skipped (Not Nepal Related)", "Skipped (Triage Rejected)"]:
                 processed_news.append(verified_report)
             
+        try:
+            self.dedup.save_if_dirty()
+        except Exception as e:
+            logger.warning(f"Could not persist near-duplicate index: {e}")
+        logger.info(f"Poll cycle: {duplicates_suppressed}/{len(news_reports)} news items were near-duplicates")
+            
         return {
             "triggers": triggers,
             "official_incidents": official_data,
             "context": context_reports,
-            "news_intelligence": processed_news
+            "news_intelligence": processed_news,
+            "deduplication": {
+                "news_items": len(news_reports),
+                "duplicates_suppressed": duplicates_suppressed,
+                "processed": len(news_reports) - duplicates_suppressed
+            }
         }
+    
+    def _item_key(self, news_item: Dict) -> str:
+        """Stable id of a news item (its link, else a digest of its text)"""
+        return news_item.get("url") or news_item.get("link") or stable_digest(news_item.get("text", ""))
+    
+    def _canonical_ai_result(self, news_item: Dict) -> Optional[Dict]:
+        """
+        AI result of an earlier near-identical item, or None if this item needs processing.
+        Non-duplicates are registered as canonical items.
+        """
+        text = news_item.get("text", "")
+        if not text:
+            return None
         
-    def _verify_against_anchor(self, news_item: Dict, anchor_data: List[Dict]) -> Dict:
+        match = self.dedup.check(self._item_key(news_item), text)
+        if match["duplicate_of"] is None:
+            return None
+        
+        logger.info(f"Near-duplicate of {match['duplicate_of']} (J~{match['similarity']}): {news_item.get('title')}")
+        news_item["duplicate_of"] = match["duplicate_of"]
+        news_item["duplicate_similarity"] = match["similarity"]
+        return match["result"]
+        
+    def _verify_against_anchor(self, news_item: Dict, anchor_data: List[Dict], ai_result: Optional[Dict] = None) -> Dict:
         """
         Uses trained AI models to extract details from news,
         then cross-references against BIPAD data.
+        A precomputed ai_result (from a canonical near-duplicate or the batch run) skips the models.
         """
         text = news_item.get("text", "")
         if not text: 
@@ -79,13 +150,25 @@ class MultiSourceFetcher:
         
         try:
             # A. AI Analysis (Classification, NER, Verification)
-            ai_result = self.ai.process_report(text=text, source_url=news_item.get("url"))
+            if ai_result is None:
+                ai_result = self.ai.process_report(
+                    text=text, source_url=news_item.get("url"), headline=news_item.get("title")
+                )
+                if ai_result.get("success", False):
+                    self.dedup.set_result(self._item_key(news_item), ai_result)
             
             if not ai_result.get("success", False):
                 logger.warning(f"AI processing failed for {news_item.get('title')}: {ai_result.get('error')}")
                 news_item["status"] = "Unverified (AI Processing Failed)"
                 return news_item
             
+            # Spam / off-topic items were rejected before any model ran
+            triage = ai_result.get("triage") or {}
+            if triage.get("decision") == "reject":
+                logger.info(f"Triage rejected ({triage.get('reason')}): {news_item.get('title')}")
+                news_item["status"] = "Skipped (Triage Rejected)"
+                return news_item
+            
             # Extract core signals
             ai_locs = ai_result.get("location_entities", [])
             ai_type = ai_result.get("disaster_type", "Unknown")
@@ -0,0 +1,442 @@
+"""
+Archive Clustering Job
+Clusters the full report / news archive in fixed RAM:
+stream texts -> chunked embeddings in a memory-mapped matrix -> MiniBatchKMeans
+(k chosen by silhouette on a sample) or sampled HDBSCAN + assignment -> bulk label write-back
+
+Usage:
+    python -m ai_service.jobs.cluster_archive --source db --db-url sqlite:///backend/disaster_local.db
+    python -m ai_service.jobs.cluster_archive --source jsonl --input archive.jsonl --output labels.jsonl
+"""
+import os
+import json
+import time
+import argparse
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from ai_service.utils.vector_search import l2_normalize
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+class JSONLSource:
+    """Records from a JSON-lines file (one object per line)"""
+
+    def __init__(self, path: str, id_field: str = "id", text_field: str = "text"):
+        self.path = path
+        self.id_field = id_field
+        self.text_field = text_field
+
+    def count(self) -> int:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return sum(1 for line in f if line.strip())
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[Tuple[Any, str]]]:
+        chunk = []
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                chunk.append((record.get(self.id_field, line_no), record.get(self.text_field) or ""))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def write_labels(self, ids_path: str, labels: np.ndarray, output: str, chunk_size: int) -> int:
+        written = 0
+        with open(output, "w", encoding="utf-8") as out:
+            for ids, start in _iter_ids(ids_path, chunk_size):
+                for item_id, label in zip(ids, labels[start:start + len(ids)]):
+                    out.write(json.dumps({"id": item_id, "cluster_id": int(label)}) + "\n")
+                written += len(ids)
+        return written
+
+
+class DatabaseSource:
+    """Records from a SQL table (the backend's reports table by default)"""
+
+    def __init__(
+        self,
+        db_url: str,
+        table: str = "reports",
+        id_column: str = "id",
+        text_column: str = "text",
+        label_column: str = "cluster_id"
+    ):
+        from sqlalchemy import create_engine, MetaData, Table
+
+        self.engine = create_engine(db_url)
+        self.table = Table(table, MetaData(), autoload_with=self.engine)
+        self.id_column = id_column
+        self.text_column = text_column
+        self.label_column = label_column
+
+    def count(self) -> int:
+        from sqlalchemy import select, func
+
+        with self.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(self.table)).scalar_one()
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[List[Tuple[Any, str]]]:
+        from sqlalchemy import select
+
+        id_col = self.table.c[self.id_column]
+        text_col = self.table.c[self.text_column]
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                select(id_col, text_col).order_by(id_col)
+            )
+            for rows in result.partitions(chunk_size):
+                yield [(row[0], row[1] or "") for row in rows]
+
+    def _ensure_label_column(self) -> None:
+        from sqlalchemy import inspect, text
+
+        columns = {c["name"] for c in inspect(self.engine).get_columns(self.table.name)}
+        if self.label_column not in columns:
+            logger.info(f"Adding column {self.table.name}.{self.label_column}")
+            with self.engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {self.table.name} ADD COLUMN {self.label_column} INTEGER"))
+                # Same index name the backend model declares (index=True), so neither side duplicates it
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS ix_{self.table.name}_{self.label_column} "
+                    f"ON {self.table.name} ({self.label_column})"
+                ))
+
+    def write_labels(self, ids_path: str, labels: np.ndarray, output: Optional[str], chunk_size: int) -> int:
+        from sqlalchemy import text
+
+        self._ensure_label_column()
+        # Plain SQL: the table was reflected before the label column may have been added
+        stmt = text(
+            f"UPDATE {self.table.name} SET {self.label_column} = :_label WHERE {self.id_column} = :_id"
+        )
+
+        written = 0
+        for ids, start in _iter_ids(ids_path, chunk_size):
+            params = [
+                {"_id": item_id, "_label": int(label)}
+                for item_id, label in zip(ids, labels[start:start + len(ids)])
+            ]
+            with self.engine.begin() as conn:
+                conn.execute(stmt, params)
+            written += len(ids)
+        return written
+
+
+def _iter_ids(ids_path: str, chunk_size: int) -> Iterator[Tuple[List[Any], int]]:
+    """Stream ids back from the job's ids file in chunks, with their starting row"""
+    start = 0
+    chunk = []
+    with open(ids_path, "r", encoding="utf-8") as f:
+        for line in f:
+            chunk.append(json.loads(line))
+            if len(chunk) >= chunk_size:
+                yield chunk, start
+                start += len(chunk)
+                chunk = []
+    if chunk:
+        yield chunk, start
+
+
+# ----------------------------------------------------------------------
+# Job
+# ----------------------------------------------------------------------
+class ArchiveClusteringJob:
+    """
+    Fixed-memory clustering of an arbitrarily large text archive.
+
+    Embeddings go to a float32 .npy memmap in work_dir and ids to a JSON-lines file,
+    so RAM holds only one chunk of texts, the k-selection sample and the model.
+    """
+
+    def __init__(
+        self,
+        work_dir: str = "ai_service/data/jobs/cluster_archive",
+        embedding_model: str = "all-MiniLM-L6-v2",
+        chunk_size: int = 2048,
+        embed_batch_size: int = 64,
+        use_embedding_cache: bool = False
+    ):
+        """
+        Args:
+            work_dir: Directory for the embedding memmap, ids, labels and the summary
+            embedding_model: Sentence transformer model for embeddings
+            chunk_size: Rows per streamed chunk (texts embedded, labels predicted and written)
+            embed_batch_size: Encoder batch size
+            use_embedding_cache: Read/write the shared embedding store while embedding
+        """
+        self.work_dir = work_dir
+        self.embedding_model = embedding_model
+        self.chunk_size = chunk_size
+        self.embed_batch_size = embed_batch_size
+        self.use_embedding_cache = use_embedding_cache
+        os.makedirs(work_dir, exist_ok=True)
+
+        self.embeddings_path = os.path.join(work_dir, "embeddings.npy")
+        self.ids_path = os.path.join(work_dir, "ids.jsonl")
+        self.labels_path = os.path.join(work_dir, "labels.npy")
+        self.summary_path = os.path.join(work_dir, "summary.json")
+
+    # -- embedding -------------------------------------------------------
+    def embed(self, source) -> np.memmap:
+        """Stream the source into an (n, d) memory-mapped embedding matrix"""
+        from ai_service.pipelines.cluster import ClusteringPipeline
+
+        pipeline = ClusteringPipeline(embedding_model=self.embedding_model)
+        dim = pipeline.embedding_model.get_sentence_embedding_dimension()
+        total = source.count()
+        logger.info(f"Embedding {total} records into {self.embeddings_path}")
+
+        matrix = np.lib.format.open_memmap(self.embeddings_path, mode="w+", dtype=np.float32, shape=(total, dim))
+        row = 0
+        with open(self.ids_path, "w", encoding="utf-8") as ids_file:
+            for chunk in source.iter_chunks(self.chunk_size):
+                chunk = chunk[:total - row]  # rows added after count() are left for the next run
+                if not chunk:
+                    break
+                texts = [text for _, text in chunk]
+                vectors = pipeline.generate_embeddings(
+                    texts, batch_size=self.embed_batch_size, use_cache=self.use_embedding_cache
+                )
+                matrix[row:row + len(chunk)] = l2_normalize(vectors)
+                ids_file.write("".join(json.dumps(item_id) + "\n" for item_id, _ in chunk))
+                row += len(chunk)
+                if (row // self.chunk_size) % 50 == 0:
+                    logger.info(f"Embedded {row}/{total}")
+
+        matrix.flush()
+        del matrix
+        return np.load(self.embeddings_path, mmap_mode="r")[:row]
+
+    def load_embeddings(self) -> np.memmap:
+        """Reuse embeddings from a previous run"""
+        return np.load(self.embeddings_path, mmap_mode="r")
+
+    # -- k selection -----------------------------------------------------
+    def _sample(self, embeddings: np.ndarray, size: int, seed: int = 42) -> np.ndarray:
+        if len(embeddings) <= size:
+            return np.asarray(embeddings)
+        rows = np.sort(np.random.default_rng(seed).choice(len(embeddings), size, replace=False))
+        return np.asarray(embeddings[rows])
+
+    def select_k(
+        self,
+        embeddings: np.ndarray,
+        k_min: int = 2,
+        k_max: int = 100,
+        n_candidates: int = 12,
+        sample_size: int = 20000,
+        silhouette_sample: int = 5000
+    ) -> Tuple[int, Dict[int, float]]:
+        """
+        Pick k by silhouette score of MiniBatchKMeans fits on a sample
+
+        Candidates are spaced geometrically between k_min and k_max.
+
+        Returns:
+            (best k, silhouette score per candidate k)
+        """
+        sample = self._sample(embeddings, sample_size)
+        k_max = min(k_max, len(sample) - 1)
+        if k_max <= k_min:
+            return max(1, min(k_min, len(sample))), {}
+
+        candidates = np.unique(np.geomspace(k_min, k_max, num=n_candidates).round().astype(int))
+        scores = {}
+        for k in candidates:
+            model = MiniBatchKMeans(n_clusters=int(k), batch_size=self.chunk_size, n_init=3, random_state=42)
+            labels = model.fit_predict(sample)
+            if len(np.unique(labels)) < 2:
+                continue
+            scores[int(k)] = float(silhouette_score(
+                sample, labels, sample_size=min(silhouette_sample, len(sample)), random_state=42
+            ))
+            logger.info(f"k={k}: silhouette={scores[int(k)]:.4f}")
+
+        best_k = max(scores, key=scores.get) if scores else k_min
+        return best_k, scores
+
+    # -- clustering ------------------------------------------------------
+    def cluster_minibatch(self, embeddings: np.ndarray, k: int, epochs: int = 2) -> np.ndarray:
+        """MiniBatchKMeans trained chunk by chunk over the memmap, then chunked assignment"""
+        model = MiniBatchKMeans(n_clusters=k, batch_size=self.chunk_size, n_init=3, random_state=42)
+        # Seed centroids from a sample so partial_fit starts from a sensible init
+        model.fit(self._sample(embeddings, max(k * 20, self.chunk_size)))
+
+        rng = np.random.default_rng(42)
+        starts = np.arange(0, len(embeddings), self.chunk_size)
+        for epoch in range(epochs):
+            for start in rng.permutation(starts):
+                model.partial_fit(np.asarray(embeddings[start:start + self.chunk_size]))
+            logger.info(f"MiniBatchKMeans epoch {epoch + 1}/{epochs} done")
+
+        return self._assign(embeddings, model.predict)
+
+    def cluster_hdbscan(
+        self,
+        embeddings: np.ndarray,
+        sample_size: int = 20000,
+        min_cluster_size: int = 10,
+        min_samples: int = 5,
+        n_components: int = 5
+    ) -> np.ndarray:
+        """HDBSCAN fitted on a sample, every row assigned with approximate_predict (-1 = noise)"""
+        from ai_service.pipelines.cluster_model import PersistentClusterModel
+
+        model = PersistentClusterModel(path=os.path.join(self.work_dir, "hdbscan_model"))
+        model.fit(
+            self._sample(embeddings, sample_size),
+            n_components=n_components,
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            sample_size=sample_size
+        )
+        return self._assign(embeddings, lambda chunk: model.predict(chunk)[0])
+
+    def _assign(self, embeddings: np.ndarray, predict) -> np.memmap:
+        labels = np.lib.format.open_memmap(self.labels_path, mode="w+", dtype=np.int32, shape=(len(embeddings),))
+        for start in range(0, len(embeddings), self.chunk_size):
+            labels[start:start + self.chunk_size] = predict(np.asarray(embeddings[start:start + self.chunk_size]))
+        labels.flush()
+        return labels
+
+    # -- run -------------------------------------------------------------
+    def run(
+        self,
+        source,
+        method: str = "minibatch",
+        k: Optional[int] = None,
+        k_min: int = 2,
+        k_max: int = 100,
+        sample_size: int = 20000,
+        epochs: int = 2,
+        min_cluster_size: int = 10,
+        output: Optional[str] = None,
+        reuse_embeddings: bool = False,
+        write_back: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Embed, cluster and write labels back
+
+        Returns:
+            Job summary (also written to summary.json in work_dir)
+        """
+        started = time.time()
+        if reuse_embeddings and os.path.exists(self.embeddings_path):
+            embeddings = self.load_embeddings()
+        else:
+            embeddings = self.embed(source)
+        embedded_at = time.time()
+
+        summary: Dict[str, Any] = {"method": method, "num_records": int(len(embeddings))}
+        if len(embeddings) == 0:
+            logger.warning("Nothing to cluster")
+            return summary
+
+        if method == "minibatch":
+            if k is None:
+                k, scores = self.select_k(embeddings, k_min=k_min, k_max=k_max, sample_size=sample_size)
+                summary["silhouette_by_k"] = scores
+            summary["k"] = int(k)
+            labels = self.cluster_minibatch(embeddings, int(k), epochs=epochs)
+        elif method == "hdbscan":
+            labels = self.cluster_hdbscan(embeddings, sample_size=sample_size, min_cluster_size=min_cluster_size)
+        else:
+            raise ValueError(f"Unknown method '{method}'. Use 'minibatch' or 'hdbscan'")
+        clustered_at = time.time()
+
+        sizes = np.bincount(labels[labels >= 0]) if (labels >= 0).any() else np.array([], dtype=int)
+        summary.update({
+            "num_clusters": int((sizes > 0).sum()),
+            "num_noise_points": int((labels < 0).sum()),
+            "largest_clusters": sorted(((int(c), int(s)) for c, s in enumerate(sizes) if s), key=lambda x: -x[1])[:20],
+            "embed_seconds": round(embedded_at - started, 1),
+            "cluster_seconds": round(clustered_at - embedded_at, 1)
+        })
+
+        if write_back:
+            summary["labels_written"] = source.write_labels(self.ids_path, labels, output, self.chunk_size)
+        summary["total_seconds"] = round(time.time() - started, 1)
+
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        logger.info(f"Archive clustering done: {summary['num_clusters']} clusters in {summary['total_seconds']}s")
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Cluster the report/news archive in fixed memory")
+    parser.add_argument("--source", choices=["db", "jsonl"], default="db")
+    parser.add_argument("--db-url", default=os.getenv("DATABASE_URL"), help="SQLAlchemy URL (default: $DATABASE_URL)")
+    parser.add_argument("--table", default="reports")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="cluster_id")
+    parser.add_argument("--input", help="JSONL input file (--source jsonl)")
+    parser.add_argument("--output", help="JSONL file for {id, cluster_id} labels (--source jsonl)")
+    parser.add_argument("--method", choices=["minibatch", "hdbscan"], default="minibatch")
+    parser.add_argument("--k", type=int, help="Number of clusters (chosen by silhouette if omitted)")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=100)
+    parser.add_argument("--sample-size", type=int, default=20000, help="Rows used for k selection / HDBSCAN fit")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--min-cluster-size", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=2048)
+    parser.add_argument("--batch-size", type=int, default=64, help="Encoder batch size")
+    parser.add_argument("--work-dir", default="ai_service/data/jobs/cluster_archive")
+    parser.add_argument("--reuse-embeddings", action="store_true", help="Skip embedding and reuse the previous run's memmap")
+    parser.add_argument("--use-embedding-cache", action="store_true")
+    parser.add_argument("--dry-run", action="store_true", help="Do not write labels back")
+    args = parser.parse_args(argv)
+
+    if args.source == "jsonl":
+        if not args.input:
+            parser.error("--input is required with --source jsonl")
+        source = JSONLSource(args.input, id_field=args.id_column, text_field=args.text_column)
+        output = args.output or os.path.join(args.work_dir, "labels.jsonl")
+    else:
+        if not args.db_url:
+            parser.error("--db-url or DATABASE_URL is required with --source db")
+        source = DatabaseSource(
+            args.db_url,
+            table=args.table,
+            id_column=args.id_column,
+            text_column=args.text_column,
+            label_column=args.label_column
+        )
+        output = None
+
+    job = ArchiveClusteringJob(
+        work_dir=args.work_dir,
+        chunk_size=args.chunk_size,
+        embed_batch_size=args.batch_size,
+        use_embedding_cache=args.use_embedding_cache
+    )
+    summary = job.run(
+        source,
+        method=args.method,
+        k=args.k,
+        k_min=args.k_min,
+        k_max=args.k_max,
+        sample_size=args.sample_size,
+        epochs=args.epochs,
+        min_cluster_size=args.min_cluster_size,
+        output=output,
+        reuse_embeddings=args.reuse_embeddings,
+        write_back=not args.dry_run
+    )
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
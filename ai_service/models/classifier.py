@@ -130,39 +130,9 @@ class CategoryClassifier:
                     scores.append(entailment_score)
                     # logger.debug(f"Label: {category}, Score: {entailment_score:.4f}")
             
-            # Normalize scores (Softmax over entailment scores for competition between labels)
-            scores = np.array(scores)
-            # Log raw scores for debugging if it's suspicious
-            if scores.max() < 0.2:
-                logger.warning(f"Low confidence classification. Top raw score: {scores.max():.4f}")
-            
-            exp_scores = np.exp(scores - np.max(scores))
-            normalized_scores = exp_scores / exp_scores.sum()
-            
-            # Get top categories
-            top_indices = np.argsort(normalized_scores)[::-1][:top_k]
-            top_categories = [
-                {
-                    "category": target_categories[idx],
-                    "confidence": float(normalized_scores[idx]),
-                    "raw_score": float(scores[idx])
-                }
-                for idx in top_indices
-                if normalized_scores[idx] >= threshold
-            ]
-            
-            # Get primary category
-            primary_idx = top_indices[0]
-            primary_category = target_categories[primary_idx]
-            primary_confidence = float(normalized_scores[primary_idx])
-            
-            logger.info(f"Classified as '{primary_category}' with confidence {primary_confidence:.3f}")
-            
-            return {
-                "category": primary_category,
-                "confidence": primary_confidence,
-                "top_categories": top_categories
-            }
+            result = self._rank_scores(np.array(scores), target_categories, top_k, threshold)
+            logger.info(f"Classified as '{result['category']}' with confidence {result['confidence']:.3f}")
+            return result
             
         except Exception as e:
             logger.error(f"Classification failed: {e}")
@@ -173,29 +143,119 @@ class CategoryClassifier:
                 "error": str(e)
             }
     
+    def _rank_scores(
+        self,
+        scores: np.ndarray,
+        target_categories: List[str],
+        top_k: int,
+        threshold: float
+    ) -> Dict[str, any]:
+        """
+        Turn raw entailment scores for one text into the classification result
+        """
+        # Log raw scores for debugging if it's suspicious
+        if scores.max() < 0.2:
+            logger.warning(f"Low confidence classification. Top raw score: {scores.max():.4f}")
+        
+        # Normalize scores (Softmax over entailment scores for competition between labels)
+        exp_scores = np.exp(scores - np.max(scores))
+        normalized_scores = exp_scores / exp_scores.sum()
+        
+        # Get top categories
+        top_indices = np.argsort(normalized_scores)[::-1][:top_k]
+        top_categories = [
+            {
+                "category": target_categories[idx],
+                "confidence": float(normalized_scores[idx]),
+                "raw_score": float(scores[idx])
+            }
+            for idx in top_indices
+            if normalized_scores[idx] >= threshold
+        ]
+        
+        # Get primary category
+        primary_idx = top_indices[0]
+        return {
+            "category": target_categories[primary_idx],
+            "confidence": float(normalized_scores[primary_idx]),
+            "top_categories": top_categories
+        }
+    
     def batch_classify(
         self,
         texts: List[str],
         top_k: int = 3,
-        threshold: float = 0.1
+        threshold: float = 0.1,
+        categories: Optional[List[str]] = None,
+        hypothesis_template: str = "This text is about {}.",
+        batch_size: int = 16
     ) -> List[Dict[str, any]]:
         """
-        Classify multiple texts
+        Classify many texts with padded, batched NLI forward passes
+        
+        Every (text, hypothesis) pair is scored in chunks of batch_size pairs,
+        then ranked exactly like classify().
         
         Args:
-            texts: List of texts to classify
+            texts: Input texts to classify
             top_k: Number of top categories to return
             threshold: Minimum confidence threshold
+            categories: Candidate labels (defaults to the classifier's categories)
+            hypothesis_template: NLI hypothesis template
+            batch_size: Number of (text, hypothesis) pairs per forward pass
             
         Returns:
-            List of classification results
+            List of classification results, aligned with texts
         """
-        results = []
-        for text in texts:
-            result = self.classify(text, top_k=top_k, threshold=threshold)
-            results.append(result)
+        target_categories = categories or self.categories
+        hypotheses = [hypothesis_template.format(c) for c in target_categories]
+        cleaned = [self.preprocessor.clean_text(t) for t in texts]
+        
+        results: List[Optional[Dict[str, any]]] = [None] * len(texts)
+        valid = [i for i, t in enumerate(cleaned) if t]
+        for i in range(len(texts)):
+            if not cleaned[i]:
+                results[i] = {"category": "Other", "confidence": 0.0, "top_categories": []}
         
-        return results
+        if not valid:
+            return results
+        
+        try:
+            pairs = [(cleaned[i], h) for i in valid for h in hypotheses]
+            entailment = np.empty(len(pairs), dtype=np.float64)
+            
+            for start in range(0, len(pairs), batch_size):
+                chunk = pairs[start:start + batch_size]
+                inputs = self.tokenizer(
+                    [p[0] for p in chunk],
+                    [p[1] for p in chunk],
+                    return_tensors="pt",
+                    truncation=True,
+                    padding=True,
+                    max_length=512
+                ).to(self.device)
+                
+                with torch.no_grad():
+                    probs = torch.softmax(self.model(**inputs).logits, dim=1)
+                entailment[start:start + len(chunk)] = probs[:, self.entailment_idx].cpu().numpy()
+            
+            scores = entailment.reshape(len(valid), len(hypotheses))
+            for row, i in enumerate(valid):
+                results[i] = self._rank_scores(scores[row], target_categories, top_k, threshold)
+            
+            logger.info(f"Batch classified {len(valid)} texts over {len(hypotheses)} labels")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Batch classification failed: {e}")
+            for i in valid:
+                results[i] = {
+                    "category": "Other",
+                    "confidence": 0.0,
+                    "top_categories": [],
+                    "error": str(e)
+                }
+            return results
     
     def add_category(self, category: str) -> None:
         """
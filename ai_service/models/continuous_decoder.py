@@ -0,0 +1,340 @@
+"""
+Continuous Batching Decoder
+Greedy seq2seq generation that admits and retires sequences at every decoding step
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+import torch
+import torch.nn.functional as F
+from loguru import logger
+
+
+class _Sequence:
+    """Decoding state of one request: its encoder output, KV caches and tokens so far"""
+
+    def __init__(self, text: str, max_length: int, min_length: int, future: Future):
+        self.text = text
+        self.max_length = max_length
+        self.min_length = min_length
+        self.future = future
+        self.submitted = time.time()
+
+        self.encoder: Optional[torch.Tensor] = None  # (1, enc_len, hidden)
+        self.enc_len = 0
+        self.self_kv: List[Tuple[torch.Tensor, torch.Tensor]] = []  # per layer, (1, heads, len(tokens), head_dim)
+        self.cross_kv: List[Tuple[torch.Tensor, torch.Tensor]] = []  # per layer, (1, heads, enc_len, head_dim)
+        self.tokens: List[int] = []
+        self.ngrams: Dict[Tuple[int, ...], Set[int]] = {}
+
+    @property
+    def length(self) -> int:
+        """Decoder tokens fed so far (= self-attention cache length)"""
+        return len(self.tokens)
+
+
+class ContinuousBatchDecoder:
+    """
+    Serves generate requests for one encoder-decoder model with continuous batching.
+
+    A single loop keeps up to max_slots sequences in flight. At every step it encodes
+    newly submitted requests into free slots, runs one decoder step for all active
+    sequences together (per-sequence self/cross KV caches are padded into a batch and
+    sliced back out), and retires sequences as soon as they emit EOS or reach their
+    max_length, so short summaries never wait for long ones.
+
+    Decoding is greedy with the same repetition penalty, no-repeat n-gram and
+    min/max length rules the summarizer passes to generate(). Supported for models
+    with learned absolute decoder positions (BART family), whose position lookup
+    is overridden per sequence because padded sequences sit at different offsets.
+    """
+
+    def __init__(
+        self,
+        model,
+        tokenizer,
+        device: str,
+        max_slots: int = 16,
+        max_input_tokens: int = 1024,
+        no_repeat_ngram_size: int = 3,
+        repetition_penalty: float = 1.2,
+        idle_seconds: float = 30.0
+    ):
+        """
+        Args:
+            model: Seq2seq model (see supports())
+            tokenizer: Its tokenizer
+            device: Device the model is on
+            max_slots: Most sequences decoded together
+            max_input_tokens: Inputs are truncated to this many tokens
+            no_repeat_ngram_size: Never repeat an n-gram of this size (0 = off)
+            repetition_penalty: Penalty on logits of already generated tokens
+            idle_seconds: The loop thread exits after this long without work
+        """
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.max_slots = max_slots
+        self.max_input_tokens = max_input_tokens
+        self.no_repeat_ngram_size = no_repeat_ngram_size
+        self.repetition_penalty = repetition_penalty
+        self.idle_seconds = idle_seconds
+
+        config = model.config
+        self.start_id = config.decoder_start_token_id
+        self.eos_id = config.eos_token_id
+        self.forced_bos_id = getattr(config, "forced_bos_token_id", None)
+        self.forced_eos_id = getattr(config, "forced_eos_token_id", None)
+
+        self._positions = threading.local()
+        self._install_position_override()
+        self._cache_cls = None
+
+        self._pending: Deque[_Sequence] = deque()
+        self._active: List[_Sequence] = []
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+        self.steps = 0
+        self.tokens_generated = 0
+        self.completed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._slot_steps = 0
+
+    @staticmethod
+    def supports(model) -> bool:
+        """Whether the model's decoder uses learned absolute positions that can be overridden"""
+        if not getattr(model.config, "is_encoder_decoder", False) or not hasattr(model, "get_decoder"):
+            return False
+        embed = getattr(model.get_decoder(), "embed_positions", None)
+        return embed is not None and hasattr(embed, "weight") and hasattr(embed, "offset")
+
+    def _install_position_override(self) -> None:
+        """
+        Look up decoder positions per sequence while this decoder's loop is stepping.
+
+        The stock embedding derives one position for the whole batch from the cache
+        length; left-padded sequences need their own. Other threads (and generate())
+        see the original behaviour.
+        """
+        embed = self.model.get_decoder().embed_positions
+        original = embed.forward
+        local = self._positions
+
+        def forward(*args, **kwargs):
+            positions = getattr(local, "positions", None)
+            if positions is None:
+                return original(*args, **kwargs)
+            return F.embedding(positions + embed.offset, embed.weight)
+
+        embed.forward = forward
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def submit(self, text: str, max_length: int = 150, min_length: int = 30) -> Future:
+        """Queue a text for generation; the Future resolves with the decoded output"""
+        future: Future = Future()
+        with self._cond:
+            self._pending.append(_Sequence(text, max_length, min_length, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="continuous-decoder", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._pending and not self._active:
+                    self._cond.wait(self.idle_seconds)
+                    if not self._pending:
+                        # Exit when idle so an evicted model is not kept alive by this thread
+                        self._thread = None
+                        return
+                admitted = []
+                while self._pending and len(self._active) + len(admitted) < self.max_slots:
+                    admitted.append(self._pending.popleft())
+
+            start = time.time()
+            try:
+                with torch.no_grad():
+                    running = list(self._active)
+                    if admitted:
+                        self._prefill(admitted)
+                    if running:
+                        self._step(running)
+                    self._active = running + admitted
+                    self._retire()
+            except Exception as e:
+                logger.error(f"Continuous decoding step failed: {e}")
+                for seq in self._active + admitted:
+                    if not seq.future.done():
+                        seq.future.set_exception(e)
+                        self.failed += 1
+                self._active = []
+            finally:
+                self._positions.positions = None
+                self.busy_seconds += time.time() - start
+
+    # ------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------
+    def _legacy(self, past) -> tuple:
+        if hasattr(past, "to_legacy_cache"):
+            self._cache_cls = type(past)
+            return past.to_legacy_cache()
+        return past
+
+    def _wrap(self, legacy: tuple):
+        if self._cache_cls is not None and hasattr(self._cache_cls, "from_legacy_cache"):
+            return self._cache_cls.from_legacy_cache(legacy)
+        return legacy
+
+    def _prefill(self, seqs: List[_Sequence]) -> None:
+        """Encode new sequences together and run their first decoder step"""
+        inputs = self.tokenizer(
+            [seq.text for seq in seqs],
+            max_length=self.max_input_tokens,
+            truncation=True,
+            padding=True,
+            return_tensors="pt"
+        ).to(self.device)
+        encoder = self.model.get_encoder()(
+            input_ids=inputs["input_ids"],
+            attention_mask=inputs["attention_mask"]
+        ).last_hidden_state
+
+        for seq in seqs:
+            seq.tokens = [self.start_id]
+        self._positions.positions = torch.zeros((len(seqs), 1), dtype=torch.long, device=self.device)
+        outputs = self.model(
+            encoder_outputs=(encoder,),
+            attention_mask=inputs["attention_mask"],
+            decoder_input_ids=torch.full((len(seqs), 1), self.start_id, dtype=torch.long, device=self.device),
+            use_cache=True
+        )
+        past = self._legacy(outputs.past_key_values)
+
+        lengths = inputs["attention_mask"].sum(dim=1).tolist()
+        for j, seq in enumerate(seqs):
+            seq.enc_len = int(lengths[j])
+            # Right padding: a sequence's own encoder positions come first
+            seq.encoder = encoder[j:j + 1, :seq.enc_len]
+            seq.self_kv = [(layer[0][j:j + 1], layer[1][j:j + 1]) for layer in past]
+            seq.cross_kv = [(layer[2][j:j + 1, :, :seq.enc_len], layer[3][j:j + 1, :, :seq.enc_len]) for layer in past]
+        self._advance(seqs, outputs.logits[:, -1, :])
+
+    def _step(self, seqs: List[_Sequence]) -> None:
+        """One decoder step for all active sequences with their caches padded into a batch"""
+        longest = max(seq.length for seq in seqs)
+        enc_longest = max(seq.enc_len for seq in seqs)
+
+        def left_pad(t: torch.Tensor, length: int) -> torch.Tensor:
+            return F.pad(t, (0, 0, longest - length, 0))
+
+        def right_pad(t: torch.Tensor, length: int) -> torch.Tensor:
+            return F.pad(t, (0, 0, 0, enc_longest - length))
+
+        past = []
+        for layer in range(len(seqs[0].self_kv)):
+            past.append((
+                torch.cat([left_pad(seq.self_kv[layer][0], seq.length) for seq in seqs]),
+                torch.cat([left_pad(seq.self_kv[layer][1], seq.length) for seq in seqs]),
+                torch.cat([right_pad(seq.cross_kv[layer][0], seq.enc_len) for seq in seqs]),
+                torch.cat([right_pad(seq.cross_kv[layer][1], seq.enc_len) for seq in seqs])
+            ))
+
+        encoder = torch.cat([F.pad(seq.encoder, (0, 0, 0, enc_longest - seq.enc_len)) for seq in seqs])
+        encoder_mask = torch.zeros((len(seqs), enc_longest), dtype=torch.long, device=self.device)
+        decoder_mask = torch.zeros((len(seqs), longest + 1), dtype=torch.long, device=self.device)
+        for j, seq in enumerate(seqs):
+            encoder_mask[j, :seq.enc_len] = 1
+            decoder_mask[j, longest - seq.length:] = 1
+
+        self._positions.positions = torch.tensor(
+            [[seq.length] for seq in seqs], dtype=torch.long, device=self.device
+        )
+        outputs = self.model(
+            encoder_outputs=(encoder,),
+            attention_mask=encoder_mask,
+            decoder_input_ids=torch.tensor([[seq.tokens[-1]] for seq in seqs], dtype=torch.long, device=self.device),
+            decoder_attention_mask=decoder_mask,
+            past_key_values=self._wrap(tuple(past)),
+            use_cache=True
+        )
+        new_past = self._legacy(outputs.past_key_values)
+
+        for j, seq in enumerate(seqs):
+            keep = longest - seq.length  # drop this sequence's left padding
+            seq.self_kv = [(layer[0][j:j + 1, :, keep:], layer[1][j:j + 1, :, keep:]) for layer in new_past]
+        self._advance(seqs, outputs.logits[:, -1, :])
+        self.steps += 1
+        self._slot_steps += len(seqs)
+
+    def _advance(self, seqs: List[_Sequence], logits: torch.Tensor) -> None:
+        """Pick each sequence's next token (greedy) under the generation rules"""
+        logits = logits.float()
+        for j, seq in enumerate(seqs):
+            scores = logits[j]
+            cur_len = seq.length
+
+            if self.repetition_penalty != 1.0:
+                seen = torch.tensor(sorted(set(seq.tokens)), dtype=torch.long, device=scores.device)
+                penalized = scores[seen]
+                scores[seen] = torch.where(
+                    penalized < 0, penalized * self.repetition_penalty, penalized / self.repetition_penalty
+                )
+            n = self.no_repeat_ngram_size
+            if n and cur_len >= n:
+                banned = seq.ngrams.get(tuple(seq.tokens[-(n - 1):]), ())
+                if banned:
+                    scores[list(banned)] = -float("inf")
+            if cur_len < seq.min_length and self.eos_id is not None:
+                scores[self.eos_id] = -float("inf")
+
+            if cur_len == 1 and self.forced_bos_id is not None:
+                token = self.forced_bos_id
+            elif cur_len == seq.max_length - 1 and self.forced_eos_id is not None:
+                token = self.forced_eos_id
+            else:
+                token = int(torch.argmax(scores))
+
+            seq.tokens.append(token)
+            if n and len(seq.tokens) >= n:
+                seq.ngrams.setdefault(tuple(seq.tokens[-n:-1]), set()).add(token)
+            self.tokens_generated += 1
+
+    def _retire(self) -> None:
+        """Resolve and free sequences that emitted EOS or reached max_length"""
+        still_active = []
+        for seq in self._active:
+            if seq.tokens[-1] == self.eos_id or seq.length >= seq.max_length:
+                text = self.tokenizer.decode(
+                    seq.tokens,
+                    skip_special_tokens=True,
+                    clean_up_tokenization_spaces=True
+                ).strip()
+                seq.future.set_result(text)
+                self.completed += 1
+            else:
+                still_active.append(seq)
+        self._active = still_active
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput and occupancy counters"""
+        with self._cond:
+            return {
+                "active": len(self._active),
+                "pending": len(self._pending),
+                "max_slots": self.max_slots,
+                "completed": self.completed,
+                "failed": self.failed,
+                "steps": self.steps,
+                "tokens_generated": self.tokens_generated,
+                "avg_active_slots": round(self._slot_steps / self.steps, 2) if self.steps else None,
+                "tokens_per_second": round(self.tokens_generated / self.busy_seconds, 1) if self.busy_seconds else None
+            }
@@ -52,51 +52,86 @@ class EntityExtractor:
             return []
             
         try:
-            results = self.ner_pipeline(text)
-            entities = []
+            return self._clean_entities(self.ner_pipeline(text))
+        except Exception as e:
+            logger.error(f"NER extraction failed: {e}")
+            return []
 
-            for res in results:
-                word = res["word"].replace(" ", " ").strip()
-                label = res["entity_group"]
-                
-                # Cleanup common subword artifacts if any remain
-                if word.startswith("##"):
-                    if entities:
-                        entities[-1]["entity"] += word[2:]
-                    continue
-                
-                # Skip artifacts
-                if word in ["[SEP]", "[CLS]", "[PAD]"] or len(word) < 2:
-                    continue
+    def extract_entities_batch(self, texts: List[str], batch_size: int = 16) -> List[List[Dict]]:
+        """
+        Extract entities from many texts with batched forward passes
+        """
+        entities: List[List[Dict]] = [[] for _ in texts]
+        todo = [i for i, t in enumerate(texts) if t and len(t.strip()) >= 5]
+        if not todo:
+            return entities
+
+        try:
+            outputs = self.ner_pipeline([texts[i] for i in todo], batch_size=batch_size)
+            for i, results in zip(todo, outputs):
+                entities[i] = self._clean_entities(results)
+        except Exception as e:
+            logger.error(f"Batch NER extraction failed, extracting one by one: {e}")
+            for i in todo:
+                entities[i] = self.extract_entities(texts[i])
+        return entities
+
+    def _clean_entities(self, results: List[Dict]) -> List[Dict]:
+        """Merge subword artifacts and deduplicate raw pipeline output"""
+        entities = []
 
-                entities.append({
-                    "entity": word.strip(",. "),
-                    "label": label,
-                    "confidence": float(res["score"]),
-                    "start": res["start"],
-                    "end": res["end"]
-                })
+        for res in results:
+            word = res["word"].replace(" ", " ").strip()
+            label = res["entity_group"]
+            
+            # Cleanup common subword artifacts if any remain
+            if word.startswith("##"):
+                if entities:
+                    entities[-1]["entity"] += word[2:]
+                continue
             
-            # Deduplication logic with position awareness
-            unique_entities = []
-            seen_entities = set()
+            # Skip artifacts
+            if word in ["[SEP]", "[CLS]", "[PAD]"] or len(word) < 2:
+                continue
 
-            for ent in entities:
-                key = (ent["entity"].lower(), ent["label"])
-                if key not in seen_entities:
-                    unique_entities.append(ent)
-                    seen_entities.add(key)
-                    
-            return unique_entities
-        except Exception as e:
-            logger.error(f"NER extraction failed: {e}")
-            return []
+            entities.append({
+                "entity": word.strip(",. "),
+                "label": label,
+                "confidence": float(res["score"]),
+                "start": res["start"],
+                "end": res["end"]
+            })
+        
+        # Deduplication logic with position awareness
+        unique_entities = []
+        seen_entities = set()
+
+        for ent in entities:
+            key = (ent["entity"].lower(), ent["label"])
+            if key not in seen_entities:
+                unique_entities.append(ent)
+                seen_entities.add(key)
+                
+        return unique_entities
 
-    def get_locations(self, text: str) -> List[str]:
-        """Helper to specifically get location entities with cleaning"""
+    def get_locations(self, text: str, entities: Optional[List[Dict]] = None) -> List[str]:
+        """
+        Helper to specifically get location entities with cleaning
+        (pass already extracted entities to skip the model pass)
+        """
         # Start with model entities
-        entities = self.extract_entities(text)
+        if entities is None:
+            entities = self.extract_entities(text)
         raw_locations = [ent["entity"] for ent in entities if ent["label"] in ["LOC", "GPE"]]
+        return self.rule_locations(text, raw_locations)
+
+    @staticmethod
+    def rule_locations(text: str, raw_locations: Optional[List[str]] = None) -> List[str]:
+        """
+        Regex location matches merged with raw_locations, normalized and deduplicated
+        (no model needed)
+        """
+        raw_locations = list(raw_locations or [])
         
         # Add regex matches
         import re
@@ -8,6 +8,7 @@ from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from loguru import logger
 
 from ai_service.utils import TextPreprocessor, get_device
+from ai_service.models.continuous_decoder import ContinuousBatchDecoder
 
 
 class TextSummarizer:
@@ -18,7 +19,9 @@ class TextSummarizer:
     def __init__(
         self,
         model_name: str = "facebook/bart-large-cnn",
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        continuous_batching: bool = False,
+        max_slots: int = 16
     ):
         """
         Initialize the summarizer
@@ -27,6 +30,10 @@ class TextSummarizer:
             model_name: Hugging Face model name for summarization
                        Default: facebook/bart-large-cnn (~1.6GB, state-of-the-art for abstraction)
             device: Device to run model on ('cuda' or 'cpu')
+            continuous_batching: Serve greedy summaries (num_beams=1, the default when
+                                 enabled) from a shared continuous-batching decoder;
+                                 calls asking for num_beams > 1 still use beam search
+            max_slots: Sequences the continuous-batching decoder keeps in flight
         """
         self.device = device or get_device()
         self.preprocessor = TextPreprocessor()
@@ -42,19 +49,43 @@ class TextSummarizer:
         except Exception as e:
             logger.error(f"Failed to load summarization model: {e}")
             raise
+        
+        self.decoder = None
+        if continuous_batching and ContinuousBatchDecoder.supports(self.model):
+            self.decoder = ContinuousBatchDecoder(
+                self.model,
+                self.tokenizer,
+                self.device,
+                max_slots=max_slots
+            )
+            logger.info(f"Continuous batching enabled ({max_slots} slots)")
+        # Greedy requests are what the continuous decoder serves; otherwise keep beam search
+        self.default_num_beams = 1 if self.decoder is not None else 5
+    
+    @staticmethod
+    def _result(cleaned_text: str, summary: str) -> Dict[str, any]:
+        original_length = len(cleaned_text)
+        return {
+            "summary": summary,
+            "original_length": original_length,
+            "summary_length": len(summary),
+            "compression_ratio": len(summary) / original_length if original_length > 0 else 0.0
+        }
     
     def summarize(
         self,
         text: str,
         max_length: int = 200,
         min_length: int = 50,
-        num_beams: int = 5,
+        num_beams: Optional[int] = None,
         length_penalty: float = 1.0,
         early_stopping: bool = True
     ) -> Dict[str, any]:
         """
         Generate summary of input text with optimized parameters
+        (num_beams defaults to 1 with continuous batching, else 5)
         """
+        num_beams = num_beams or self.default_num_beams
         # Preprocess text
         cleaned_text = self.preprocessor.clean_text(text)
         
@@ -73,33 +104,41 @@ class TextSummarizer:
             if "t5" in self.model.config.model_type.lower():
                 input_text = "summarize: " + cleaned_text
             
-            # Tokenize input
-            inputs = self.tokenizer(
-                input_text,
-                max_length=1024,
-                truncation=True,
-                return_tensors="pt"
-            ).to(self.device)
+            summary = None
+            if self.decoder is not None and num_beams == 1:
+                try:
+                    summary = self.decoder.submit(input_text, max_length=max_length, min_length=min_length).result()
+                except Exception as e:
+                    logger.warning(f"Continuous batching failed, falling back to generate(): {e}")
             
-            # Generate summary
-            with torch.no_grad():
-                summary_ids = self.model.generate(
-                    inputs["input_ids"],
-                    max_length=max_length,
-                    min_length=min_length,
-                    num_beams=num_beams,
-                    length_penalty=length_penalty,
-                    early_stopping=early_stopping,
-                    no_repeat_ngram_size=3,
-                    repetition_penalty=1.2
-                )
+            if summary is None:
+                # Tokenize input
+                inputs = self.tokenizer(
+                    input_text,
+                    max_length=1024,
+                    truncation=True,
+                    return_tensors="pt"
+                ).to(self.device)
             
-            # Decode summary
-            summary = self.tokenizer.decode(
-                summary_ids[0],
-                skip_special_tokens=True,
-                clean_up_tokenization_spaces=True
-            ).strip()
+                # Generate summary
+                with torch.no_grad():
+                    summary_ids = self.model.generate(
+                        inputs["input_ids"],
+                        max_length=max_length,
+                        min_length=min_length,
+                        num_beams=num_beams,
+                        length_penalty=length_penalty,
+                        early_stopping=early_stopping,
+                        no_repeat_ngram_size=3,
+                        repetition_penalty=1.2
+                    )
+            
+                # Decode summary
+                summary = self.tokenizer.decode(
+                    summary_ids[0],
+                    skip_special_tokens=True,
+                    clean_up_tokenization_spaces=True
+                ).strip()
             
             # Calculate metrics
             original_length = len(cleaned_text)
@@ -129,32 +168,114 @@ class TextSummarizer:
         self,
         texts: List[str],
         max_length: int = 150,
-        min_length: int = 30
+        min_length: int = 30,
+        num_beams: Optional[int] = None,
+        length_penalty: float = 1.0,
+        early_stopping: bool = True,
+        batch_size: int = 8
     ) -> List[Dict[str, any]]:
         """
-        Summarize multiple texts
+        Summarize multiple texts with padded, batched generate calls
+        
+        With continuous batching (and greedy decoding) every text is submitted to
+        the shared decoder and joins the sequences already in flight. Otherwise texts are sorted by
+        length so each chunk pads to similar lengths. A chunk that fails falls
+        back to summarize() item by item.
         
         Args:
             texts: List of texts to summarize
             max_length: Maximum length of summaries
             min_length: Minimum length of summaries
+            batch_size: Number of texts per generate call
             
         Returns:
-            List of summary results
+            List of summary results, aligned with texts
         """
-        results = []
-        for text in texts:
-            result = self.summarize(
-                text,
-                max_length=max_length,
-                min_length=min_length
-            )
-            results.append(result)
+        num_beams = num_beams or self.default_num_beams
+        cleaned = [self.preprocessor.clean_text(t) for t in texts]
+        results: List[Optional[Dict[str, any]]] = [None] * len(texts)
         
+        todo = []
+        for i, text in enumerate(cleaned):
+            if not text or len(text) < 50:
+                results[i] = {
+                    "summary": text,
+                    "original_length": len(text),
+                    "summary_length": len(text),
+                    "compression_ratio": 1.0
+                }
+            else:
+                todo.append(i)
+        
+        # T5 models need "summarize: " prefix
+        prefix = "summarize: " if "t5" in self.model.config.model_type.lower() else ""
+        
+        if self.decoder is not None and num_beams == 1 and todo:
+            futures = [
+                (i, self.decoder.submit(prefix + cleaned[i], max_length=max_length, min_length=min_length))
+                for i in todo
+            ]
+            todo = []
+            for i, future in futures:
+                try:
+                    results[i] = self._result(cleaned[i], future.result())
+                except Exception as e:
+                    logger.warning(f"Continuous batching failed, falling back to generate(): {e}")
+                    todo.append(i)
+        
+        todo.sort(key=lambda i: len(cleaned[i]))
+        
+        for start in range(0, len(todo), batch_size):
+            chunk = todo[start:start + batch_size]
+            try:
+                inputs = self.tokenizer(
+                    [prefix + cleaned[i] for i in chunk],
+                    max_length=1024,
+                    truncation=True,
+                    padding=True,
+                    return_tensors="pt"
+                ).to(self.device)
+                
+                with torch.no_grad():
+                    summary_ids = self.model.generate(
+                        inputs["input_ids"],
+                        attention_mask=inputs["attention_mask"],
+                        max_length=max_length,
+                        min_length=min_length,
+                        num_beams=num_beams,
+                        length_penalty=length_penalty,
+                        early_stopping=early_stopping,
+                        no_repeat_ngram_size=3,
+                        repetition_penalty=1.2
+                    )
+                
+                summaries = self.tokenizer.batch_decode(
+                    summary_ids,
+                    skip_special_tokens=True,
+                    clean_up_tokenization_spaces=True
+                )
+                for i, summary in zip(chunk, summaries):
+                    results[i] = self._result(cleaned[i], summary.strip())
+                    
+            except Exception as e:
+                logger.error(f"Batch summarization failed, summarizing chunk one by one: {e}")
+                for i in chunk:
+                    results[i] = self.summarize(
+                        texts[i],
+                        max_length=max_length,
+                        min_length=min_length,
+                        num_beams=num_beams,
+                        length_penalty=length_penalty,
+                        early_stopping=early_stopping
+                    )
+        
+        summarized = sum(1 for text in cleaned if text and len(text) >= 50)
+        if summarized:
+            logger.info(f"Batch summarized {summarized} texts")
         return results
     
+    @staticmethod
     def extractive_summary(
-        self,
         text: str,
         num_sentences: int = 3
     ) -> str:
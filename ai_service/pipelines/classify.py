@@ -6,7 +6,8 @@ from typing import List, Dict, Optional
 from loguru import logger
 
 from ai_service.models.classifier import CategoryClassifier
-from ai_service.utils import TextPreprocessor, validate_text_input, ModelCache
+from ai_service.utils import TextPreprocessor, validate_text_input
+from ai_service.utils.result_cache import ResultCache, model_version
 
 
 class ClassificationPipeline:
@@ -36,7 +37,9 @@ class ClassificationPipeline:
             device=device
         )
         self.preprocessor = TextPreprocessor()
-        self.cache = ModelCache() if use_cache else None
+        self.cache = ResultCache(
+            "classify", version=f"{model_version(model_name)}|{','.join(self.classifier.categories)}"
+        ) if use_cache else None
         
         logger.info("Classification pipeline initialized")
     
@@ -71,7 +74,7 @@ class ClassificationPipeline:
             }
         
         # Check cache
-        cache_key = f"classify_{hash(text)}_{top_k}_{threshold}"
+        cache_key = self.cache.key(text, top_k, threshold) if self.cache else None
         if use_cache and self.cache:
             cached_result = self.cache.get(cache_key)
             if cached_result:
@@ -89,29 +92,7 @@ class ClassificationPipeline:
                 threshold=threshold
             )
 
-            # Keyword Boosting: If confidence is low, check for strong keywords
-            if result.get("confidence", 0) < 0.7:
-                lower_text = text.lower()
-                keyword_map = {
-                    "flood": "Flood", 
-                    "inundation": "Flood", 
-                    "landslide": "Landslide", 
-                    "fire": "Fire", 
-                    "earthquake": "Earthquake", 
-                    "quake": "Earthquake",
-                    "storm": "Storm",
-                    "avalanche": "Avalanche"
-                }
-                
-                for keyword, category in keyword_map.items():
-                    # If keyword appears multiple times or is in a short text
-                    if lower_text.count(keyword) >= 2 or (keyword in lower_text and len(text) < 300):
-                        logger.info(f"Boosting category '{category}' based on keyword '{keyword}'")
-                        result["category"] = category
-                        result["confidence"] = 0.85 # Artificial boost
-                        # Update top categories list too
-                        result["top_categories"].insert(0, {"category": category, "confidence": 0.85})
-                        break
+            result = self._keyword_boost(text, result)
             
             # Add metadata
             result["success"] = True
@@ -132,30 +113,89 @@ class ClassificationPipeline:
                 "confidence": 0.0
             }
     
+    def _keyword_boost(self, text: str, result: Dict[str, any]) -> Dict[str, any]:
+        """
+        Keyword Boosting: If confidence is low, check for strong keywords
+        """
+        if result.get("confidence", 0) < 0.7:
+            lower_text = text.lower()
+            keyword_map = {
+                "flood": "Flood", 
+                "inundation": "Flood", 
+                "landslide": "Landslide", 
+                "fire": "Fire", 
+                "earthquake": "Earthquake", 
+                "quake": "Earthquake",
+                "storm": "Storm",
+                "avalanche": "Avalanche"
+            }
+            
+            for keyword, category in keyword_map.items():
+                # If keyword appears multiple times or is in a short text
+                if lower_text.count(keyword) >= 2 or (keyword in lower_text and len(text) < 300):
+                    logger.info(f"Boosting category '{category}' based on keyword '{keyword}'")
+                    result["category"] = category
+                    result["confidence"] = 0.85 # Artificial boost
+                    # Update top categories list too
+                    result["top_categories"].insert(0, {"category": category, "confidence": 0.85})
+                    break
+        return result
+    
     def batch_process(
         self,
         texts: List[str],
         top_k: int = 3,
-        threshold: float = 0.1
+        threshold: float = 0.1,
+        use_cache: bool = True
     ) -> List[Dict[str, any]]:
         """
         Process multiple texts through the pipeline
         
+        Uncached, valid texts are classified together with padded forward
+        passes; results match process() item for item.
+        
         Args:
             texts: List of texts to classify
             top_k: Number of top categories to return
             threshold: Minimum confidence threshold
+            use_cache: Whether to use cached results
             
         Returns:
             List of classification results
         """
         logger.info(f"Processing batch of {len(texts)} texts")
         
-        results = []
+        results: List[Optional[Dict[str, any]]] = [None] * len(texts)
+        cache_keys = [self.cache.key(t, top_k, threshold) if self.cache else None for t in texts]
+        todo = []
         for i, text in enumerate(texts):
-            logger.debug(f"Processing text {i+1}/{len(texts)}")
-            result = self.process(text, top_k=top_k, threshold=threshold)
-            results.append(result)
+            is_valid, error_msg = validate_text_input(text)
+            if not is_valid:
+                results[i] = {"success": False, "error": error_msg, "category": None, "confidence": 0.0}
+                continue
+            if use_cache and self.cache:
+                if cached := self.cache.get(cache_keys[i]):
+                    results[i] = cached
+                    continue
+            todo.append(i)
+        
+        if todo:
+            # Same truncation as process(): the first 1500 chars carry the classification signal
+            classified = self.classifier.batch_classify(
+                texts=[texts[i][:1500] for i in todo],
+                top_k=top_k,
+                threshold=threshold
+            )
+            for i, result in zip(todo, classified):
+                if "error" in result:
+                    results[i] = {"success": False, "error": result["error"], "category": None, "confidence": 0.0}
+                    continue
+                result = self._keyword_boost(texts[i], result)
+                result["success"] = True
+                result["text_length"] = len(texts[i])
+                if use_cache and self.cache:
+                    self.cache.set(cache_keys[i], result)
+                results[i] = result
         
         # Add batch statistics
         successful = sum(1 for r in results if r.get("success", False))
@@ -23,7 +23,11 @@ except ImportError:
     UMAP_AVAILABLE = False
     logger.warning("umap-learn not available. UMAP dimensionality reduction will not work.")
 
-from ai_service.utils import TextPreprocessor, cosine_similarity, get_device
+from ai_service.utils import TextPreprocessor, get_device
+from ai_service.utils.vector_search import l2_normalize, blocked_top_k
+from ai_service.utils.embedding_store import EmbeddingStore
+from ai_service.utils.quantization import compare_quantization_modes, QuantizedIndex
+from ai_service.pipelines.cluster_model import cluster_model
 
 
 class ClusteringPipeline:
@@ -34,7 +38,11 @@ class ClusteringPipeline:
     def __init__(
         self,
         embedding_model: str = "all-MiniLM-L6-v2",
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        embedding_store_dir: str = "ai_service/data/embeddings",
+        embedding_dtype: str = "float16",
+        embedding_memory_items: int = 10000,
+        embedding_store_read_only: bool = False
     ):
         """
         Initialize clustering pipeline
@@ -42,6 +50,10 @@ class ClusteringPipeline:
         Args:
             embedding_model: Sentence transformer model for embeddings
             device: Device to run model on
+            embedding_store_dir: Directory of the persistent embedding store
+            embedding_dtype: On-disk precision of stored embeddings ('float16' or 'float32')
+            embedding_memory_items: Number of embeddings kept in the in-memory LRU tier
+            embedding_store_read_only: Only read the store (for extra worker processes)
         """
         self.device = device or get_device()
         self.preprocessor = TextPreprocessor()
@@ -57,7 +69,17 @@ class ClusteringPipeline:
             logger.error(f"Failed to load embedding model: {e}")
             raise
         
-        self.embeddings_cache = {}
+        self.embedding_store = EmbeddingStore(
+            model_name=embedding_model,
+            dim=self.embedding_model.get_sentence_embedding_dimension(),
+            base_dir=embedding_store_dir,
+            dtype=embedding_dtype,
+            memory_items=embedding_memory_items,
+            read_only=embedding_store_read_only
+        )
+        
+        # Persistent UMAP/HDBSCAN fit shared across pipeline instances
+        self.cluster_model = cluster_model
     
     def generate_embeddings(
         self,
@@ -76,19 +98,13 @@ class ClusteringPipeline:
         Returns:
             Numpy array of embeddings
         """
-        embeddings = []
-        texts_to_encode = []
-        indices_to_encode = []
+        if use_cache:
+            embeddings = self.embedding_store.get_many(texts)
+        else:
+            embeddings = [None] * len(texts)
         
-        for i, text in enumerate(texts):
-            cache_key = hash(text)
-            
-            if use_cache and cache_key in self.embeddings_cache:
-                embeddings.append(self.embeddings_cache[cache_key])
-            else:
-                texts_to_encode.append(text)
-                indices_to_encode.append(i)
-                embeddings.append(None)  # Placeholder
+        indices_to_encode = [i for i, emb in enumerate(embeddings) if emb is None]
+        texts_to_encode = [texts[i] for i in indices_to_encode]
         
         # Encode uncached texts
         if texts_to_encode:
@@ -101,13 +117,13 @@ class ClusteringPipeline:
                 convert_to_numpy=True
             )
             
-            # Cache and insert new embeddings
-            for idx, text, embedding in zip(indices_to_encode, texts_to_encode, new_embeddings):
-                cache_key = hash(text)
-                self.embeddings_cache[cache_key] = embedding
+            # Store and insert new embeddings
+            if use_cache:
+                self.embedding_store.put_many(texts_to_encode, new_embeddings)
+            for idx, embedding in zip(indices_to_encode, new_embeddings):
                 embeddings[idx] = embedding
         
-        return np.array(embeddings)
+        return np.array(embeddings, dtype=np.float32)
     
     def cluster_hdbscan(
         self,
@@ -115,17 +131,24 @@ class ClusteringPipeline:
         min_cluster_size: int = 5,
         min_samples: int = 3,
         use_umap: bool = True,
-        n_components: int = 5
+        n_components: int = 5,
+        reuse_reducer: bool = True,
+        include_texts: bool = True
     ) -> Dict[str, any]:
         """
         Cluster texts using HDBSCAN (density-based clustering)
         
+        When a persistent cluster model with a matching UMAP reducer has been fitted,
+        texts are projected with its transform() instead of fitting a new UMAP.
+        
         Args:
             texts: List of texts to cluster
             min_cluster_size: Minimum cluster size
             min_samples: Minimum samples for core points
             use_umap: Whether to use UMAP for dimensionality reduction
             n_components: Number of UMAP components
+            reuse_reducer: Use the persisted reducer when available
+            include_texts: Include texts in each cluster (False = indices only)
             
         Returns:
             Clustering results
@@ -139,9 +162,14 @@ class ClusteringPipeline:
         
         # Generate embeddings
         embeddings = self.generate_embeddings(texts)
+        self.cluster_model.observe(embeddings)
         
         # Optional dimensionality reduction
-        if use_umap and len(texts) > 10:
+        reducer = self.cluster_model.get_reducer(n_components) if (use_umap and reuse_reducer) else None
+        if reducer is not None:
+            logger.info(f"Projecting with persisted UMAP reducer v{self.cluster_model.meta['version']}")
+            embeddings_reduced = self.cluster_model.transform(embeddings)
+        elif use_umap and len(texts) > 10:
             if not UMAP_AVAILABLE:
                 logger.warning("UMAP not available, skipping dimensionality reduction")
                 embeddings_reduced = embeddings
@@ -165,21 +193,77 @@ class ClusteringPipeline:
         cluster_labels = clusterer.fit_predict(embeddings_reduced)
         
         # Organize results
-        clusters = self._organize_clusters(texts, cluster_labels, embeddings)
+        clusters = self._organize_clusters(texts, cluster_labels, embeddings, include_texts=include_texts)
         
         logger.info(f"Found {len(clusters)} clusters (excluding noise)")
         
         return {
             "clusters": clusters,
             "num_clusters": len(clusters),
-            "num_noise_points": sum(1 for label in cluster_labels if label == -1),
+            "num_noise_points": int((cluster_labels == -1).sum()),
             "cluster_labels": cluster_labels.tolist()
         }
     
+    def fit_cluster_model(
+        self,
+        texts: List[str],
+        n_components: int = 5,
+        min_cluster_size: int = 5,
+        min_samples: int = 3,
+        sample_size: int = 5000
+    ) -> Dict[str, any]:
+        """
+        Fit and persist a new version of the shared UMAP/HDBSCAN model
+        
+        Args:
+            texts: Reference texts (randomly subsampled to sample_size)
+            n_components: Number of UMAP components
+            min_cluster_size: Minimum cluster size
+            min_samples: Minimum samples for core points
+            sample_size: Maximum reference points
+            
+        Returns:
+            Model status
+        """
+        embeddings = self.generate_embeddings(texts)
+        self.cluster_model.observe(embeddings)
+        return self.cluster_model.fit(
+            embeddings,
+            n_components=n_components,
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            sample_size=sample_size
+        )
+    
+    def predict_clusters(self, texts: List[str]) -> Dict[str, any]:
+        """
+        Label new texts against the persisted model without re-clustering
+        
+        Args:
+            texts: Texts to label
+            
+        Returns:
+            Labels (-1 = noise), membership strengths and the model version used
+        """
+        if not self.cluster_model.is_fitted():
+            raise RuntimeError("No cluster model has been fitted yet")
+        
+        embeddings = self.generate_embeddings(texts)
+        self.cluster_model.observe(embeddings)
+        labels, strengths = self.cluster_model.predict(embeddings)
+        
+        return {
+            "labels": labels.tolist(),
+            "strengths": [round(float(s), 4) for s in strengths],
+            "num_noise_points": int((labels == -1).sum()),
+            "model_version": self.cluster_model.meta["version"]
+        }
+    
     def cluster_kmeans(
         self,
         texts: List[str],
-        n_clusters: int = 5
+        n_clusters: int = 5,
+        include_texts: bool = True
     ) -> Dict[str, any]:
         """
         Cluster texts using K-Means
@@ -187,6 +271,7 @@ class ClusteringPipeline:
         Args:
             texts: List of texts to cluster
             n_clusters: Number of clusters
+            include_texts: Include texts in each cluster (False = indices only)
             
         Returns:
             Clustering results
@@ -201,7 +286,7 @@ class ClusteringPipeline:
         cluster_labels = kmeans.fit_predict(embeddings)
         
         # Organize results
-        clusters = self._organize_clusters(texts, cluster_labels, embeddings)
+        clusters = self._organize_clusters(texts, cluster_labels, embeddings, include_texts=include_texts)
         
         logger.info(f"Created {len(clusters)} clusters")
         
@@ -216,61 +301,67 @@ class ClusteringPipeline:
         self,
         texts: List[str],
         labels: np.ndarray,
-        embeddings: np.ndarray
+        embeddings: np.ndarray,
+        include_texts: bool = True
     ) -> List[Dict[str, any]]:
         """
         Organize clustering results into structured format
         
+        Points are grouped with a stable argsort on the label and bincount sizes, so
+        each cluster's rows are one contiguous slice. Centroids are slice means and
+        each cluster's representative is the member closest to its centroid, found
+        for all points at once.
+        
         Args:
             texts: Original texts
             labels: Cluster labels
             embeddings: Text embeddings
+            include_texts: Include member and representative texts (False = indices only)
             
         Returns:
-            List of cluster dictionaries
+            List of cluster dictionaries, largest first
         """
-        clusters_dict = {}
-        
-        for i, (text, label) in enumerate(zip(texts, labels)):
-            if label == -1:  # Noise point in HDBSCAN
-                continue
-            
-            if label not in clusters_dict:
-                clusters_dict[label] = {
-                    "cluster_id": int(label),
-                    "texts": [],
-                    "indices": [],
-                    "embeddings": []
-                }
-            
-            clusters_dict[label]["texts"].append(text)
-            clusters_dict[label]["indices"].append(i)
-            clusters_dict[label]["embeddings"].append(embeddings[i])
-        
-        # Calculate cluster centroids and representative texts
+        labels = np.asarray(labels)
+        valid = np.flatnonzero(labels != -1)  # -1 is HDBSCAN noise
+        if not len(valid):
+            return []
+        
+        cluster_ids, group = np.unique(labels[valid], return_inverse=True)
+        sizes = np.bincount(group)
+        order = np.argsort(group, kind="stable")
+        members = valid[order]  # grouped by cluster, ascending index within each group
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        
+        member_embeddings = np.asarray(embeddings, dtype=np.float32)[members]
+        centroids = np.stack([
+            member_embeddings[start:start + size].mean(axis=0)
+            for start, size in zip(starts, sizes)
+        ])
+        member_group = np.repeat(np.arange(len(sizes)), sizes)
+        member_embeddings -= centroids[member_group]
+        distances = np.einsum("ij,ij->i", member_embeddings, member_embeddings)
+        
+        # Closest member per group (ties go to the lowest index)
+        representatives = members[np.lexsort((distances, member_group))[starts]]
+        
+        # Largest first; equal sizes keep first-appearance order
+        first_seen = members[starts]
+        cluster_order = np.lexsort((first_seen, -sizes))
+        
+        groups = np.split(members, starts[1:])
         clusters = []
-        for cluster_data in clusters_dict.values():
-            cluster_embeddings = np.array(cluster_data["embeddings"])
-            centroid = cluster_embeddings.mean(axis=0)
-            
-            # Find most representative text (closest to centroid)
-            distances = [
-                np.linalg.norm(emb - centroid)
-                for emb in cluster_embeddings
-            ]
-            representative_idx = np.argmin(distances)
-            
-            clusters.append({
-                "cluster_id": cluster_data["cluster_id"],
-                "size": len(cluster_data["texts"]),
-                "texts": cluster_data["texts"],
-                "indices": cluster_data["indices"],
-                "representative_text": cluster_data["texts"][representative_idx],
-                "representative_index": cluster_data["indices"][representative_idx]
-            })
-        
-        # Sort by cluster size
-        clusters.sort(key=lambda x: x["size"], reverse=True)
+        for g in cluster_order:
+            indices = groups[g].tolist()
+            cluster = {
+                "cluster_id": int(cluster_ids[g]),
+                "size": int(sizes[g]),
+                "indices": indices,
+                "representative_index": int(representatives[g])
+            }
+            if include_texts:
+                cluster["texts"] = [texts[i] for i in indices]
+                cluster["representative_text"] = texts[representatives[g]]
+            clusters.append(cluster)
         
         return clusters
     
@@ -293,22 +384,106 @@ class ClusteringPipeline:
         Returns:
             List of similar texts with scores
         """
-        # Generate embeddings
-        query_embedding = self.generate_embeddings([query_text])[0]
-        corpus_embeddings = self.generate_embeddings(corpus_texts)
-        
-        # Calculate similarities
-        similarities = []
-        for i, corpus_embedding in enumerate(corpus_embeddings):
-            similarity = cosine_similarity(query_embedding, corpus_embedding)
-            if similarity >= threshold:
-                similarities.append({
+        return self.find_similar_batch(
+            query_texts=[query_text],
+            corpus_texts=corpus_texts,
+            top_k=top_k,
+            threshold=threshold
+        )[0]
+    
+    def find_similar_batch(
+        self,
+        query_texts: List[str],
+        corpus_texts: List[str],
+        top_k: int = 5,
+        threshold: float = 0.5,
+        block_size: int = 16384,
+        quantization: str = "none",
+        rerank_factor: int = 4
+    ) -> List[List[Dict[str, any]]]:
+        """
+        Find similar corpus texts for many queries at once
+        
+        Embeddings are L2-normalized once and scored with blocked matrix
+        multiplication; block_size bounds the corpus rows held in each score block.
+        With quantization 'int8' or 'binary' the first pass scores compact codes and
+        top_k * rerank_factor candidates are re-ranked exactly from memory-mapped
+        float32 vectors, so the threshold still applies to exact similarities.
+        
+        Args:
+            query_texts: Query texts
+            corpus_texts: List of texts to search
+            top_k: Number of similar texts to return per query
+            threshold: Minimum similarity threshold
+            block_size: Corpus rows per score block
+            quantization: 'none' (exact), 'int8' or 'binary' first pass
+            rerank_factor: Candidate multiplier for exact re-ranking
+            
+        Returns:
+            One list of similar texts with scores per query
+        """
+        if not query_texts:
+            return []
+        if not corpus_texts:
+            return [[] for _ in query_texts]
+        
+        query_embeddings = l2_normalize(self.generate_embeddings(query_texts))
+        corpus_embeddings = l2_normalize(self.generate_embeddings(corpus_texts))
+        
+        if quantization == "none":
+            indices, scores = blocked_top_k(
+                query_embeddings,
+                corpus_embeddings,
+                top_k=top_k,
+                threshold=threshold,
+                block_size=block_size,
+                normalized=True
+            )
+        else:
+            with QuantizedIndex(corpus_embeddings, mode=quantization, rerank_factor=rerank_factor) as index:
+                indices, scores = index.search(
+                    query_embeddings, top_k=top_k, threshold=threshold, block_size=block_size
+                )
+        
+        results = []
+        for row_idx, row_scores in zip(indices, scores):
+            results.append([
+                {
                     "text": corpus_texts[i],
-                    "index": i,
-                    "similarity": float(similarity)
-                })
+                    "index": int(i),
+                    "similarity": float(score)
+                }
+                for i, score in zip(row_idx, row_scores)
+                if i >= 0
+            ])
         
-        # Sort by similarity
-        similarities.sort(key=lambda x: x["similarity"], reverse=True)
+        return results
+    
+    def quantization_report(
+        self,
+        query_texts: List[str],
+        corpus_texts: List[str],
+        top_k: int = 10,
+        rerank_factor: int = 4
+    ) -> List[Dict[str, any]]:
+        """
+        Recall@k and memory use of each quantization mode on a sample
         
-        return similarities[:top_k]
+        Args:
+            query_texts: Sample queries
+            corpus_texts: Sample corpus
+            top_k: k for recall@k
+            rerank_factor: Candidate multiplier for exact re-ranking
+            
+        Returns:
+            One entry per mode ('none', 'int8', 'binary')
+        """
+        if not query_texts or not corpus_texts:
+            return []
+        
+        return compare_quantization_modes(
+            self.generate_embeddings(query_texts),
+            self.generate_embeddings(corpus_texts),
+            top_k=top_k,
+            rerank_factor=rerank_factor
+        )
@@ -0,0 +1,398 @@
+"""
+Persistent Cluster Model
+A UMAP reducer and HDBSCAN clusterer fitted once on a reference sample, versioned on disk,
+and reused through transform() / approximate_predict() for new points
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import joblib
+from loguru import logger
+
+from ai_service.utils.vector_search import l2_normalize
+
+# Optional imports
+try:
+    import hdbscan
+    HDBSCAN_AVAILABLE = True
+except ImportError:
+    HDBSCAN_AVAILABLE = False
+
+try:
+    import umap
+    UMAP_AVAILABLE = True
+except ImportError:
+    UMAP_AVAILABLE = False
+
+
+class PersistentClusterModel:
+    """
+    Versioned reducer + clusterer fitted on a reference sample of embeddings.
+
+    Each fit writes model-v{N}.joblib and points meta.json at it; older versions
+    beyond keep_versions are deleted. Embeddings seen through observe() feed a
+    reservoir sample (the reference set for the next refit) and running drift
+    statistics: the cosine shift of their mean from the reference mean and the
+    share of points approximate_predict labels as noise.
+    """
+
+    def __init__(
+        self,
+        path: str = "ai_service/data/cluster_model",
+        max_age_hours: float = 24 * 7,
+        drift_threshold: float = 0.15,
+        noise_margin: float = 0.2,
+        min_observations: int = 200,
+        reservoir_size: int = 5000,
+        keep_versions: int = 3
+    ):
+        """
+        Args:
+            path: Directory holding model versions and metadata
+            max_age_hours: Refit when the current model is older than this
+            drift_threshold: Refit when 1 - cos(recent mean, reference mean) exceeds this
+            noise_margin: Refit when the recent noise rate exceeds the reference rate by this much
+            min_observations: Observations needed before drift can trigger a refit
+            reservoir_size: Size of the reservoir sample used as the next reference set
+            keep_versions: Model versions kept on disk
+        """
+        self.path = path
+        self.max_age_hours = max_age_hours
+        self.drift_threshold = drift_threshold
+        self.noise_margin = noise_margin
+        self.min_observations = min_observations
+        self.reservoir_size = reservoir_size
+        self.keep_versions = keep_versions
+
+        self._lock = threading.RLock()
+        self._rng = np.random.default_rng()
+        self.meta: Optional[Dict[str, Any]] = None
+        self.reducer = None
+        self.clusterer = None
+        self._meta_mtime = None
+
+        # Drift statistics since the last fit
+        self._observed_sum: Optional[np.ndarray] = None
+        self._observed = 0
+        self._predicted = 0
+        self._predicted_noise = 0
+
+        self._reservoir: Optional[np.ndarray] = None
+        self._reservoir_seen = 0
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    @property
+    def _reservoir_path(self) -> str:
+        return os.path.join(self.path, "reservoir.npy")
+
+    def _model_path(self, version: int) -> str:
+        return os.path.join(self.path, f"model-v{version}.joblib")
+
+    def _ensure_loaded(self) -> bool:
+        """Load (or reload, if another process refitted) the current version"""
+        if not os.path.exists(self._meta_path):
+            return self.meta is not None
+        mtime = os.path.getmtime(self._meta_path)
+        if mtime == self._meta_mtime:
+            return self.meta is not None
+
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if self.meta is None or meta["version"] != self.meta["version"]:
+            model = joblib.load(self._model_path(meta["version"]))
+            self.reducer = model["reducer"]
+            self.clusterer = model["clusterer"]
+            self.meta = meta
+            self._reset_drift()
+            if self._reservoir is None and os.path.exists(self._reservoir_path):
+                self._load_reservoir(np.load(self._reservoir_path), meta.get("reservoir_seen"))
+            logger.info(f"Loaded cluster model v{meta['version']} ({meta['n_reference']} reference points)")
+        self._meta_mtime = mtime
+        return True
+
+    def _save(self, version: int) -> None:
+        os.makedirs(self.path, exist_ok=True)
+
+        tmp = self._model_path(version) + ".tmp"
+        joblib.dump({"reducer": self.reducer, "clusterer": self.clusterer}, tmp)
+        os.replace(tmp, self._model_path(version))
+
+        self._save_reservoir()
+
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._meta_path)
+        self._meta_mtime = os.path.getmtime(self._meta_path)
+
+        for old in range(version - self.keep_versions, 0, -1):
+            if not os.path.exists(self._model_path(old)):
+                break
+            os.remove(self._model_path(old))
+
+    def _load_reservoir(self, sample: np.ndarray, seen: Optional[int]) -> None:
+        self._reservoir = np.empty((self.reservoir_size, sample.shape[1]), dtype=np.float32)
+        sample = sample[:self.reservoir_size]
+        self._reservoir[:len(sample)] = sample
+        self._reservoir_seen = max(seen or 0, len(sample))
+
+    def _reservoir_sample(self) -> Optional[np.ndarray]:
+        if self._reservoir is None:
+            return None
+        return self._reservoir[:min(self._reservoir_seen, self.reservoir_size)]
+
+    def _save_reservoir(self) -> None:
+        sample = self._reservoir_sample()
+        if sample is None or self.meta is None:
+            return
+        tmp = os.path.join(self.path, "reservoir.tmp.npy")
+        np.save(tmp, sample)
+        os.replace(tmp, self._reservoir_path)
+        self.meta["reservoir_seen"] = self._reservoir_seen
+
+    def save_reservoir(self) -> None:
+        """Persist the reservoir sample so refits survive restarts"""
+        with self._lock:
+            if self._ensure_loaded():
+                os.makedirs(self.path, exist_ok=True)
+                self._save_reservoir()
+
+    # ------------------------------------------------------------------
+    # Fit
+    # ------------------------------------------------------------------
+    def fit(
+        self,
+        embeddings: np.ndarray,
+        n_components: int = 5,
+        min_cluster_size: int = 5,
+        min_samples: int = 3,
+        sample_size: int = 5000,
+        random_state: int = 42
+    ) -> Dict[str, Any]:
+        """
+        Fit reducer and clusterer on a reference sample and publish a new version
+
+        Args:
+            embeddings: (n, d) reference embeddings
+            n_components: UMAP output dimensions
+            min_cluster_size: HDBSCAN minimum cluster size
+            min_samples: HDBSCAN minimum samples for core points
+            sample_size: Maximum reference points (random subsample beyond this)
+            random_state: Seed for subsampling and UMAP
+
+        Returns:
+            Metadata of the new version
+        """
+        if not HDBSCAN_AVAILABLE:
+            raise ImportError("hdbscan is not installed. Install it with: pip install hdbscan")
+
+        embeddings = l2_normalize(embeddings)
+        if len(embeddings) > sample_size:
+            rng = np.random.default_rng(random_state)
+            embeddings = embeddings[rng.choice(len(embeddings), sample_size, replace=False)]
+        if len(embeddings) < max(min_cluster_size, 2):
+            raise ValueError(f"Need at least {max(min_cluster_size, 2)} reference points to fit")
+
+        start = time.time()
+        reducer = None
+        reduced = embeddings
+        if UMAP_AVAILABLE and len(embeddings) > 10:
+            reducer = umap.UMAP(
+                n_components=min(n_components, len(embeddings) - 2),
+                random_state=random_state
+            )
+            reduced = reducer.fit_transform(embeddings)
+        elif not UMAP_AVAILABLE:
+            logger.warning("UMAP not available, clustering reference sample without reduction")
+
+        clusterer = hdbscan.HDBSCAN(
+            min_cluster_size=min_cluster_size,
+            min_samples=min_samples,
+            metric="euclidean",
+            prediction_data=True
+        )
+        labels = clusterer.fit_predict(reduced)
+
+        with self._lock:
+            self._ensure_loaded()
+            version = (self.meta["version"] if self.meta else 0) + 1
+            reference_mean = embeddings.mean(axis=0)
+
+            self.reducer = reducer
+            self.clusterer = clusterer
+            self.meta = {
+                "version": version,
+                "fitted_at": time.time(),
+                "fit_seconds": round(time.time() - start, 2),
+                "n_reference": int(len(embeddings)),
+                "dim": int(embeddings.shape[1]),
+                "n_components": int(reduced.shape[1]),
+                "reduced": reducer is not None,
+                "min_cluster_size": min_cluster_size,
+                "min_samples": min_samples,
+                "num_clusters": int(labels.max() + 1) if len(labels) else 0,
+                "noise_rate": float(np.mean(labels == -1)),
+                "reference_mean": reference_mean.tolist()
+            }
+            self._reset_drift()
+            self._save(version)
+
+        logger.info(
+            f"Fitted cluster model v{version}: {self.meta['num_clusters']} clusters "
+            f"on {len(embeddings)} points in {self.meta['fit_seconds']}s"
+        )
+        return self.status()
+
+    # ------------------------------------------------------------------
+    # Transform / predict
+    # ------------------------------------------------------------------
+    def is_fitted(self) -> bool:
+        with self._lock:
+            return self._ensure_loaded()
+
+    def get_reducer(self, n_components: int):
+        """The fitted UMAP reducer if it produces n_components dimensions, else None"""
+        with self._lock:
+            if not self._ensure_loaded() or self.reducer is None:
+                return None
+            return self.reducer if self.meta["n_components"] == n_components else None
+
+    def transform(self, embeddings: np.ndarray) -> np.ndarray:
+        """Project new embeddings with the fitted reducer (no refit)"""
+        with self._lock:
+            if not self._ensure_loaded():
+                raise RuntimeError("Cluster model has not been fitted yet")
+            reducer = self.reducer
+        embeddings = l2_normalize(embeddings)
+        return reducer.transform(embeddings) if reducer is not None else embeddings
+
+    def predict(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Labels and membership strengths for new points via approximate_predict
+
+        Returns:
+            (labels, strengths); label -1 is noise
+        """
+        reduced = self.transform(embeddings)
+        with self._lock:
+            clusterer = self.clusterer
+        labels, strengths = hdbscan.approximate_predict(clusterer, reduced)
+
+        with self._lock:
+            self._predicted += len(labels)
+            self._predicted_noise += int(np.sum(labels == -1))
+        return labels, strengths
+
+    # ------------------------------------------------------------------
+    # Drift & refit
+    # ------------------------------------------------------------------
+    def _reset_drift(self) -> None:
+        self._observed_sum = None
+        self._observed = 0
+        self._predicted = 0
+        self._predicted_noise = 0
+
+    def observe(self, embeddings: np.ndarray) -> None:
+        """Feed new embeddings into drift statistics and the reservoir sample"""
+        embeddings = l2_normalize(embeddings).reshape(len(embeddings), -1)
+        with self._lock:
+            batch_sum = embeddings.sum(axis=0)
+            self._observed_sum = batch_sum if self._observed_sum is None else self._observed_sum + batch_sum
+            self._observed += len(embeddings)
+
+            # Algorithm R reservoir sampling
+            if self._reservoir is None or self._reservoir.shape[1] != embeddings.shape[1]:
+                self._reservoir = np.empty((self.reservoir_size, embeddings.shape[1]), dtype=np.float32)
+                self._reservoir_seen = 0
+            for vector in embeddings:
+                if self._reservoir_seen < self.reservoir_size:
+                    self._reservoir[self._reservoir_seen] = vector
+                else:
+                    slot = self._rng.integers(0, self._reservoir_seen + 1)
+                    if slot < self.reservoir_size:
+                        self._reservoir[slot] = vector
+                self._reservoir_seen += 1
+
+    def drift(self) -> Dict[str, Any]:
+        """Drift of recent observations from the reference sample"""
+        with self._lock:
+            if not self._ensure_loaded():
+                return {"observed": self._observed}
+            shift = None
+            if self._observed:
+                recent = l2_normalize(self._observed_sum)
+                reference = l2_normalize(np.asarray(self.meta["reference_mean"], dtype=np.float32))
+                shift = round(float(1.0 - recent @ reference), 4)
+            noise_rate = round(self._predicted_noise / self._predicted, 4) if self._predicted else None
+            return {
+                "observed": self._observed,
+                "predicted": self._predicted,
+                "centroid_shift": shift,
+                "noise_rate": noise_rate,
+                "reference_noise_rate": round(self.meta["noise_rate"], 4),
+                "age_hours": round((time.time() - self.meta["fitted_at"]) / 3600, 2)
+            }
+
+    def needs_refit(self) -> Tuple[bool, Optional[str]]:
+        """Whether the model is missing, too old or drifted, and why"""
+        with self._lock:
+            if not self._ensure_loaded():
+                return True, "not_fitted"
+            drift = self.drift()
+            if drift["age_hours"] > self.max_age_hours:
+                return True, "age"
+            if self._observed >= self.min_observations:
+                if drift["centroid_shift"] is not None and drift["centroid_shift"] > self.drift_threshold:
+                    return True, "centroid_drift"
+            if self._predicted >= self.min_observations:
+                if drift["noise_rate"] > drift["reference_noise_rate"] + self.noise_margin:
+                    return True, "noise_drift"
+            return False, None
+
+    def refit_if_needed(self, force: bool = False) -> Optional[Dict[str, Any]]:
+        """Refit on the reservoir sample when needs_refit() says so (or when forced)"""
+        refit, reason = self.needs_refit()
+        if force:
+            refit, reason = True, "forced"
+        with self._lock:
+            sample = self._reservoir_sample()
+            reservoir = None if sample is None else sample.copy()
+            params = {
+                "n_components": self.meta["n_components"],
+                "min_cluster_size": self.meta["min_cluster_size"],
+                "min_samples": self.meta["min_samples"]
+            } if self.meta else {}
+        if not refit or reservoir is None or len(reservoir) < self.min_observations:
+            return None
+
+        logger.info(f"Refitting cluster model ({reason}) on {len(reservoir)} reservoir points")
+        return self.fit(reservoir, sample_size=self.reservoir_size, **params)
+
+    def status(self) -> Dict[str, Any]:
+        """Current version, fit parameters and drift"""
+        with self._lock:
+            if not self._ensure_loaded():
+                return {"fitted": False, "observed": self._observed}
+            refit, reason = self.needs_refit()
+            meta = {k: v for k, v in self.meta.items() if k != "reference_mean"}
+            return {
+                "fitted": True,
+                **meta,
+                "drift": self.drift(),
+                "needs_refit": refit,
+                "refit_reason": reason,
+                "reservoir_size": 0 if self._reservoir is None else len(self._reservoir_sample())
+            }
+
+
+# Shared model so every ClusteringPipeline instance (API, unified processor) reuses one fit
+cluster_model = PersistentClusterModel()
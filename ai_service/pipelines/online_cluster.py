@@ -0,0 +1,348 @@
+"""
+Online Clustering
+Incremental event clustering of incoming reports against persistent cluster state
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from ai_service.utils.vector_search import l2_normalize, blocked_top_k
+
+
+class OnlineClusterer:
+    """
+    Leader-style online clustering over normalized embeddings.
+
+    Each cluster keeps a running mean (centroid), a member count and a radius
+    (largest cosine distance of a member at assignment time). A new vector joins
+    the most similar centroid if the cosine similarity reaches assign_threshold,
+    otherwise it starts a new cluster. Assignment is a single (k, d) matrix-vector
+    product, so it stays O(k) with no refit. consolidate() merges clusters whose
+    centroids have drifted together and trims stale singletons past max_clusters.
+    """
+
+    def __init__(
+        self,
+        path: str = "ai_service/data/online_clusters",
+        assign_threshold: float = 0.7,
+        merge_threshold: float = 0.85,
+        max_clusters: int = 20000,
+        max_examples: int = 5
+    ):
+        """
+        Args:
+            path: Directory holding the persisted state
+            assign_threshold: Minimum centroid similarity to join an existing cluster
+            merge_threshold: Centroid similarity at which consolidation merges clusters
+            max_clusters: Oldest singleton clusters are dropped beyond this many clusters
+            max_examples: Example items remembered per cluster
+        """
+        self.path = path
+        self.assign_threshold = assign_threshold
+        self.merge_threshold = merge_threshold
+        self.max_clusters = max_clusters
+        self.max_examples = max_examples
+
+        self._lock = threading.RLock()
+        self.dim: Optional[int] = None
+        self._centroids = np.empty((0, 0), dtype=np.float32)  # running means, not normalized
+        self._counts = np.empty((0,), dtype=np.int64)
+        self._radius = np.empty((0,), dtype=np.float32)
+        self._ids = np.empty((0,), dtype=np.int64)
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        self._merged_into: Dict[int, int] = {}
+        self._next_id = 0
+        self._dirty = False
+
+        if os.path.exists(self._meta_path):
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "state.json")
+
+    @property
+    def _arrays_path(self) -> str:
+        return os.path.join(self.path, "state.npz")
+
+    def _load(self) -> None:
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = np.load(self._arrays_path)
+
+        self.dim = meta["dim"]
+        self._next_id = meta["next_id"]
+        self._meta = {int(k): v for k, v in meta["clusters"].items()}
+        self._merged_into = {int(k): v for k, v in meta.get("merged_into", {}).items()}
+        self._centroids = arrays["centroids"]
+        self._counts = arrays["counts"]
+        self._radius = arrays["radius"]
+        self._ids = arrays["ids"]
+        logger.info(f"Loaded online cluster state ({len(self._ids)} clusters)")
+
+    def save(self) -> None:
+        """Write the cluster state to disk (atomic per file)"""
+        with self._lock:
+            if self.dim is None:
+                return
+            os.makedirs(self.path, exist_ok=True)
+
+            tmp = os.path.join(self.path, "state.tmp.npz")
+            np.savez(tmp, centroids=self._centroids, counts=self._counts, radius=self._radius, ids=self._ids)
+            os.replace(tmp, self._arrays_path)
+
+            meta = {
+                "dim": self.dim,
+                "next_id": self._next_id,
+                "clusters": self._meta,
+                "merged_into": self._merged_into
+            }
+            tmp = self._meta_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._meta_path)
+            self._dirty = False
+
+    def save_if_dirty(self) -> bool:
+        """Persist only if the state changed since the last save"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self.save()
+            return True
+
+    # ------------------------------------------------------------------
+    # Assignment
+    # ------------------------------------------------------------------
+    def assign(
+        self,
+        vectors: np.ndarray,
+        item_ids: Optional[List[str]] = None,
+        texts: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Assign embeddings to event clusters, creating clusters as needed
+
+        Args:
+            vectors: (n, d) embeddings
+            item_ids: Optional caller ids remembered as cluster examples
+            texts: Optional short texts remembered as cluster examples
+
+        Returns:
+            Per vector: {"cluster_id", "similarity", "is_new", "size"}
+        """
+        vectors = l2_normalize(vectors).reshape(len(vectors), -1)
+        now = time.time()
+        assignments = []
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._centroids = np.empty((0, self.dim), dtype=np.float32)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+
+            for i, vector in enumerate(vectors):
+                best, similarity = -1, -1.0
+                if len(self._ids):
+                    sims = l2_normalize(self._centroids) @ vector
+                    best = int(np.argmax(sims))
+                    similarity = float(sims[best])
+
+                if best >= 0 and similarity >= self.assign_threshold:
+                    count = self._counts[best] + 1
+                    self._centroids[best] += (vector - self._centroids[best]) / count
+                    self._counts[best] = count
+                    self._radius[best] = max(self._radius[best], 1.0 - similarity)
+                    cluster_id = int(self._ids[best])
+                    is_new = False
+                else:
+                    cluster_id = self._create(vector, now)
+                    best, similarity, is_new = len(self._ids) - 1, 1.0, True
+
+                info = self._meta[cluster_id]
+                info["updated_at"] = now
+                if (item_ids or texts) and len(info["examples"]) < self.max_examples:
+                    info["examples"].append({
+                        "id": item_ids[i] if item_ids else None,
+                        "text": (texts[i][:200] if texts else None)
+                    })
+
+                assignments.append({
+                    "cluster_id": cluster_id,
+                    "similarity": round(similarity, 4),
+                    "is_new": is_new,
+                    "size": int(self._counts[best])
+                })
+
+            self._dirty = True
+
+        return assignments
+
+    def _create(self, vector: np.ndarray, now: float) -> int:
+        cluster_id = self._next_id
+        self._next_id += 1
+        self._centroids = np.vstack([self._centroids, vector[None, :]])
+        self._counts = np.append(self._counts, 1)
+        self._radius = np.append(self._radius, np.float32(0.0))
+        self._ids = np.append(self._ids, cluster_id)
+        self._meta[cluster_id] = {"created_at": now, "updated_at": now, "examples": []}
+        return cluster_id
+
+    # ------------------------------------------------------------------
+    # Consolidation
+    # ------------------------------------------------------------------
+    def consolidate(self) -> Dict[str, int]:
+        """
+        Merge clusters whose centroids reach merge_threshold and trim stale singletons
+
+        Returns:
+            Counts of merged and dropped clusters
+        """
+        with self._lock:
+            n = len(self._ids)
+            merged = dropped = 0
+
+            if n > 1:
+                centroids = l2_normalize(self._centroids)
+                neighbours, sims = blocked_top_k(
+                    centroids, centroids, top_k=min(8, n), threshold=self.merge_threshold, normalized=True
+                )
+
+                # Union-find over centroid pairs above the threshold
+                parent = np.arange(n)
+
+                def find(x):
+                    while parent[x] != x:
+                        parent[x] = parent[parent[x]]
+                        x = parent[x]
+                    return x
+
+                for a in range(n):
+                    for b, sim in zip(neighbours[a], sims[a]):
+                        if b < 0 or b == a:
+                            continue
+                        ra, rb = find(a), find(b)
+                        if ra != rb:
+                            # Larger cluster absorbs the smaller one
+                            if self._counts[ra] < self._counts[rb]:
+                                ra, rb = rb, ra
+                            parent[rb] = ra
+
+                roots = np.array([find(i) for i in range(n)])
+                if (roots != np.arange(n)).any():
+                    merged = self._merge_groups(roots, centroids)
+
+            if self.max_clusters and len(self._ids) > self.max_clusters:
+                dropped = self._drop_stale(len(self._ids) - self.max_clusters)
+
+            if merged or dropped:
+                self._dirty = True
+                logger.info(f"Online clustering consolidated: {merged} merged, {dropped} dropped")
+
+        return {"merged": merged, "dropped": dropped, "num_clusters": len(self._ids)}
+
+    def _merge_groups(self, roots: np.ndarray, centroids: np.ndarray) -> int:
+        keep = roots == np.arange(len(roots))
+        counts = np.bincount(roots, weights=self._counts, minlength=len(roots))
+        sums = np.zeros_like(self._centroids)
+        np.add.at(sums, roots, self._centroids * self._counts[:, None])
+
+        # Radius grows to cover each absorbed cluster around the new centroid
+        new_centroids = sums / np.maximum(counts, 1)[:, None]
+        spread = 1.0 - np.einsum("ij,ij->i", centroids, l2_normalize(new_centroids)[roots]) + self._radius
+        radius = np.zeros(len(roots), dtype=np.float32)
+        np.maximum.at(radius, roots, spread.astype(np.float32))
+
+        for child in np.flatnonzero(~keep):
+            child_id, root_id = int(self._ids[child]), int(self._ids[roots[child]])
+            self._merged_into[child_id] = root_id
+            child_meta = self._meta.pop(child_id)
+            root_meta = self._meta[root_id]
+            room = self.max_examples - len(root_meta["examples"])
+            root_meta["examples"].extend(child_meta["examples"][:max(room, 0)])
+            root_meta["created_at"] = min(root_meta["created_at"], child_meta["created_at"])
+            root_meta["updated_at"] = max(root_meta["updated_at"], child_meta["updated_at"])
+
+        self._centroids = new_centroids[keep].astype(np.float32)
+        self._counts = counts[keep].astype(np.int64)
+        self._radius = radius[keep]
+        self._ids = self._ids[keep]
+        return int((~keep).sum())
+
+    def _drop_stale(self, excess: int) -> int:
+        singletons = np.flatnonzero(self._counts == 1)
+        if not len(singletons):
+            return 0
+        updated = np.array([self._meta[int(self._ids[i])]["updated_at"] for i in singletons])
+        drop = singletons[np.argsort(updated, kind="stable")[:excess]]
+        for i in drop:
+            self._meta.pop(int(self._ids[i]), None)
+        keep = np.ones(len(self._ids), dtype=bool)
+        keep[drop] = False
+        self._centroids = self._centroids[keep]
+        self._counts = self._counts[keep]
+        self._radius = self._radius[keep]
+        self._ids = self._ids[keep]
+        return len(drop)
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+    def resolve(self, cluster_id: int) -> int:
+        """Follow merges to the id a cluster is now known by"""
+        with self._lock:
+            while cluster_id in self._merged_into:
+                cluster_id = self._merged_into[cluster_id]
+            return cluster_id
+
+    def _summary(self, row: int) -> Dict[str, Any]:
+        cluster_id = int(self._ids[row])
+        meta = self._meta[cluster_id]
+        return {
+            "cluster_id": cluster_id,
+            "size": int(self._counts[row]),
+            "radius": round(float(self._radius[row]), 4),
+            "created_at": meta["created_at"],
+            "updated_at": meta["updated_at"],
+            "examples": meta["examples"]
+        }
+
+    def clusters(self, min_size: int = 1, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Current event clusters, largest first"""
+        with self._lock:
+            rows = np.flatnonzero(self._counts >= min_size)
+            rows = rows[np.argsort(-self._counts[rows], kind="stable")]
+            if limit:
+                rows = rows[:limit]
+            return [self._summary(int(r)) for r in rows]
+
+    def get(self, cluster_id: int) -> Optional[Dict[str, Any]]:
+        """One cluster by id (merged ids resolve to their surviving cluster)"""
+        with self._lock:
+            cluster_id = self.resolve(cluster_id)
+            rows = np.flatnonzero(self._ids == cluster_id)
+            return self._summary(int(rows[0])) if len(rows) else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Cluster state summary"""
+        with self._lock:
+            return {
+                "num_clusters": len(self._ids),
+                "num_items": int(self._counts.sum()),
+                "singletons": int((self._counts == 1).sum()),
+                "dim": self.dim,
+                "assign_threshold": self.assign_threshold,
+                "merge_threshold": self.merge_threshold
+            }
+
+
+# Shared state so the API and the unified processor assign into the same clusters
+online_clusterer = OnlineClusterer()
@@ -6,7 +6,8 @@ from typing import List, Dict, Optional
 from loguru import logger
 
 from ai_service.models.summarizer import TextSummarizer
-from ai_service.utils import TextPreprocessor, validate_text_input, ModelCache
+from ai_service.utils import TextPreprocessor, validate_text_input
+from ai_service.utils.result_cache import ResultCache, model_version
 
 
 class SummarizationPipeline:
@@ -18,7 +19,8 @@ class SummarizationPipeline:
         self,
         model_name: str = "sshleifer/distilbart-cnn-6-6",
         use_cache: bool = True,
-        device: Optional[str] = None
+        device: Optional[str] = None,
+        continuous_batching: bool = False
     ):
         """
         Initialize summarization pipeline
@@ -27,13 +29,18 @@ class SummarizationPipeline:
             model_name: Model to use for summarization
             use_cache: Whether to cache summaries
             device: Device to run model on
+            continuous_batching: Greedy summaries from the continuous-batching decoder
         """
         self.summarizer = TextSummarizer(
             model_name=model_name,
-            device=device
+            device=device,
+            continuous_batching=continuous_batching
         )
         self.preprocessor = TextPreprocessor()
-        self.cache = ModelCache() if use_cache else None
+        # Greedy and beam-search summaries differ, so the decoding mode is part of the version
+        self.cache = ResultCache(
+            "summarize", version=f"{model_version(model_name)}|beams={self.summarizer.default_num_beams}"
+        ) if use_cache else None
         
         logger.info("Summarization pipeline initialized")
     
@@ -67,7 +74,7 @@ class SummarizationPipeline:
             }
         
         # Check cache
-        cache_key = f"summarize_{hash(text)}_{max_length}_{min_length}"
+        cache_key = self.cache.key(text, max_length, min_length) if self.cache else None
         if use_cache and self.cache:
             cached_result = self.cache.get(cache_key)
             if cached_result:
@@ -103,30 +110,61 @@ class SummarizationPipeline:
         self,
         texts: List[str],
         max_length: int = 150,
-        min_length: int = 30
+        min_length: int = 30,
+        use_cache: bool = True
     ) -> List[Dict[str, any]]:
         """
         Process multiple texts through the pipeline
         
+        Uncached, valid texts are summarized together with padded generate calls.
+        
         Args:
             texts: List of texts to summarize
             max_length: Maximum summary length
             min_length: Minimum summary length
+            use_cache: Whether to use cached results
             
         Returns:
             List of summarization results
         """
         logger.info(f"Processing batch of {len(texts)} texts")
         
-        results = []
+        results: List[Optional[Dict[str, any]]] = [None] * len(texts)
+        cache_keys = [self.cache.key(t, max_length, min_length) if self.cache else None for t in texts]
+        todo = []
         for i, text in enumerate(texts):
-            logger.debug(f"Processing text {i+1}/{len(texts)}")
-            result = self.process(
-                text,
-                max_length=max_length,
-                min_length=min_length
-            )
-            results.append(result)
+            is_valid, error_msg = validate_text_input(text, min_length=50)
+            if not is_valid:
+                results[i] = {"success": False, "error": error_msg, "summary": ""}
+                continue
+            if use_cache and self.cache:
+                if cached := self.cache.get(cache_keys[i]):
+                    results[i] = cached
+                    continue
+            todo.append(i)
+        
+        if todo:
+            try:
+                summarized = self.summarizer.batch_summarize(
+                    [texts[i] for i in todo],
+                    max_length=max_length,
+                    min_length=min_length
+                )
+            except Exception as e:
+                # One bad item must not fail the others: summarize one at a time,
+                # so each failure is reported on its own item
+                logger.error(f"Batch summarization failed, summarizing items individually: {e}")
+                summarized = None
+
+            if summarized is None:
+                for i in todo:
+                    results[i] = self.process(texts[i], max_length=max_length, min_length=min_length, use_cache=use_cache)
+            else:
+                for i, result in zip(todo, summarized):
+                    result["success"] = True
+                    if use_cache and self.cache:
+                        self.cache.set(cache_keys[i], result)
+                    results[i] = result
         
         # Add batch statistics
         successful = sum(1 for r in results if r.get("success", False))
@@ -0,0 +1,429 @@
+"""
+Triage Pipeline
+Cheap first-pass gate that decides how much model work a report deserves
+"""
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from ai_service.utils.vector_search import l2_normalize
+
+TRIAGE_DECISIONS = ("reject", "fast_path", "full")
+_WORD_TAIL = re.compile(r"[a-z0-9]*")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercase keywords with whole-word matching,
+    so all keywords are found in a single pass over the text
+    """
+
+    # Inflections a keyword may carry and still count as a whole word ("floods", "flooding")
+    SUFFIXES = ("", "s", "es", "ing", "ed")
+
+    def __init__(self, keywords: Dict[str, Any]):
+        """
+        Args:
+            keywords: keyword -> payload returned with each match
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, Any]]] = [[]]
+
+        for keyword, payload in keywords.items():
+            state = 0
+            for ch in keyword.lower():
+                if ch not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[state][ch] = len(self._goto) - 1
+                state = self._goto[state][ch]
+            self._out[state].append((keyword.lower(), payload))
+
+        # Breadth-first failure links
+        queue = list(self._goto[0].values())
+        while queue:
+            state = queue.pop(0)
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[str, Any]]:
+        """All whole-word keyword occurrences as (keyword, payload)"""
+        text = text.lower()
+        matches = []
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for keyword, payload in self._out[state]:
+                start = end - len(keyword) + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if _WORD_TAIL.match(text, end + 1).group() in self.SUFFIXES:
+                    matches.append((keyword, payload))
+        return matches
+
+
+class TriagePipeline:
+    """
+    Decides per report whether to reject it, fast-path it or process it fully.
+
+    1. Spam/nonsense heuristics (link density, repetition, symbol ratio, spam phrases)
+    2. Disaster keyword automaton over the headline (or the text)
+    3. Only when the keywords are silent: embedding similarity to disaster vs
+       off-topic prototype sentences (a nearest-prototype linear classifier)
+
+    reject    -> no model stage runs
+    fast_path -> short text with unambiguous keywords: classification and
+                 abstractive summarization are skipped and the disaster type
+                 comes from the keywords
+    full      -> every stage runs
+    """
+
+    # keyword -> (general category, specific disaster type)
+    DISASTER_KEYWORDS = {
+        "flood": ("Flood", "Flood"),
+        "flash flood": ("Flood", "Flood"),
+        "inundation": ("Flood", "Flood"),
+        "inundated": ("Flood", "Flood"),
+        "glacial lake outburst": ("Flood", "Flood"),
+        "landslide": ("Landslide", "Landslide"),
+        "mudslide": ("Landslide", "Landslide"),
+        "debris flow": ("Landslide", "Landslide"),
+        "earthquake": ("Earthquake", "Earthquake"),
+        "quake": ("Earthquake", "Earthquake"),
+        "tremor": ("Earthquake", "Seismic Activity"),
+        "aftershock": ("Earthquake", "Seismic Activity"),
+        "fire": ("Fire", "Fire"),
+        "wildfire": ("Fire", "Fire"),
+        "forest fire": ("Fire", "Fire"),
+        "blaze": ("Fire", "Fire"),
+        "storm": ("Storm", "Storm"),
+        "cyclone": ("Storm", "Storm"),
+        "thunderstorm": ("Storm", "Storm"),
+        "hailstorm": ("Storm", "Storm"),
+        "lightning": ("Storm", "Extreme Weather"),
+        "avalanche": ("Avalanche", "Geological Hazard"),
+        "cold wave": ("Disaster", "Extreme Weather"),
+        "heatwave": ("Disaster", "Extreme Weather"),
+        "drought": ("Disaster", "Extreme Weather"),
+        "epidemic": ("Disaster", "Public Health Issue"),
+        "outbreak": ("Disaster", "Public Health Issue"),
+        "cholera": ("Disaster", "Public Health Issue"),
+        "dengue": ("Disaster", "Public Health Issue"),
+        "bus accident": ("Disaster", "Accident"),
+        "road accident": ("Disaster", "Accident"),
+        "plane crash": ("Disaster", "Accident"),
+        "collapsed": ("Disaster", "Infrastructural Failure"),
+        "power outage": ("Utilities", "Utilities Outage"),
+        "blackout": ("Utilities", "Utilities Outage"),
+        "evacuated": ("Disaster", None),
+        "rescue": ("Disaster", None),
+        "death toll": ("Disaster", None),
+        "missing": ("Disaster", None),
+        "injured": ("Disaster", None),
+        "displaced": ("Disaster", None),
+        "relief": ("Disaster", None),
+    }
+
+    SPAM_PHRASES = (
+        "click here", "buy now", "limited offer", "free money", "earn money", "work from home",
+        "casino", "betting", "lottery", "jackpot", "crypto giveaway", "bitcoin giveaway",
+        "subscribe now", "follow for follow", "dm for", "promo code", "discount code", "100% free"
+    )
+
+    DISASTER_PROTOTYPES = [
+        "Floods and landslides hit the district after heavy rainfall, several people missing",
+        "An earthquake struck the region, damaging houses and injuring residents",
+        "Fire destroyed homes in the village and families were displaced",
+        "Rescue teams evacuated residents as the river swelled",
+        "Road blocked and bridge washed away, relief materials distributed to victims",
+        "Outbreak of disease reported, hospitals treating patients in affected areas"
+    ]
+
+    OFF_TOPIC_PROTOTYPES = [
+        "The national cricket team won the match by five wickets",
+        "The film premiere attracted celebrities and fans",
+        "The stock market closed higher as investors bought bank shares",
+        "The party announced its candidates for the upcoming election",
+        "New smartphone launched with a better camera and longer battery life",
+        "Get amazing discounts today, limited time offer on all products"
+    ]
+
+    def __init__(
+        self,
+        spam_threshold: float = 0.6,
+        reject_margin: float = 0.05,
+        fast_path_max_length: int = 600,
+        fast_path_min_hits: int = 2,
+        headline_only: bool = False
+    ):
+        """
+        Args:
+            spam_threshold: Spam score at which a report is rejected
+            reject_margin: Keyword-less reports are rejected when they are closer to the
+                off-topic prototypes than to the disaster prototypes by this margin
+            fast_path_max_length: Longest text (chars) eligible for the fast path
+            fast_path_min_hits: Keyword hits of one disaster category needed for the fast path
+            headline_only: Match keywords and embed only the headline when one is given
+        """
+        self.spam_threshold = spam_threshold
+        self.reject_margin = reject_margin
+        self.fast_path_max_length = fast_path_max_length
+        self.fast_path_min_hits = fast_path_min_hits
+        self.headline_only = headline_only
+
+        self.automaton = KeywordAutomaton(self.DISASTER_KEYWORDS)
+        self._prototypes: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        self._lock = threading.Lock()
+        self.decisions = {decision: 0 for decision in TRIAGE_DECISIONS}
+        self.reasons: Dict[str, int] = {}
+        self.stages_skipped: Dict[str, int] = {}
+        self.saved_ms = 0.0
+        self._stage_ms: Dict[str, float] = {}  # moving average duration of each stage in full runs
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+    def spam_score(self, text: str) -> Tuple[float, List[str]]:
+        """
+        Heuristic spam / nonsense score in [0, 1] with the signals that fired
+        """
+        signals = []
+        score = 0.0
+        lower = text.lower()
+        tokens = re.findall(r"[^\W_]+", lower)
+
+        if not tokens:
+            return 1.0, ["no_words"]
+
+        links = len(re.findall(r"https?://|www\.", lower))
+        if links >= 3 or links / max(len(tokens), 1) > 0.05:
+            score += 0.4
+            signals.append("link_density")
+
+        phrases = [p for p in self.SPAM_PHRASES if p in lower]
+        if phrases:
+            score += min(0.3 * len(phrases), 0.6)
+            signals.append("spam_phrases")
+
+        if len(tokens) >= 8 and len(set(tokens)) / len(tokens) < 0.3:
+            score += 0.4
+            signals.append("repetitive")
+
+        letters = sum(ch.isalpha() for ch in text)
+        if letters / max(len(text), 1) < 0.5:
+            score += 0.3
+            signals.append("symbol_heavy")
+
+        if re.search(r"(.)\1{5,}", lower):
+            score += 0.2
+            signals.append("repeated_chars")
+
+        # Gibberish: long "words" without vowels are rare in real English/romanized Nepali
+        no_vowel = sum(1 for t in tokens if len(t) >= 5 and t.isalpha() and not re.search(r"[aeiouy]", t))
+        if no_vowel / len(tokens) > 0.2:
+            score += 0.6 if no_vowel / len(tokens) > 0.4 else 0.4
+            signals.append("gibberish")
+
+        if len(text) > 20 and sum(ch.isupper() for ch in text) / max(letters, 1) > 0.7:
+            score += 0.2
+            signals.append("all_caps")
+
+        return min(score, 1.0), signals
+
+    def keyword_hits(self, text: str) -> Dict[str, Any]:
+        """Disaster keyword counts per category and the dominant category/type"""
+        by_category: Dict[str, int] = {}
+        by_type: Dict[str, int] = {}
+        keywords = set()
+        for keyword, (category, disaster_type) in self.automaton.find(text):
+            keywords.add(keyword)
+            by_category[category] = by_category.get(category, 0) + 1
+            if disaster_type:
+                by_type[disaster_type] = by_type.get(disaster_type, 0) + 1
+
+        # Generic words ("rescue", "relief") support a report but do not name a hazard
+        specific = {c: n for c, n in by_category.items() if c != "Disaster"} or by_category
+        category = max(specific, key=specific.get) if specific else None
+        disaster_type = max(by_type, key=by_type.get) if by_type else None
+        return {
+            "total": sum(by_category.values()),
+            "by_category": by_category,
+            "category": category,
+            "category_hits": specific.get(category, 0) if category else 0,
+            "disaster_type": disaster_type,
+            "keywords": sorted(keywords)
+        }
+
+    def topic_score(self, embedding: np.ndarray, embed: Callable[[List[str]], np.ndarray]) -> float:
+        """
+        Best disaster-prototype similarity minus best off-topic-prototype similarity
+        """
+        if self._prototypes is None or self._prototypes[0].shape[1] != embedding.shape[-1]:
+            disaster = l2_normalize(np.asarray(embed(self.DISASTER_PROTOTYPES), dtype=np.float32))
+            off_topic = l2_normalize(np.asarray(embed(self.OFF_TOPIC_PROTOTYPES), dtype=np.float32))
+            self._prototypes = (disaster, off_topic)
+        disaster, off_topic = self._prototypes
+        vector = l2_normalize(np.asarray(embedding, dtype=np.float32).reshape(1, -1))[0]
+        return float((disaster @ vector).max() - (off_topic @ vector).max())
+
+    # ------------------------------------------------------------------
+    # Decision
+    # ------------------------------------------------------------------
+    def assess(
+        self,
+        text: str,
+        headline: Optional[str] = None,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> Dict[str, Any]:
+        """
+        Triage one report
+
+        Args:
+            text: Report text
+            headline: Optional headline (used alone when headline_only is set)
+            embed: Optional texts -> (n, d) embeddings function; only called when
+                the keywords are silent
+
+        Returns:
+            {"decision", "reason", "spam_score", "spam_signals", "keywords",
+             "category", "disaster_type", "topic_score"}
+        """
+        if self.headline_only and headline:
+            subject = keyword_subject = headline
+        else:
+            subject = text
+            keyword_subject = text if not headline or headline in text else f"{headline}. {text}"
+        spam, spam_signals = self.spam_score(text)
+        hits = self.keyword_hits(keyword_subject)
+
+        result = {
+            "decision": "full",
+            "reason": "default",
+            "spam_score": round(spam, 3),
+            "spam_signals": spam_signals,
+            "keywords": hits["keywords"],
+            "category": hits["category"],
+            "disaster_type": hits["disaster_type"],
+            "topic_score": None
+        }
+
+        if spam >= self.spam_threshold:
+            result.update(decision="reject", reason="spam")
+        elif hits["total"] == 0:
+            result["reason"] = "no_keywords"
+            if embed is not None:
+                try:
+                    self._apply_topic(result, self.topic_score(embed([subject])[0], embed))
+                except Exception as e:
+                    logger.warning(f"Triage embedding check failed: {e}")
+        elif (
+            len(text) <= self.fast_path_max_length
+            and hits["category_hits"] >= self.fast_path_min_hits
+            and hits["disaster_type"] is not None
+            and len([c for c in hits["by_category"] if c != "Disaster"]) == 1
+        ):
+            result.update(decision="fast_path", reason="clear_keywords")
+        else:
+            result["reason"] = "needs_models"
+
+        return result
+
+    def assess_batch(
+        self,
+        texts: List[str],
+        headlines: Optional[List[Optional[str]]] = None,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        assess() for many reports; keyword-silent reports are embedded in one call
+        """
+        headlines = list(headlines) if headlines else [None] * len(texts)
+        results = [self.assess(t, h) for t, h in zip(texts, headlines)]
+
+        todo = [i for i, r in enumerate(results) if r["reason"] == "no_keywords"]
+        if todo and embed is not None:
+            subjects = [
+                headlines[i] if self.headline_only and headlines[i] else texts[i]
+                for i in todo
+            ]
+            try:
+                embeddings = embed(subjects)
+                for i, embedding in zip(todo, embeddings):
+                    self._apply_topic(results[i], self.topic_score(embedding, embed))
+            except Exception as e:
+                logger.warning(f"Triage embedding check failed: {e}")
+        return results
+
+    def _apply_topic(self, result: Dict[str, Any], score: float) -> None:
+        result["topic_score"] = round(score, 4)
+        if score < -self.reject_margin:
+            result.update(decision="reject", reason="off_topic")
+        else:
+            result["reason"] = "topic_uncertain"
+
+    # ------------------------------------------------------------------
+    # Accounting
+    # ------------------------------------------------------------------
+    def record(self, triage: Dict[str, Any], skipped_stages: List[str]) -> None:
+        """Count a decision and the stages it skipped (with their estimated cost)"""
+        with self._lock:
+            self.decisions[triage["decision"]] += 1
+            reason = f"{triage['decision']}:{triage['reason']}"
+            self.reasons[reason] = self.reasons.get(reason, 0) + 1
+            for stage in skipped_stages:
+                self.stages_skipped[stage] = self.stages_skipped.get(stage, 0) + 1
+                self.saved_ms += self._stage_ms.get(stage, 0.0)
+
+    def record_timings(self, stage_timings: Dict[str, Dict[str, Any]], alpha: float = 0.1) -> None:
+        """Feed stage durations of full runs so skipped stages can be costed"""
+        with self._lock:
+            for stage, timing in stage_timings.items():
+                ms = timing.get("duration_ms")
+                if ms is None:
+                    continue
+                previous = self._stage_ms.get(stage)
+                self._stage_ms[stage] = ms if previous is None else (1 - alpha) * previous + alpha * ms
+
+    def stage_estimate_ms(self, stage: str) -> Optional[float]:
+        """Moving average duration of a stage in full runs (None until one was recorded)"""
+        with self._lock:
+            return self._stage_ms.get(stage)
+
+    def stats(self) -> Dict[str, Any]:
+        """Decision counts, reasons, skipped stages and estimated compute saved"""
+        with self._lock:
+            total = sum(self.decisions.values())
+            return {
+                "total": total,
+                "decisions": dict(self.decisions),
+                "reasons": dict(self.reasons),
+                "stages_skipped": dict(self.stages_skipped),
+                "estimated_saved_ms": round(self.saved_ms, 1),
+                "avg_stage_ms": {k: round(v, 1) for k, v in self._stage_ms.items()},
+                "headline_only": self.headline_only
+            }
+
+
+def lead_summary(text: str, num_sentences: int = 2, max_chars: int = 300) -> str:
+    """Extractive summary from the first sentences (used when abstractive summarization is skipped)"""
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", text.strip()) if s.strip()]
+    summary = " ".join(sentences[:num_sentences])
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(" ", 1)[0] + "..."
+    return summary
+
+
+# Shared so counters cover every processor in the process
+triage_pipeline = TriagePipeline()
@@ -3,10 +3,15 @@ Utility functions for AI service
 """
 import os
 import re
+import sys
+import time
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional, Tuple
 from loguru import logger
 import numpy as np
-from datetime import datetime
 
 
 class TextPreprocessor:
@@ -68,39 +73,131 @@ class TextPreprocessor:
         return [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
 
 
+def approx_size(value: Any) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes
+    (containers are walked; numpy arrays and tensors count their buffers)
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 96
+    if hasattr(value, "element_size") and hasattr(value, "nelement"):  # torch tensor
+        return value.element_size() * value.nelement() + 96
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# Live caches by name, reported by the cache stats endpoint
+model_caches: "weakref.WeakValueDictionary[str, ModelCache]" = weakref.WeakValueDictionary()
+
+
 class ModelCache:
-    """Simple in-memory cache for model predictions"""
+    """
+    Thread-safe in-memory LRU cache for model predictions.
+
+    Entries live in an OrderedDict kept in recency order, so get and set are
+    O(1): a hit moves the key to the end and eviction pops from the front.
+    An entry expires after its TTL, and least recently used entries are evicted
+    while the cache holds more than max_size entries or max_bytes (approximate).
+    """
     
-    def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, Any] = {}
+    def __init__(
+        self,
+        max_size: int = 1000,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        name: Optional[str] = None,
+        register: bool = True
+    ):
+        """
+        Args:
+            max_size: Most entries held
+            ttl: Default seconds an entry stays valid (None: until evicted)
+            max_bytes: Approximate memory budget of the values (None: unbounded)
+            name: Name the cache is reported under in stats
+            register: List the cache in model_caches (off for caches reported by their owner)
+        """
         self.max_size = max_size
-        self.access_times: Dict[str, datetime] = {}
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.name = name or f"cache-{id(self):x}"
+        # key -> (value, expires_at or None, approximate bytes)
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if register:
+            model_caches[self.name] = self
+    
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
     
     def get(self, key: str) -> Optional[Any]:
-        """Get cached value"""
-        if key in self.cache:
-            self.access_times[key] = datetime.now()
-            logger.debug(f"Cache hit for key: {key[:50]}...")
-            return self.cache[key]
-        return None
-    
-    def set(self, key: str, value: Any) -> None:
-        """Set cached value with LRU eviction"""
-        if len(self.cache) >= self.max_size:
-            # Remove least recently used item
-            oldest_key = min(self.access_times, key=self.access_times.get)
-            del self.cache[oldest_key]
-            del self.access_times[oldest_key]
-        
-        self.cache[key] = value
-        self.access_times[key] = datetime.now()
+        """Get cached value (None when missing or expired)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        logger.debug(f"Cache hit for key: {key[:50]}...")
+        return entry[0]
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set cached value (ttl overrides the cache default) with LRU eviction"""
+        ttl = self.ttl if ttl is None else ttl
+        size = approx_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None, size)
+            self.bytes += size
+            while len(self._entries) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
         logger.debug(f"Cached value for key: {key[:50]}...")
     
     def clear(self) -> None:
         """Clear all cached values"""
-        self.cache.clear()
-        self.access_times.clear()
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
         logger.info("Cache cleared")
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entries, approximate bytes and hit / miss / eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_size": self.max_size,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
 
 
 def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
@@ -124,6 +221,30 @@ def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     return dot_product / (norm1 * norm2)
 
 
+def stable_digest(*parts: Any, digest_size: int = 16) -> str:
+    """
+    Stable content digest (blake2b) of the given parts
+    
+    Unlike the built-in hash(), the result is identical across processes and
+    restarts, so it can key persistent or shared stores.
+    
+    Args:
+        parts: Values to digest (converted with str(); None is distinct from "")
+        digest_size: Digest size in bytes
+        
+    Returns:
+        Hex digest string
+    """
+    h = hashlib.blake2b(digest_size=digest_size)
+    for part in parts:
+        if part is None:
+            h.update(b"\x00")
+        else:
+            h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
 def setup_logging(log_level: str = "INFO") -> None:
     """
     Configure logging for the application
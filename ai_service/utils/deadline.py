@@ -0,0 +1,44 @@
+"""
+Deadline
+Time budget that is created once per request and handed down to every stage
+"""
+import time
+from typing import Any, Dict, Optional
+
+
+class Deadline:
+    """
+    Absolute expiry time for a request. Stages ask for the remaining budget
+    instead of receiving fixed timeouts, so time spent queueing, extracting or in
+    earlier stages is accounted for automatically.
+    """
+
+    def __init__(self, budget_ms: float):
+        self.budget_ms = float(budget_ms)
+        self.started = time.monotonic()
+        self.expires_at = self.started + self.budget_ms / 1000.0
+
+    @classmethod
+    def from_ms(cls, budget_ms: Optional[float]) -> Optional["Deadline"]:
+        """A deadline for budget_ms, or None when no budget was requested"""
+        return cls(budget_ms) if budget_ms else None
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def allows(self, estimate_ms: Optional[float]) -> bool:
+        """Whether a stage expected to take estimate_ms can still finish in time"""
+        if self.expired():
+            return False
+        return estimate_ms is None or estimate_ms / 1000.0 <= self.remaining()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": self.budget_ms,
+            "elapsed_ms": round((time.monotonic() - self.started) * 1000, 1),
+            "remaining_ms": round(self.remaining() * 1000, 1)
+        }
@@ -0,0 +1,269 @@
+"""
+Embedding Store
+Content-addressed, memory-mapped embedding storage with a bounded in-memory LRU tier
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from ai_service.utils import stable_digest
+
+# Optional imports
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+
+class EmbeddingStore:
+    """
+    Embeddings keyed by a stable digest of the text, persisted in a memory-mapped array.
+
+    Layout (one directory per embedding model):
+        vectors.bin  raw (capacity, dim) array of float16/float32, grown by doubling
+        keys.bin     append-only list of 16-byte digests; row i of vectors.bin belongs to key i
+
+    A vector is always written before its key, so any process that sees a key can
+    read its row. Read-only instances (e.g. extra uvicorn workers) pick up rows
+    appended by the writer by re-reading the tail of keys.bin. Appends from several
+    processes are serialized with an advisory file lock where the OS supports it.
+    """
+
+    KEY_BYTES = 16
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: Optional[int] = None,
+        base_dir: str = "ai_service/data/embeddings",
+        dtype: str = "float16",
+        memory_items: int = 10000,
+        read_only: bool = False,
+        initial_capacity: int = 4096
+    ):
+        """
+        Args:
+            model_name: Embedding model name (one store per model)
+            dim: Embedding dimension (required only when the store does not exist yet)
+            base_dir: Root directory for stores
+            dtype: On-disk precision, 'float16' or 'float32'
+            memory_items: Size of the in-memory LRU tier
+            read_only: Never write; only read rows written by another process
+            initial_capacity: Rows preallocated when the store is created
+        """
+        self.model_name = model_name
+        self.path = os.path.join(base_dir, re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name))
+        self.dtype = np.dtype(dtype)
+        self.memory_items = memory_items
+        self.read_only = read_only
+        self.initial_capacity = initial_capacity
+
+        self._lock = threading.RLock()
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._vectors: Optional[np.memmap] = None
+        self.dim = dim
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        meta = self._read_meta()
+        if meta:
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+        self._refresh_keys()
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.bin")
+
+    @property
+    def _keys_path(self) -> str:
+        return os.path.join(self.path, "keys.bin")
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.txt")
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        if not os.path.exists(self._meta_path):
+            return None
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            dim, dtype = f.read().split()
+        return {"dim": int(dim), "dtype": dtype}
+
+    def _create(self) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        if not os.path.exists(self._meta_path):
+            tmp = self._meta_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(f"{self.dim} {self.dtype.name}")
+            os.replace(tmp, self._meta_path)
+        if not os.path.exists(self._vectors_path):
+            with open(self._vectors_path, "wb") as f:
+                f.truncate(self.initial_capacity * self.dim * self.dtype.itemsize)
+            open(self._keys_path, "ab").close()
+        logger.info(f"Created embedding store at {self.path} ({self.dim}-d {self.dtype.name})")
+
+    def _map(self, min_rows: int = 0) -> Optional[np.memmap]:
+        """Map vectors.bin, remapping if the file has grown past the current view"""
+        if self._vectors is not None and len(self._vectors) >= min_rows:
+            return self._vectors
+        if not self.dim and (meta := self._read_meta()):
+            # Store was created by another process after this one started
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+        if not os.path.exists(self._vectors_path) or not self.dim:
+            return None
+        rows = os.path.getsize(self._vectors_path) // (self.dim * self.dtype.itemsize)
+        mode = "r" if self.read_only else "r+"
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode=mode, shape=(rows, self.dim))
+        return self._vectors
+
+    def _refresh_keys(self) -> None:
+        """Pick up keys appended since the last read (by this or another process)"""
+        if not os.path.exists(self._keys_path):
+            return
+        size = os.path.getsize(self._keys_path)
+        size -= size % self.KEY_BYTES
+        if size <= self._keys_offset:
+            return
+        with open(self._keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            data = f.read(size - self._keys_offset)
+        row = self._keys_offset // self.KEY_BYTES
+        for i in range(0, len(data), self.KEY_BYTES):
+            self._rows[data[i:i + self.KEY_BYTES].hex()] = row
+            row += 1
+        self._keys_offset = size
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def key(self, text: str) -> str:
+        """Stable content key for a text"""
+        return stable_digest(text, digest_size=self.KEY_BYTES)
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings for texts; missing entries are None
+        """
+        out: List[Optional[np.ndarray]] = []
+        with self._lock:
+            refreshed = False
+            for text in texts:
+                key = self.key(text)
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    self.hits += 1
+                    out.append(vector)
+                    continue
+
+                row = self._rows.get(key)
+                if row is None and not refreshed:
+                    self._refresh_keys()
+                    refreshed = True
+                    row = self._rows.get(key)
+
+                vectors = self._map(row + 1) if row is not None else None
+                if vectors is None:
+                    self.misses += 1
+                    out.append(None)
+                    continue
+
+                vector = np.array(vectors[row], dtype=np.float32)
+                self._remember(key, vector)
+                self.disk_hits += 1
+                out.append(vector)
+        return out
+
+    def put_many(self, texts: List[str], embeddings: np.ndarray) -> None:
+        """
+        Store embeddings for texts (already-stored texts are skipped)
+        """
+        embeddings = np.asarray(embeddings)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(embeddings.shape[1])
+            new = []
+            seen = set()
+            for text, vector in zip(texts, embeddings):
+                key = self.key(text)
+                self._remember(key, np.asarray(vector, dtype=self.dtype).astype(np.float32))
+                if key not in self._rows and key not in seen:
+                    new.append((key, vector))
+                    seen.add(key)
+
+            if new and not self.read_only:
+                self._append(new)
+
+    def _append(self, items: List[tuple]) -> None:
+        if not os.path.exists(self._meta_path):
+            self._create()
+
+        with open(self._keys_path, "ab") as keys_file:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have appended rows meanwhile
+                self._refresh_keys()
+                items = [(k, v) for k, v in items if k not in self._rows]
+                if not items:
+                    return
+
+                start = self._keys_offset // self.KEY_BYTES
+                end = start + len(items)
+                vectors = self._map(end)
+                if vectors is None or len(vectors) < end:
+                    capacity = max(end, 2 * (len(vectors) if vectors is not None else self.initial_capacity))
+                    vectors = self._vectors = None  # release the old mapping before resizing
+                    with open(self._vectors_path, "r+b") as f:
+                        f.truncate(capacity * self.dim * self.dtype.itemsize)
+                    vectors = self._map(end)
+
+                vectors[start:end] = np.stack([v for _, v in items]).astype(self.dtype)
+                vectors.flush()
+
+                keys_file.write(b"".join(bytes.fromhex(k) for k, _ in items))
+                keys_file.flush()
+                for offset, (k, _) in enumerate(items):
+                    self._rows[k] = start + offset
+                self._keys_offset = end * self.KEY_BYTES
+            finally:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(keys_file, fcntl.LOCK_UN)
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.memory_items:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Store size and hit counters"""
+        with self._lock:
+            return {
+                "path": self.path,
+                "dtype": self.dtype.name,
+                "dim": self.dim,
+                "stored": len(self._rows),
+                "in_memory": len(self._lru),
+                "memory_hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "read_only": self.read_only
+            }
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -0,0 +1,217 @@
+"""
+Inference Executor
+Bounded, priority-aware worker pool that endpoints and background jobs submit model calls to
+"""
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+import numpy as np
+
+from ai_service.utils.micro_batcher import QueueFullError
+
+# Share of worker time each class gets while all of them have work queued
+PRIORITY_WEIGHTS = {
+    "interactive": 8.0,  # user-facing requests (report submissions, API calls)
+    "background": 2.0,   # periodic news refresh and fetch cycles
+    "bulk": 1.0          # batch reprocessing and model refits
+}
+
+
+class _Task:
+    __slots__ = ("fn", "args", "kwargs", "future", "priority", "submitted", "finish_tag")
+
+    def __init__(self, fn, args, kwargs, priority: str, finish_tag: float):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+        self.priority = priority
+        self.submitted = time.time()
+        self.finish_tag = finish_tag
+
+
+def _percentiles(values) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    values = np.array(values)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "max": round(float(values.max()), 2)
+    }
+
+
+class InferenceExecutor:
+    """
+    Runs blocking pipeline calls off the event loop on a dedicated pool.
+
+    Calls are queued per priority class and dispatched by weighted fair queuing:
+    each call gets a virtual finish tag of max(virtual time, its class's last tag)
+    + 1 / weight, and a free worker always takes the smallest tag. An interactive
+    call therefore overtakes queued background work after at most one running
+    call per worker, while background work still progresses. Long background
+    jobs submit one small chunk at a time, so they yield between chunks.
+
+    At most max_queue calls per class wait for a worker; beyond that submit()
+    fails fast with QueueFullError (carrying a Retry-After estimate) instead of
+    letting requests pile up behind slow ones.
+    """
+
+    def __init__(
+        self,
+        name: str = "inference",
+        max_workers: Optional[int] = None,
+        max_queue: int = 64,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            name: Executor name (thread names and errors)
+            max_workers: Concurrent calls (default: half the cores, at least 2, at most 8)
+            max_queue: Calls per priority class allowed to wait for a worker
+            weights: Priority class weights (default PRIORITY_WEIGHTS)
+        """
+        self.name = name
+        self.max_workers = max_workers or min(8, max(2, (os.cpu_count() or 2) // 2))
+        self.max_queue = max_queue
+        self.weights = dict(weights or PRIORITY_WEIGHTS)
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[_Task]] = {p: deque() for p in self.weights}
+        self._last_tag: Dict[str, float] = {p: 0.0 for p in self.weights}
+        self._virtual_time = 0.0
+        self._stopped = False
+
+        self.running = 0
+        self._counters = {p: {"completed": 0, "failed": 0, "rejected": 0} for p in self.weights}
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=2048) for p in self.weights}
+        self._latencies: Dict[str, Deque[float]] = {p: deque(maxlen=2048) for p in self.weights}
+        self._runs: Deque[float] = deque(maxlen=2048)
+
+        self._threads: List[threading.Thread] = []
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _retry_after(self, priority: str) -> float:
+        """Seconds until the class's queue should have drained enough to accept a call"""
+        run_s = (sum(self._runs) / len(self._runs) / 1000.0) if self._runs else 1.0
+        return round(max(1.0, (len(self._queues[priority]) + 1) / self.max_workers * run_s), 1)
+
+    def submit(self, fn: Callable[..., Any], *args, priority: str = "interactive", **kwargs) -> Future:
+        """
+        Queue fn(*args, **kwargs) in a priority class; for callers outside the event loop
+
+        Raises:
+            QueueFullError: When max_queue calls of that class are already waiting
+        """
+        if priority not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority}")
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"Executor '{self.name}' is shut down")
+            queue = self._queues[priority]
+            if len(queue) >= self.max_queue:
+                self._counters[priority]["rejected"] += 1
+                raise QueueFullError(f"{self.name}:{priority}", self._retry_after(priority))
+            start_tag = max(self._virtual_time, self._last_tag[priority])
+            task = _Task(fn, args, kwargs, priority, start_tag + 1.0 / self.weights[priority])
+            self._last_tag[priority] = task.finish_tag
+            queue.append(task)
+            self._cond.notify()
+        return task.future
+
+    async def run(self, fn: Callable[..., Any], *args, priority: str = "interactive", **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs) on the pool
+
+        Raises:
+            QueueFullError: When max_queue calls of that class are already waiting
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, priority=priority, **kwargs))
+
+    def _next_task(self) -> Optional[_Task]:
+        with self._cond:
+            while True:
+                heads = [q[0] for q in self._queues.values() if q]
+                if heads:
+                    task = min(heads, key=lambda t: t.finish_tag)
+                    self._queues[task.priority].popleft()
+                    self._virtual_time = max(self._virtual_time, task.finish_tag - 1.0 / self.weights[task.priority])
+                    return task
+                if self._stopped:
+                    return None
+                self._cond.wait()
+
+    def _worker(self) -> None:
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            # A call cancelled while queued (client gone) is dropped here
+            if not task.future.set_running_or_notify_cancel():
+                continue
+
+            start = time.time()
+            with self._cond:
+                self.running += 1
+                self._waits[task.priority].append((start - task.submitted) * 1000)
+            try:
+                task.future.set_result(task.fn(*task.args, **task.kwargs))
+                outcome = "completed"
+            except BaseException as e:
+                task.future.set_exception(e)
+                outcome = "failed"
+            end = time.time()
+            with self._cond:
+                self.running -= 1
+                self._counters[task.priority][outcome] += 1
+                self._runs.append((end - start) * 1000)
+                self._latencies[task.priority].append((end - task.submitted) * 1000)
+
+    def shutdown(self) -> None:
+        """Cancel queued calls and stop the workers once running calls finish"""
+        with self._cond:
+            self._stopped = True
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft().future.cancel()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running calls and per-class wait / end-to-end latency percentiles"""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": sum(len(q) for q in self._queues.values()),
+                "running": self.running,
+                "run_ms": _percentiles(list(self._runs)),
+                "classes": {
+                    priority: {
+                        "weight": self.weights[priority],
+                        "queue_depth": len(self._queues[priority]),
+                        **self._counters[priority],
+                        "queue_wait_ms": _percentiles(list(self._waits[priority])),
+                        "latency_ms": _percentiles(list(self._latencies[priority]))
+                    }
+                    for priority in self.weights
+                }
+            }
+
+
+def _from_env() -> InferenceExecutor:
+    workers = os.getenv("AI_INFERENCE_WORKERS")
+    return InferenceExecutor(
+        max_workers=int(workers) if workers else None,
+        max_queue=int(os.getenv("AI_INFERENCE_QUEUE", "64"))
+    )
+
+
+# Shared by every endpoint and background job so the bound and priorities apply service-wide
+inference_executor = _from_env()
@@ -0,0 +1,388 @@
+"""
+Job Queue
+Durable SQLite-backed job queue with a retrying worker pool
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+def _worker_alive(worker: Optional[str]) -> bool:
+    """
+    Whether the process that claimed a job (worker id "pid:thread") still exists.
+    Our own pid counts as gone: recovery runs before this process claims anything,
+    so such a job was left by an earlier process that had the same pid (containers).
+    """
+    try:
+        pid = int((worker or "").split(":", 1)[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Jobs persisted in a single SQLite file (a local stand-in for a message broker).
+
+    A job is claimed under a lease; a worker that dies leaves it to be re-queued
+    when the lease expires. Failed attempts are retried with exponential backoff
+    until max_attempts, after which the job is marked failed with its last error.
+    An attempt whose worker died counts too, so a job that keeps killing its
+    worker ends up failed rather than retried forever. Only the worker holding
+    the lease can complete or fail a job.
+    """
+
+    def __init__(
+        self,
+        path: str = "ai_service/data/jobs.sqlite3",
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        lease_seconds: float = 600.0,
+        keep_finished_hours: float = 72.0
+    ):
+        """
+        Args:
+            path: SQLite database file
+            max_attempts: Attempts per job before it is marked failed
+            retry_backoff: Delay (seconds) before the first retry; doubles per attempt
+            lease_seconds: A running job not finished within this is re-queued
+            keep_finished_hours: Finished jobs older than this are purged
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self.keep_finished_hours = keep_finished_hours
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._available = threading.Condition()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                result TEXT,
+                error TEXT,
+                worker TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                lease_until REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at, created_at)")
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+    def submit(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> str:
+        """Persist a job and return its id"""
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at, available_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), max_attempts or self.max_attempts, now, now, now)
+            )
+        with self._available:
+            self._available.notify()
+        return job_id
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        """Job status (and result once finished), or None if unknown"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row, include_result) if row else None
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+    def claim(self, worker: str, kinds: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest ready job (expired leases count as ready)
+
+        Returns:
+            The claimed job with its payload, or None if nothing is ready
+        """
+        now = time.time()
+        kind_filter = ""
+        params: List[Any] = [now, now]
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            params.extend(kinds)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE ((status = 'queued' AND available_at <= ?) "
+                        "OR (status = 'running' AND lease_until < ?))" + kind_filter +
+                        " ORDER BY created_at LIMIT 1",
+                        params
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    if row["status"] != "running":
+                        break
+                    if row["attempts"] < row["max_attempts"]:
+                        logger.warning(f"Job {row['id']} lease expired (worker {row['worker']}), reclaiming")
+                        break
+                    self._fail_dead_attempt(row, "lease expired", now)
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?, "
+                    "started_at = ?, updated_at = ?, lease_until = ? WHERE id = ?",
+                    (worker, now, now, now + self.lease_seconds, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        job = self._to_dict(row, include_result=False)
+        job["payload"] = json.loads(row["payload"])
+        job["attempts"] = row["attempts"] + 1
+        job["status"] = "running"
+        return job
+
+    def complete(self, job_id: str, result: Any, worker: str) -> bool:
+        """
+        Mark a job succeeded and store its result
+
+        Returns:
+            False if the worker no longer holds the job (its lease expired and the
+            job was reclaimed or failed), in which case nothing is written
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'succeeded', result = ?, error = NULL, "
+                "finished_at = ?, updated_at = ?, lease_until = NULL "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (json.dumps(result, default=str), now, now, job_id, worker)
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, error: str, worker: str) -> str:
+        """
+        Record a failed attempt: re-queue with backoff, or mark failed when out of attempts
+
+        Returns:
+            The job's new status; "lost" if the worker no longer holds the job
+            (nothing is written) and "unknown" if there is no such job
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, worker, attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return "unknown"
+            if row["status"] != "running" or row["worker"] != worker:
+                return "lost"
+            if row["attempts"] < row["max_attempts"]:
+                delay = self.retry_backoff * 2 ** (row["attempts"] - 1)
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, "
+                    "updated_at = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                    (error, now + delay, now, job_id, worker)
+                )
+                return "queued"
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, "
+                "updated_at = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                (error, now, now, job_id, worker)
+            )
+            return "failed"
+
+    def _fail_dead_attempt(self, row: sqlite3.Row, reason: str, now: float) -> None:
+        """Mark a running job whose worker died on its last attempt as failed (caller holds the lock)"""
+        error = f"{reason} / worker died ({row['worker']}) on attempt {row['attempts']}/{row['max_attempts']}"
+        self._conn.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ?, "
+            "lease_until = NULL WHERE id = ? AND status = 'running'",
+            (error, now, now, row["id"])
+        )
+        logger.error(f"Job {row['id']} failed: {error}")
+
+    def recover(self) -> int:
+        """
+        Re-queue running jobs whose worker process is gone (e.g. after a restart),
+        without waiting for their lease to expire. Jobs already on their last
+        attempt are marked failed instead.
+
+        Returns:
+            Number of re-queued jobs
+        """
+        now = time.time()
+        recovered = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, worker, attempts, max_attempts FROM jobs WHERE status = 'running'"
+            ).fetchall()
+            for row in rows:
+                if _worker_alive(row["worker"]):
+                    continue
+                if row["attempts"] >= row["max_attempts"]:
+                    self._fail_dead_attempt(row, "process restarted", now)
+                    continue
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', available_at = ?, updated_at = ?, "
+                    "lease_until = NULL WHERE id = ? AND status = 'running'",
+                    (now, now, row["id"])
+                )
+                recovered += 1
+        if recovered:
+            logger.info(f"Re-queued {recovered} jobs interrupted by a restart")
+        return recovered
+
+    def wait_for_work(self, timeout: float) -> None:
+        """Sleep until a job is submitted or the timeout expires"""
+        with self._available:
+            self._available.wait(timeout)
+
+    def purge(self) -> int:
+        """Delete finished jobs older than keep_finished_hours"""
+        cutoff = time.time() - self.keep_finished_hours * 3600
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Job counts by status and the age of the oldest queued job"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return {
+            "counts": counts,
+            "oldest_queued_seconds": round(time.time() - oldest, 1) if oldest else None
+        }
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row, include_result: bool) -> Dict[str, Any]:
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"]
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+
+class JobWorkerPool:
+    """
+    Threads that claim jobs from a JobQueue and run the handler registered for
+    their kind. A handler returns the job result; raising marks the attempt failed.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+        workers: int = 2,
+        poll_interval: float = 1.0
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+        self.failed_attempts = 0
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        self.queue.recover()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"Job worker pool started ({self.workers} workers)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop claiming new jobs; running jobs finish (or are reclaimed after their lease)"""
+        self._stop.set()
+        with self.queue._available:
+            self.queue._available.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self) -> None:
+        worker = f"{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(worker, kinds=list(self.handlers))
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                self.queue.wait_for_work(self.poll_interval)
+                continue
+
+            try:
+                result = self.handlers[job["kind"]](job["payload"])
+                if self.queue.complete(job["job_id"], result, worker):
+                    self.completed += 1
+                else:
+                    logger.warning(f"Job {job['job_id']} finished after its lease was lost; result dropped")
+            except Exception as e:
+                self.failed_attempts += 1
+                status = self.queue.fail(job["job_id"], str(e), worker)
+                logger.warning(
+                    f"Job {job['job_id']} attempt {job['attempts']}/{job['max_attempts']} failed ({e}); now {status}"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "alive": sum(t.is_alive() for t in self._threads),
+            "completed": self.completed,
+            "failed_attempts": self.failed_attempts,
+            **self.queue.stats()
+        }
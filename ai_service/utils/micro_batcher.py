@@ -0,0 +1,250 @@
+"""
+Micro-Batching
+Coalesces concurrent single-item requests into padded batch calls per model
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a batcher's queue is at its limit"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Batch queue '{name}' is full")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def estimate_tokens(item: Any) -> int:
+    """Rough subword token count of a request (about 4 characters per token)"""
+    if isinstance(item, dict):
+        item = item.get("text")
+    elif isinstance(item, (tuple, list)):
+        return estimate_tokens(item[0]) if item else 1
+    return len(item or "") // 4 + 1
+
+
+def run_grouped(batch_fn: Callable[..., List[Any]], entries: List[Tuple[Any, Tuple]]) -> List[Any]:
+    """
+    Run (item, params) entries through batch_fn(items, **params) once per distinct
+    params, returning results in entry order. params is a tuple of (name, value)
+    pairs; a group whose call raises fails only its own entries.
+    """
+    groups: Dict[Tuple, List[int]] = {}
+    for index, (_, params) in enumerate(entries):
+        groups.setdefault(params, []).append(index)
+    results: List[Any] = [None] * len(entries)
+    for params, indices in groups.items():
+        try:
+            group_results = batch_fn([entries[i][0] for i in indices], **dict(params))
+            if len(group_results) != len(indices):
+                raise RuntimeError(f"batch_fn returned {len(group_results)} results for {len(indices)} items")
+        except Exception as e:
+            group_results = [e] * len(indices)
+        for i, result in zip(indices, group_results):
+            results[i] = result
+    return results
+
+
+class MicroBatcher:
+    """
+    Collects requests for one model and runs them through batch_fn together.
+
+    A batch closes when max_wait_ms has passed since its first request, when it
+    holds max_batch_size requests, or when the next request would push the padded
+    size (batch size x longest request, in tokens) past max_batch_tokens. Each
+    caller gets a Future resolved with its own item's result; batch_fn returns
+    results aligned with its input, and an Exception in a result slot fails only
+    that caller.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_batch_tokens: int = 8192,
+        max_queue: int = 256,
+        token_count: Callable[[Any], int] = estimate_tokens
+    ):
+        """
+        Args:
+            name: Batcher name (used in metrics and errors)
+            batch_fn: Runs a list of items, returns their results in order
+            max_batch_size: Most requests per batch
+            max_wait_ms: Longest a request waits for others to join its batch
+            max_batch_tokens: Padded token budget per batch
+            max_queue: Requests waiting beyond this are rejected with QueueFullError
+            token_count: Token estimate of one item
+        """
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_tokens = max_batch_tokens
+        self.max_queue = max_queue
+        self.token_count = token_count
+
+        self._queue: Deque[Tuple[Any, int, Future, float]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        self.requests = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batch_sizes: Dict[int, int] = {}
+        self._waits: Deque[float] = deque(maxlen=2048)
+        self._batch_ms: Deque[float] = deque(maxlen=512)
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item; the returned Future resolves with its result"""
+        future: Future = Future()
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError(f"Batcher '{self.name}' is stopped")
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self.name, self._retry_after())
+            self._queue.append((item, self.token_count(item), future, time.time()))
+            self.requests += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def __call__(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submit an item and block for its result"""
+        return self.submit(item).result(timeout)
+
+    def _retry_after(self) -> float:
+        """Seconds until the current backlog should have drained"""
+        batch_s = (sum(self._batch_ms) / len(self._batch_ms) / 1000.0) if self._batch_ms else 1.0
+        return round(max(1.0, len(self._queue) / self.max_batch_size * batch_s), 1)
+
+    def _next_batch(self) -> List[Tuple[Any, int, Future, float]]:
+        with self._cond:
+            while not self._queue and not self._stopped:
+                self._cond.wait()
+            if not self._queue:
+                return []
+
+            deadline = self._queue[0][3] + self.max_wait
+            batch = []
+            longest = 0
+            while True:
+                while self._queue and len(batch) < self.max_batch_size:
+                    tokens = self._queue[0][1]
+                    padded = (len(batch) + 1) * max(longest, tokens)
+                    if batch and padded > self.max_batch_tokens:
+                        return batch
+                    batch.append(self._queue.popleft())
+                    longest = max(longest, tokens)
+                remaining = deadline - time.time()
+                if len(batch) >= self.max_batch_size or remaining <= 0 or self._stopped:
+                    return batch
+                self._cond.wait(remaining)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            start = time.time()
+            live = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+            for entry in live:
+                self._waits.append(start - entry[3])
+            if not live:
+                continue
+
+            try:
+                results = self.batch_fn([entry[0] for entry in live])
+                if len(results) != len(live):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(live)} items")
+            except Exception as e:
+                logger.error(f"Batch '{self.name}' of {len(live)} failed: {e}")
+                results = [e] * len(live)
+
+            for (_, _, future, _), result in zip(live, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+            self.batches += 1
+            self.batch_sizes[len(live)] = self.batch_sizes.get(len(live), 0) + 1
+            self._batch_ms.append((time.time() - start) * 1000)
+
+    def stop(self) -> None:
+        """Finish queued requests, then stop the worker"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, batch-size histogram and queue-wait percentiles"""
+        with self._cond:
+            waits = np.array(self._waits) * 1000 if self._waits else None
+            batch_ms = list(self._batch_ms)
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "batches": self.batches,
+                "avg_batch_size": round(sum(k * v for k, v in self.batch_sizes.items()) / self.batches, 2) if self.batches else None,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+                "queue_wait_ms": {
+                    "p50": round(float(np.percentile(waits, 50)), 2),
+                    "p95": round(float(np.percentile(waits, 95)), 2),
+                    "max": round(float(waits.max()), 2)
+                } if waits is not None else None,
+                "avg_batch_ms": round(sum(batch_ms) / len(batch_ms), 1) if batch_ms else None,
+                "config": {
+                    "max_batch_size": self.max_batch_size,
+                    "max_wait_ms": self.max_wait * 1000,
+                    "max_batch_tokens": self.max_batch_tokens
+                }
+            }
+
+
+class MicroBatcherRegistry:
+    """
+    One MicroBatcher per endpoint, created on first use
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._batchers: Dict[str, MicroBatcher] = {}
+
+    def get(self, name: str, batch_fn: Callable[[List[Any]], List[Any]], **options) -> MicroBatcher:
+        """The batcher registered under name, created with batch_fn and options if missing"""
+        with self._lock:
+            batcher = self._batchers.get(name)
+            if batcher is None:
+                batcher = self._batchers[name] = MicroBatcher(name, batch_fn, **options)
+            return batcher
+
+    def stop(self) -> None:
+        with self._lock:
+            batchers = list(self._batchers.values())
+        for batcher in batchers:
+            batcher.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            batchers = dict(self._batchers)
+        return {name: batcher.stats() for name, batcher in batchers.items()}
+
+
+micro_batchers = MicroBatcherRegistry()
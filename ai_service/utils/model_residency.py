@@ -0,0 +1,289 @@
+"""
+Model Residency
+Keeps lazily loaded models inside a RAM budget with LRU eviction and reload on demand
+"""
+import os
+import gc
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+from loguru import logger
+
+
+def estimate_footprint(obj: Any, max_depth: int = 5) -> int:
+    """
+    Bytes held by the tensors and arrays reachable from obj
+
+    Walks instance attributes, lists and dicts down to max_depth and counts each
+    torch module's parameters and buffers and each numpy array once.
+    """
+    seen = set()
+    total = 0
+
+    def visit(value: Any, depth: int) -> None:
+        nonlocal total
+        if value is None or id(value) in seen or depth > max_depth:
+            return
+        seen.add(id(value))
+
+        if hasattr(value, "parameters") and hasattr(value, "buffers") and callable(value.parameters):
+            # torch.nn.Module (tied weights share storage, so count each tensor once)
+            for tensor in list(value.parameters()) + list(value.buffers()):
+                if id(tensor) not in seen:
+                    seen.add(id(tensor))
+                    total += tensor.numel() * tensor.element_size()
+            return
+        if hasattr(value, "nbytes") and hasattr(value, "dtype"):
+            total += int(value.nbytes)
+            return
+        if isinstance(value, (list, tuple, set)):
+            for item in value:
+                visit(item, depth + 1)
+        elif isinstance(value, dict):
+            for item in value.values():
+                visit(item, depth + 1)
+        elif hasattr(value, "__dict__") and not isinstance(value, type):
+            for item in vars(value).values():
+                visit(item, depth + 1)
+
+    visit(obj, 0)
+    return total
+
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (0 where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class ModelResidencyManager:
+    """
+    Registry of lazily loaded models that keeps their combined footprint under a RAM budget.
+
+    Each model is registered with a loader. get() loads it on first use (and after
+    eviction) and records its footprint and last use; callers that run the model
+    hold it through use(), which counts them as in-use references. When a load
+    pushes the resident total over the budget, the least recently used models
+    that nobody is using and that have been idle for min_idle_seconds are evicted:
+    the reference is dropped and memory is reclaimed once, instead of collecting
+    garbage after every request. Models skipped because they were in use are
+    evicted when their last user releases them. Evicted models stay on disk as
+    their checkpoints (safetensors, memory-mapped on reload) and come back through
+    their loader the next time they are needed.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        min_idle_seconds: float = 30.0
+    ):
+        """
+        Args:
+            budget_bytes: RAM budget for all resident models (None = unlimited)
+            min_idle_seconds: Models used more recently than this are not evicted,
+                so a model about to be used again is not reloaded
+        """
+        self.budget_bytes = budget_bytes
+        self.min_idle_seconds = min_idle_seconds
+
+        self._lock = threading.RLock()
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._resident: "OrderedDict[str, Any]" = OrderedDict()  # name -> model, least recently used first
+        self._info: Dict[str, Dict[str, Any]] = {}
+        self._in_use: Dict[str, int] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], replace: bool = False) -> None:
+        """
+        Register a model loader (a no-op if the name is taken, unless replace)
+        """
+        with self._lock:
+            if name in self._loaders and not replace:
+                return
+            self._loaders[name] = loader
+            self._load_locks.setdefault(name, threading.Lock())
+            self._info.setdefault(name, {
+                "footprint_bytes": 0,
+                "last_used": None,
+                "loads": 0,
+                "evictions": 0,
+                "load_ms": None
+            })
+
+    def is_registered(self, name: str) -> bool:
+        with self._lock:
+            return name in self._loaders
+
+    def is_resident(self, name: str) -> bool:
+        with self._lock:
+            return name in self._resident
+
+    def get(self, name: str) -> Any:
+        """
+        The model registered under name, loading it if it is not resident
+        """
+        with self._lock:
+            if name in self._resident:
+                self._touch(name)
+                return self._resident[name]
+            if name not in self._loaders:
+                raise KeyError(f"Unknown model: {name}")
+            load_lock = self._load_locks[name]
+
+        # Load outside the registry lock so other models stay usable meanwhile;
+        # the per-model lock keeps concurrent callers from loading it twice
+        with load_lock:
+            with self._lock:
+                if name in self._resident:
+                    self._touch(name)
+                    return self._resident[name]
+                loader = self._loaders[name]
+
+            rss_before = _rss_bytes()
+            start = time.time()
+            model = loader()
+            load_ms = round((time.time() - start) * 1000, 1)
+            footprint = estimate_footprint(model) or max(_rss_bytes() - rss_before, 0)
+
+            with self._lock:
+                self._resident[name] = model
+                info = self._info[name]
+                info["footprint_bytes"] = footprint
+                info["loads"] += 1
+                info["load_ms"] = load_ms
+                self._touch(name)
+                logger.info(f"Loaded model '{name}' ({footprint / 2**20:.0f} MiB in {load_ms:.0f} ms)")
+                self._enforce_budget(keep=name)
+                return model
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Any]:
+        """
+        The model registered under name (see get()), protected from eviction until
+        the block exits
+        """
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            yield self.get(name)
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+                if not self._in_use[name]:
+                    del self._in_use[name]
+                    if name in self._resident:
+                        self._info[name]["last_used"] = time.time()
+                    if self.budget_bytes is not None and self.resident_bytes() > self.budget_bytes:
+                        self._enforce_budget(idle=False)
+
+    def in_use(self, name: str) -> int:
+        """Callers currently holding the model through use()"""
+        with self._lock:
+            return self._in_use.get(name, 0)
+
+    def _touch(self, name: str) -> None:
+        self._resident.move_to_end(name)
+        self._info[name]["last_used"] = time.time()
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(self._info[name]["footprint_bytes"] for name in self._resident)
+
+    def _enforce_budget(self, keep: Optional[str] = None, idle: bool = True) -> int:
+        """
+        Evict models nobody is using, least recently used first, until under budget
+        (with idle, only those unused for min_idle_seconds)
+        """
+        if self.budget_bytes is None:
+            return 0
+        evicted = 0
+        now = time.time()
+        for name in list(self._resident):
+            if self.resident_bytes() <= self.budget_bytes:
+                break
+            if name == keep or self._in_use.get(name):
+                continue
+            if idle and now - self._info[name]["last_used"] < self.min_idle_seconds:
+                continue
+            self._drop(name)
+            evicted += 1
+
+        if evicted:
+            self._reclaim()
+        if self.resident_bytes() > self.budget_bytes:
+            logger.warning(
+                f"Resident models use {self.resident_bytes() / 2**20:.0f} MiB, over the "
+                f"{self.budget_bytes / 2**20:.0f} MiB budget (remaining models are in use)"
+            )
+        return evicted
+
+    def _drop(self, name: str) -> None:
+        self._resident.pop(name)
+        self._info[name]["evictions"] += 1
+        logger.info(f"Evicted model '{name}' (idle {time.time() - self._info[name]['last_used']:.0f}s)")
+
+    @staticmethod
+    def _reclaim() -> None:
+        """Return freed model memory to the allocator (once per eviction round)"""
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def evict(self, name: Optional[str] = None) -> int:
+        """
+        Evict one model, or every resident model when name is None, regardless of idle
+        time; models in use are skipped (dropping them would free nothing)
+
+        Returns:
+            Number of models evicted
+        """
+        with self._lock:
+            names = [name] if name is not None else list(self._resident)
+            evicted = 0
+            for n in names:
+                if n in self._resident and not self._in_use.get(n):
+                    self._drop(n)
+                    evicted += 1
+            if evicted:
+                self._reclaim()
+            return evicted
+
+    def set_budget(self, budget_bytes: Optional[int]) -> int:
+        """Change the budget and evict down to it; returns the number of evicted models"""
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            return self._enforce_budget()
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget, resident total and per-model footprint, last use and load/eviction counts"""
+        with self._lock:
+            models = {
+                name: {**info, "resident": name in self._resident, "in_use": self._in_use.get(name, 0)}
+                for name, info in self._info.items()
+            }
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self.resident_bytes(),
+                "resident_models": list(self._resident),
+                "loads": sum(info["loads"] for info in self._info.values()),
+                "evictions": sum(info["evictions"] for info in self._info.values()),
+                "models": models
+            }
+
+
+def _budget_from_env() -> Optional[int]:
+    budget_mb = os.getenv("AI_MODEL_RAM_BUDGET_MB")
+    return int(float(budget_mb) * 2**20) if budget_mb else None
+
+
+# Shared so every processor in the process counts against the same budget
+model_residency = ModelResidencyManager(budget_bytes=_budget_from_env())
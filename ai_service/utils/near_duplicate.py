@@ -0,0 +1,371 @@
+"""
+Near-Duplicate Detection
+Shingled MinHash signatures with LSH banding, persisted across fetch cycles
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+import numpy as np
+from loguru import logger
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+# Fields of a unified processing result the fetch orchestrator reads from a reused result
+REUSED_RESULT_FIELDS = (
+    "success", "error", "triage", "summary", "primary_category", "disaster_type",
+    "location_entities", "verification", "similarity"
+)
+
+
+class NearDuplicateDetector:
+    """
+    Finds items whose word-shingle Jaccard similarity to an earlier (canonical) item
+    reaches a threshold, without comparing against every stored item.
+
+    Each text becomes a num_perm MinHash signature. The signature is cut into
+    `bands` bands; two items become candidates when any band matches exactly,
+    and candidates are confirmed on the signature-estimated Jaccard. Canonical
+    items can carry a result payload (e.g. AI output) that duplicates reuse
+    until it is result_ttl seconds old.
+
+    Items are persisted in a SQLite file; a save writes only the items changed
+    since the previous one, so a fetch cycle costs a few row updates rather
+    than a rewrite of the whole index.
+    """
+
+    def __init__(
+        self,
+        path: str = "ai_service/data/near_duplicates",
+        threshold: float = 0.7,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 4,
+        max_items: int = 50000,
+        seed: int = 1,
+        result_ttl: Optional[float] = 6 * 3600,
+        result_fields: Optional[Sequence[str]] = None
+    ):
+        """
+        Args:
+            path: Directory holding the persisted signatures and payloads
+            threshold: Minimum estimated Jaccard similarity for a duplicate
+            num_perm: MinHash permutations (signature length)
+            bands: LSH bands (num_perm must divide evenly); more bands = more recall
+            shingle_size: Words per shingle
+            max_items: Oldest canonical items are forgotten beyond this
+            seed: Seed of the hash permutations (must stay fixed across runs)
+            result_ttl: Seconds a result payload is reused for duplicates (None: forever)
+            result_fields: Payload keys kept and persisted (None: the whole payload)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_items = max_items
+        self.seed = seed
+        self.result_ttl = result_ttl
+        self.result_fields = tuple(result_fields) if result_fields is not None else None
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+        self._lock = threading.RLock()
+        # id -> {"signature", "result", "result_at", "added_at", "duplicates"}
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        # Ids written or removed since the last save
+        self._changed: Set[str] = set()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.checked = 0
+        self.duplicates_found = 0
+        self.stale_results = 0
+
+        if os.path.exists(self._db_path):
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Signatures
+    # ------------------------------------------------------------------
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = _TOKEN_RE.findall((text or "").lower())
+        k = self.shingle_size
+        if len(tokens) < k:
+            shingles = {" ".join(tokens)} if tokens else set()
+        else:
+            shingles = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+        return np.array(
+            [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles],
+            dtype=np.uint64
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (num_perm uint32 values) of a text's word shingles"""
+        hashes = self._shingles(text)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        # Universal hashing (a*x + b) mod p, truncated to 32 bits, for all permutations at once
+        permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def jaccard(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Jaccard similarity estimated from two MinHash signatures"""
+        return float(np.mean(sig_a == sig_b))
+
+    # ------------------------------------------------------------------
+    # Lookup / insert
+    # ------------------------------------------------------------------
+    def find(self, text: Optional[str] = None, signature: Optional[np.ndarray] = None) -> Optional[Tuple[str, float]]:
+        """
+        Best canonical match at or above the threshold
+
+        Returns:
+            (canonical id, estimated Jaccard) or None
+        """
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best = None
+            for item_id in candidates:
+                similarity = self.jaccard(signature, self._items[item_id]["signature"])
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (item_id, similarity)
+            return best
+
+    def add(
+        self,
+        item_id: str,
+        text: Optional[str] = None,
+        signature: Optional[np.ndarray] = None,
+        result: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Register a canonical item (replacing any item with the same id)"""
+        if signature is None:
+            signature = self.signature(text)
+        with self._lock:
+            if item_id in self._items:
+                self._remove(item_id)
+            now = time.time()
+            self._items[item_id] = {
+                "signature": signature,
+                "result": self._trim_result(result),
+                "result_at": now if result is not None else None,
+                "added_at": now,
+                "duplicates": 0
+            }
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(item_id)
+            self._changed.add(item_id)
+
+            while len(self._items) > self.max_items:
+                self._remove(next(iter(self._items)))
+
+    def _remove(self, item_id: str) -> None:
+        item = self._items.pop(item_id)
+        self._changed.add(item_id)
+        for key in self._band_keys(item["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket and item_id in bucket:
+                bucket.remove(item_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _trim_result(self, result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if result is None or self.result_fields is None:
+            return result
+        return {k: result[k] for k in self.result_fields if k in result}
+
+    def _fresh_result(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The item's payload, or None when missing or older than result_ttl"""
+        if item["result"] is None:
+            return None
+        if self.result_ttl is not None and time.time() - (item["result_at"] or 0) > self.result_ttl:
+            return None
+        return item["result"]
+
+    def set_result(self, item_id: str, result: Dict[str, Any]) -> None:
+        """Attach (or refresh) the result payload of a canonical item"""
+        with self._lock:
+            if item_id in self._items:
+                self._items[item_id]["result"] = self._trim_result(result)
+                self._items[item_id]["result_at"] = time.time()
+                self._changed.add(item_id)
+
+    def get_result(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Result payload of a canonical item (None once older than result_ttl)"""
+        with self._lock:
+            item = self._items.get(item_id)
+            return self._fresh_result(item) if item else None
+
+    def check(self, item_id: str, text: str) -> Dict[str, Any]:
+        """
+        Look an item up and register it as canonical if it is not a duplicate
+
+        An item matching a canonical item that already has a result younger than
+        result_ttl is a duplicate (this includes the same item re-fetched in a later
+        cycle). Otherwise the item itself becomes canonical so its result can be
+        attached; a match whose result went stale is recomputed, and the canonical
+        item refreshed when the match is the item itself.
+
+        Returns:
+            {"duplicate_of": canonical id or None, "similarity": float or None,
+             "result": the canonical item's payload (None if not a duplicate)}
+        """
+        signature = self.signature(text)
+        with self._lock:
+            self.checked += 1
+            match = self.find(signature=signature)
+            result = self._fresh_result(self._items[match[0]]) if match is not None else None
+            if result is not None:
+                canonical_id, similarity = match
+                self._items[canonical_id]["duplicates"] += 1
+                self.duplicates_found += 1
+                self._changed.add(canonical_id)
+                return {
+                    "duplicate_of": canonical_id,
+                    "similarity": round(similarity, 4),
+                    "result": result
+                }
+            if match is not None and self._items[match[0]]["result"] is not None:
+                self.stale_results += 1
+            if match is None or match[0] != item_id:
+                self.add(item_id, signature=signature)
+            return {"duplicate_of": None, "similarity": None, "result": None}
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @property
+    def _db_path(self) -> str:
+        return os.path.join(self.path, "items.sqlite3")
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._conn = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS items (
+                    id TEXT PRIMARY KEY,
+                    signature BLOB NOT NULL,
+                    result TEXT,
+                    result_at REAL,
+                    added_at REAL NOT NULL,
+                    duplicates INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+        return self._conn
+
+    def _settings(self) -> Dict[str, int]:
+        return {"num_perm": self.num_perm, "bands": self.bands, "shingle_size": self.shingle_size, "seed": self.seed}
+
+    def _load(self) -> None:
+        conn = self._connect()
+        stored = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+        if stored.get("settings") != self._settings():
+            logger.warning("Near-duplicate index was built with different MinHash settings; starting empty")
+            conn.execute("DELETE FROM items")
+            return
+
+        rows = conn.execute(
+            "SELECT id, signature, result, result_at, added_at, duplicates FROM items ORDER BY added_at"
+        ).fetchall()
+        for item_id, signature, result, result_at, added_at, duplicates in rows[-self.max_items:]:
+            signature = np.frombuffer(signature, dtype=np.uint32)
+            self._items[item_id] = {
+                "signature": signature,
+                "result": json.loads(result) if result is not None else None,
+                "result_at": result_at,
+                "added_at": added_at,
+                "duplicates": duplicates
+            }
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(item_id)
+        logger.info(f"Loaded near-duplicate index ({len(self._items)} items)")
+
+    def save(self) -> None:
+        """Write the items added, changed or removed since the last save (one transaction)"""
+        with self._lock:
+            conn = self._connect()
+            upserts, deletes = [], []
+            for item_id in self._changed:
+                item = self._items.get(item_id)
+                if item is None:
+                    deletes.append((item_id,))
+                    continue
+                upserts.append((
+                    item_id,
+                    item["signature"].astype(np.uint32).tobytes(),
+                    json.dumps(item["result"], default=str) if item["result"] is not None else None,
+                    item["result_at"],
+                    item["added_at"],
+                    item["duplicates"]
+                ))
+            conn.execute("BEGIN")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('settings', ?)", (json.dumps(self._settings()),)
+                )
+                conn.executemany("DELETE FROM items WHERE id = ?", deletes)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO items (id, signature, result, result_at, added_at, duplicates) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    upserts
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            self._changed.clear()
+
+    def save_if_dirty(self) -> bool:
+        """Persist only if something changed since the last save"""
+        with self._lock:
+            if not self._changed:
+                return False
+            self.save()
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and duplicate counters"""
+        with self._lock:
+            return {
+                "items": len(self._items),
+                "buckets": len(self._buckets),
+                "checked": self.checked,
+                "duplicates_found": self.duplicates_found,
+                "stale_results": self.stale_results,
+                "unsaved_changes": len(self._changed),
+                "result_ttl_seconds": self.result_ttl,
+                "threshold": self.threshold
+            }
+
+
+# Shared index so every fetch cycle sees the canonical items of earlier cycles
+near_duplicate_detector = NearDuplicateDetector(result_fields=REUSED_RESULT_FIELDS)
@@ -0,0 +1,275 @@
+"""
+Embedding Quantization
+Compact int8-scalar and binary (sign) codes with exact re-ranking from full-precision vectors on disk
+"""
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from ai_service.utils.vector_search import l2_normalize, blocked_top_k, _top_k_rows
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# Number of set bits for every byte value
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+
+def quantize_int8(vectors: np.ndarray, scale: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-dimension int8 scalar quantization
+
+    Args:
+        vectors: (n, d) float vectors
+        scale: Per-dimension scale (computed from vectors when omitted)
+
+    Returns:
+        (codes, scale) with codes int8 (n, d) and vectors ~= codes * scale
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if scale is None:
+        scale = np.abs(vectors).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+    return codes, scale.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """
+    Sign quantization packed to bits: (n, d) floats -> (n, ceil(d/8)) uint8
+    """
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def hamming_distances(query_bits: np.ndarray, code_bits: np.ndarray) -> np.ndarray:
+    """
+    Pairwise Hamming distances between packed bit codes: (q, b) x (n, b) -> (q, n)
+    """
+    xor = np.bitwise_xor(query_bits[:, None, :], code_bits[None, :, :])
+    return _POPCOUNT[xor].sum(axis=2, dtype=np.int32)
+
+
+def code_candidates(
+    queries: np.ndarray,
+    codes: np.ndarray,
+    mode: str,
+    n_candidates: int,
+    scale: Optional[np.ndarray] = None,
+    block_size: int = 16384
+) -> np.ndarray:
+    """
+    First-pass candidate rows per query from compact codes
+
+    Args:
+        queries: (q, d) L2-normalized queries
+        codes: (n, d) int8 codes (mode 'int8') or (n, ceil(d/8)) packed sign bits (mode 'binary')
+        mode: 'int8' or 'binary'
+        n_candidates: Candidates per query
+        scale: Per-dimension int8 scale (vectors ~= codes * scale)
+        block_size: Code rows scored per block
+
+    Returns:
+        (q, n_candidates) row ids; missing slots are -1
+    """
+    best_idx = np.full((len(queries), n_candidates), -1, dtype=np.int64)
+    best_scores = np.full((len(queries), n_candidates), -np.inf, dtype=np.float32)
+
+    if mode == "binary":
+        query_codes = quantize_binary(queries)
+        # Hamming blocks are (q, block, bytes); keep them modest
+        block_size = max(1, min(block_size, (1 << 24) // max(1, len(queries) * query_codes.shape[1])))
+    else:
+        scaled_queries = queries * scale
+
+    for start in range(0, len(codes), block_size):
+        block = codes[start:start + block_size]
+        if mode == "binary":
+            scores = -hamming_distances(query_codes, block).astype(np.float32)
+        else:
+            scores = scaled_queries @ block.astype(np.float32).T
+
+        blk_idx, blk_scores = _top_k_rows(scores, n_candidates)
+        merged_idx = np.concatenate([best_idx, blk_idx + start], axis=1)
+        merged_scores = np.concatenate([best_scores, blk_scores], axis=1)
+        keep, best_scores = _top_k_rows(merged_scores, n_candidates)
+        best_idx = np.take_along_axis(merged_idx, keep, axis=1)
+
+    best_idx[np.isneginf(best_scores)] = -1
+    return best_idx
+
+
+def rerank_exact(
+    queries: np.ndarray,
+    candidates: np.ndarray,
+    full: np.ndarray,
+    top_k: int,
+    threshold: Optional[float] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine re-ranking of candidate rows against full-precision vectors
+
+    Args:
+        queries: (q, d) L2-normalized queries
+        candidates: (q, c) candidate row ids (-1 = none)
+        full: (n, d) L2-normalized float32 vectors (typically memory-mapped; only candidate rows are read)
+        top_k: Results per query
+        threshold: Minimum exact cosine similarity
+
+    Returns:
+        (indices, scores), both (q, top_k), sorted by descending exact cosine.
+        Missing slots have index -1 and score -inf.
+    """
+    indices = np.full((len(queries), top_k), -1, dtype=np.int64)
+    scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+    for q, row in enumerate(candidates):
+        # Sorted rows read the file sequentially
+        row = np.unique(row[row >= 0])
+        exact = np.asarray(full[row], dtype=np.float32) @ queries[q]
+        if threshold is not None:
+            keep = exact >= threshold
+            row, exact = row[keep], exact[keep]
+        order = np.argsort(-exact, kind="stable")[:top_k]
+        indices[q, :len(order)] = row[order]
+        scores[q, :len(order)] = exact[order]
+    return indices, scores
+
+
+class QuantizedIndex:
+    """
+    First-pass search over compact codes, exact re-ranking of a short candidate list.
+
+    Only the codes stay in RAM. Full-precision (float32, L2-normalized) vectors are
+    written to an .npy file and memory-mapped, so re-ranking reads just the
+    candidate rows from disk.
+    """
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        mode: str = "int8",
+        full_precision_path: Optional[str] = None,
+        rerank_factor: int = 4
+    ):
+        """
+        Args:
+            vectors: (n, d) corpus embeddings
+            mode: 'int8', 'binary' or 'none' (exact search on the memory-mapped vectors)
+            full_precision_path: .npy file for full-precision vectors (temporary file if omitted)
+            rerank_factor: Candidates re-ranked per query = top_k * rerank_factor
+        """
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode '{mode}'. Use one of {QUANTIZATION_MODES}")
+
+        self.mode = mode
+        self.rerank_factor = max(1, rerank_factor)
+        vectors = l2_normalize(vectors)
+        self.size, self.dim = vectors.shape
+
+        self._tmp_dir = None
+        if full_precision_path is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="qindex_")
+            full_precision_path = os.path.join(self._tmp_dir, "full.npy")
+        self.full_precision_path = full_precision_path
+        np.save(full_precision_path, vectors)
+        self._full = np.load(full_precision_path, mmap_mode="r")
+
+        self._codes = None
+        self._scale = None
+        if mode == "int8":
+            self._codes, self._scale = quantize_int8(vectors)
+        elif mode == "binary":
+            self._codes = quantize_binary(vectors)
+
+    def close(self) -> None:
+        """Release the memory map and remove temporary files"""
+        self._full = None
+        if self._tmp_dir:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def memory_bytes(self) -> Dict[str, int]:
+        """RAM used by the first-pass codes vs the float32 vectors they replace"""
+        code_bytes = 0
+        if self._codes is not None:
+            code_bytes = self._codes.nbytes + (self._scale.nbytes if self._scale is not None else 0)
+        float32_bytes = self.size * self.dim * 4
+        return {
+            "code_bytes": int(code_bytes),
+            "float32_bytes": int(float32_bytes),
+            "bytes_per_vector": round(code_bytes / self.size, 2) if self.size else 0.0,
+            "compression": round(float32_bytes / code_bytes, 2) if code_bytes else 1.0
+        }
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int = 5,
+        threshold: Optional[float] = None,
+        block_size: int = 16384
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k with exact re-ranking
+
+        Returns:
+            (indices, scores), both (q, top_k), sorted by descending exact cosine.
+            Missing slots have index -1 and score -inf.
+        """
+        queries = l2_normalize(queries).reshape(-1, self.dim)
+        k = max(1, min(top_k, self.size))
+
+        if self.mode == "none":
+            return blocked_top_k(queries, self._full, top_k=k, threshold=threshold,
+                                 block_size=block_size, normalized=True)
+
+        n_candidates = min(self.size, k * self.rerank_factor)
+        candidates = code_candidates(queries, self._codes, self.mode, n_candidates, self._scale, block_size)
+        return rerank_exact(queries, candidates, self._full, k, threshold)
+
+    def evaluate(self, queries: np.ndarray, top_k: int = 10, block_size: int = 16384) -> Dict[str, any]:
+        """
+        Recall@k of this index against exact search, plus memory use
+        """
+        queries = l2_normalize(queries).reshape(-1, self.dim)
+        k = max(1, min(top_k, self.size))
+        exact_idx, _ = blocked_top_k(queries, self._full, top_k=k, block_size=block_size, normalized=True)
+        approx_idx, _ = self.search(queries, top_k=k, block_size=block_size)
+
+        hits = sum(
+            len(set(a[a >= 0].tolist()) & set(e[e >= 0].tolist()))
+            for a, e in zip(approx_idx, exact_idx)
+        )
+        recall = hits / float(len(queries) * k) if len(queries) else 0.0
+
+        return {
+            "mode": self.mode,
+            "k": k,
+            "recall_at_k": round(recall, 4),
+            "rerank_candidates": min(self.size, k * self.rerank_factor) if self.mode != "none" else k,
+            **self.memory_bytes()
+        }
+
+
+def compare_quantization_modes(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    top_k: int = 10,
+    rerank_factor: int = 4,
+    modes: List[str] = QUANTIZATION_MODES
+) -> List[Dict[str, any]]:
+    """
+    Recall@k and memory per quantization mode on the given queries and corpus
+    """
+    report = []
+    for mode in modes:
+        with QuantizedIndex(corpus, mode=mode, rerank_factor=rerank_factor) as index:
+            report.append(index.evaluate(queries, top_k=top_k))
+        logger.info(f"Quantization '{mode}': recall@{report[-1]['k']}={report[-1]['recall_at_k']}")
+    return report
@@ -0,0 +1,269 @@
+"""
+Result Cache
+Two-tier prediction cache: an in-memory LRU over a SQLite store shared by all worker processes
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from ai_service.utils import ModelCache, stable_digest
+
+DEFAULT_PATH = os.getenv("AI_RESULT_CACHE_DB", "ai_service/data/results.sqlite3")
+
+# Live result caches by (namespace, version), reported by the cache stats endpoint; the
+# default and fine-tuned pipelines share a namespace but never a version
+result_caches: "weakref.WeakValueDictionary[Tuple[str, str], ResultCache]" = weakref.WeakValueDictionary()
+
+
+def model_version(name_or_path: str) -> str:
+    """
+    Version tag of a model: its Hub name, or for a local checkpoint directory
+    the path plus the newest file modification time (retraining in place
+    changes the tag)
+    """
+    if not os.path.isdir(name_or_path):
+        return name_or_path
+    newest = 0.0
+    for root, _, files in os.walk(name_or_path):
+        for name in files:
+            newest = max(newest, os.path.getmtime(os.path.join(root, name)))
+    return f"{os.path.abspath(name_or_path)}@{int(newest)}"
+
+
+def _json_default(value: Any) -> Any:
+    """numpy scalars and arrays in results are stored as plain JSON numbers and lists"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    """
+    Prediction results keyed by a stable digest of the namespace, model version,
+    parameters and normalized input.
+
+    Lookups check the process-local ModelCache first, then the SQLite table
+    (WAL mode, so every uvicorn worker reads and writes the same file while the
+    others keep serving); disk hits are promoted to memory. Unlike keys built
+    with hash(), the digests are identical across processes and restarts, and
+    entries written under an older model version are simply never looked up.
+    On creation the most recently written entries are loaded into memory.
+
+    Several caches (other pipelines, other processes running other checkpoints)
+    can share a namespace with different versions, so a cache only ever trims
+    its own version. Rows of versions nobody writes any more age out after
+    max_age_days, and each version keeps at most max_rows rows.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        version: str,
+        path: str = DEFAULT_PATH,
+        memory_items: int = 1000,
+        max_bytes: Optional[int] = 64 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        warm_items: int = 500,
+        max_rows: int = 50000,
+        max_age_days: float = 30.0
+    ):
+        """
+        Args:
+            namespace: Cache name (one per pipeline; rows of different namespaces never mix)
+            version: Model version and any setting that changes results
+            path: SQLite database file (shared by all processes)
+            memory_items: Size of the in-memory LRU tier
+            max_bytes: Approximate memory budget of the LRU tier
+            ttl: Seconds an entry stays valid in both tiers (None: until evicted)
+            warm_items: Most recent entries loaded into memory on creation
+            max_rows: Disk rows kept for this version (oldest trimmed first)
+            max_age_days: Rows older than this are deleted whatever their version
+        """
+        self.namespace = namespace
+        self.version = version
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_age = max_age_days * 86400
+        # Reported through this cache's stats, not separately
+        self.memory = ModelCache(max_size=memory_items, ttl=ttl, max_bytes=max_bytes, name=namespace, register=False)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+        self.disk_writes = 0
+        self.disk_errors = 0
+
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_version ON results (namespace, version, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS results_created ON results (created_at)")
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache '{namespace}' has no disk tier ({path}): {e}")
+            self._conn = None
+
+        result_caches[(namespace, version)] = self
+        if warm_items:
+            self.warm(warm_items)
+
+    def key(self, text: Optional[str], *params: Any) -> str:
+        """
+        Stable key of an input text (whitespace-normalized) and the call's
+        parameters under this cache's namespace and model version
+        """
+        return stable_digest(self.namespace, self.version, " ".join(text.split()) if text else text, *params)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached result (None when missing or expired in both tiers)"""
+        value = self.memory.get(key)
+        if value is not None or self._conn is None:
+            return value
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM results WHERE namespace = ? AND key = ?",
+                    (self.namespace, key)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.disk_errors += 1
+            logger.warning(f"Result cache '{self.namespace}' read failed: {e}")
+            return None
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        value = json.loads(row[0])
+        self.disk_hits += 1
+        self.memory.set(key, value, ttl=row[1] - time.time() if row[1] is not None else None)
+        return value
+
+    def set(self, key: str, value: Any, persist: bool = True) -> None:
+        """
+        Cache a result in memory and, when persist, on disk for the other processes
+        (results that only make sense in this process, e.g. pointing at its in-memory
+        state, pass persist=False)
+        """
+        self.memory.set(key, value)
+        if not persist or self._conn is None:
+            return
+        now = time.time()
+        try:
+            payload = json.dumps(value, default=_json_default)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (namespace, key, version, value, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, self.version, payload, now, now + self.ttl if self.ttl is not None else None)
+                )
+            self.disk_writes += 1
+            if self.disk_writes % 1000 == 0:
+                self._trim()
+        except (TypeError, ValueError, sqlite3.Error) as e:
+            self.disk_errors += 1
+            logger.warning(f"Result cache '{self.namespace}' write failed: {e}")
+
+    def warm(self, limit: int) -> int:
+        """Load the most recently written live entries into memory; returns how many"""
+        if self._conn is None:
+            return 0
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT key, value, expires_at FROM results "
+                    "WHERE namespace = ? AND version = ? AND (expires_at IS NULL OR expires_at > ?) "
+                    "ORDER BY created_at DESC LIMIT ?",
+                    (self.namespace, self.version, time.time(), limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Result cache '{self.namespace}' warm-up failed: {e}")
+            return 0
+        # Oldest first, so the newest entries end up most recently used
+        now = time.time()
+        for key, payload, expires_at in reversed(rows):
+            self.memory.set(key, json.loads(payload), ttl=expires_at - now if expires_at is not None else None)
+        if rows:
+            logger.info(f"Result cache '{self.namespace}' warmed with {len(rows)} entries")
+        return len(rows)
+
+    def _trim(self) -> int:
+        """Delete this version's rows beyond max_rows, oldest first"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE rowid IN ("
+                "SELECT rowid FROM results WHERE namespace = ? AND version = ? "
+                "ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.version, self.max_rows)
+            )
+            return cursor.rowcount
+
+    def purge(self) -> int:
+        """
+        Delete expired rows, rows past max_age_days (of any version, so versions
+        no longer in use disappear) and this version's rows beyond max_rows;
+        returns the number removed
+        """
+        if self._conn is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE namespace = ? AND "
+                "((expires_at IS NOT NULL AND expires_at <= ?) OR created_at < ?)",
+                (self.namespace, now, now - self.max_age)
+            )
+            removed = cursor.rowcount
+        return removed + self._trim()
+
+    def clear(self) -> None:
+        """Drop this version's entries from both tiers"""
+        self.memory.clear()
+        if self._conn is not None:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM results WHERE namespace = ? AND version = ?", (self.namespace, self.version)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier counters plus disk rows, hits, writes and errors"""
+        rows = None
+        if self._conn is not None:
+            try:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT COUNT(*) FROM results WHERE namespace = ? AND version = ?",
+                        (self.namespace, self.version)
+                    ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+        return {
+            **self.memory.stats(),
+            "version": self.version,
+            "disk": {
+                "path": self.path if self._conn is not None else None,
+                "rows": rows,
+                "max_rows": self.max_rows,
+                "hits": self.disk_hits,
+                "writes": self.disk_writes,
+                "errors": self.disk_errors
+            }
+        }
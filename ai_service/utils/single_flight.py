@@ -0,0 +1,147 @@
+"""
+Single-Flight
+Coalesces concurrent identical computations and replays recent results within an idempotency window
+"""
+import copy
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    At most one computation per key at a time.
+
+    The first caller for a key becomes the leader and computes; callers that
+    arrive while it runs wait on the leader's Future instead of repeating the
+    work. Results the leader stores stay available for window seconds, so a
+    repeat after completion (a double click, the same link in two news
+    queries) gets the stored result back. Every caller receives its own copy.
+    """
+
+    def __init__(self, window: float = 300.0, max_entries: int = 2048):
+        """
+        Args:
+            window: Seconds a stored result is replayed for repeats (0 disables storing)
+            max_entries: Stored results kept at most (oldest dropped first)
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self.computed = 0
+        self.coalesced = 0
+        self.replayed = 0
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Copy of the result stored for key within the window, else None"""
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._results[key]
+                return None
+            self.replayed += 1
+            return copy.deepcopy(entry[1])
+
+    def begin(self, key: str) -> Tuple[Future, bool]:
+        """
+        Join or start the computation for key.
+
+        Returns:
+            (future, leader). A leader must call finish() or fail() for the key;
+            everyone else waits on the future (see result()).
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._inflight[key] = Future()
+            self.computed += 1
+            return future, True
+
+    def join(self, key: str) -> Optional[Future]:
+        """The in-flight computation for key, without becoming its leader if there is none"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            return future
+
+    def finish(self, key: str, result: Any, store: bool = True) -> None:
+        """Resolve the leader's computation; store the result for the window if store"""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+            if store and self.window > 0:
+                self._results[key] = (time.time() + self.window, copy.deepcopy(result))
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+        if future is not None:
+            future.set_result(result)
+
+    def fail(self, key: str, error: BaseException) -> None:
+        """Fail the leader's computation; waiting callers get the exception, nothing is stored"""
+        with self._lock:
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    @staticmethod
+    def result(future: Future, timeout: Optional[float] = None) -> Any:
+        """Copy of a joined computation's result (raises TimeoutError after timeout)"""
+        return copy.deepcopy(future.result(timeout))
+
+    def do(
+        self,
+        key: str,
+        fn: Callable[[], Any],
+        store: Callable[[Any], bool] = lambda result: True,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Stored result for key, else the in-flight result, else fn() computed as leader.
+        Results for which store() is False are shared with waiting callers but not replayed.
+
+        Raises:
+            TimeoutError: When waiting on another caller's computation exceeds timeout
+        """
+        stored = self.lookup(key)
+        if stored is not None:
+            return stored
+        future, leader = self.begin(key)
+        if not leader:
+            return self.result(future, timeout)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.finish(key, result, store=store(result))
+        return result
+
+    def purge(self) -> int:
+        """Drop results whose window has passed; returns the number removed"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (expires, _) in self._results.items() if expires < now]
+            for key in expired:
+                del self._results[key]
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "window_seconds": self.window,
+                "in_flight": len(self._inflight),
+                "stored": len(self._results),
+                "computed": self.computed,
+                "coalesced": self.coalesced,
+                "replayed": self.replayed
+            }
@@ -0,0 +1,90 @@
+"""
+Stage Graph
+Runs named processing stages as a dependency graph on a bounded thread pool
+"""
+import os
+import time
+import datetime
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def stage_thread_budget(max_parallel_stages: int, cpu_count: Optional[int] = None) -> int:
+    """
+    Intra-op threads per stage so that concurrently running stages share the cores
+    instead of each spawning a full-size thread pool
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // max(1, max_parallel_stages))
+
+
+class StageGraph:
+    """
+    A small DAG of stages. Each stage is called with the results of its dependencies
+    (positionally, in the order they were declared) as soon as they are available.
+
+    With an executor, independent stages run concurrently; without one they run
+    inline in dependency order. The first stage failure is re-raised from run().
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self._stages: Dict[str, Tuple[Callable[..., Any], Tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Iterable[str] = ()) -> "StageGraph":
+        """Register a stage; deps name stages whose results fn receives"""
+        self._stages[name] = (fn, tuple(deps))
+        return self
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Execute every stage
+
+        Returns:
+            (results by stage name, timings by stage name with ISO start/end and duration_ms)
+        """
+        results: Dict[str, Any] = {}
+        timings: Dict[str, Dict[str, Any]] = {}
+        pending = dict(self._stages)
+        running = {}
+
+        def call(name: str, fn: Callable[..., Any], args: list) -> Any:
+            start = time.time()
+            try:
+                return fn(*args)
+            finally:
+                end = time.time()
+                timings[name] = {
+                    "start": datetime.datetime.fromtimestamp(start).isoformat(),
+                    "end": datetime.datetime.fromtimestamp(end).isoformat(),
+                    "duration_ms": round((end - start) * 1000, 1)
+                }
+
+        while pending or running:
+            ready = [name for name, (_, deps) in pending.items() if all(d in results for d in deps)]
+            for name in ready:
+                fn, deps = pending.pop(name)
+                args = [results[d] for d in deps]
+                if self.executor is None:
+                    results[name] = call(name, fn, args)
+                else:
+                    running[self.executor.submit(call, name, fn, args)] = name
+
+            if self.executor is None:
+                if pending and not ready:
+                    raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                continue
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise error
+                results[name] = future.result()
+
+        return results, timings
@@ -0,0 +1,569 @@
+"""
+Vector Index
+Named, persistent similarity corpora backed by an approximate-nearest-neighbour index
+"""
+import os
+import json
+import time
+import shutil
+import threading
+from typing import Any, Dict, List, Optional
+import numpy as np
+from loguru import logger
+
+from ai_service.utils.vector_search import l2_normalize, blocked_top_k
+from ai_service.utils.quantization import (
+    QUANTIZATION_MODES, quantize_int8, quantize_binary, code_candidates, rerank_exact
+)
+
+# Optional imports
+try:
+    import hnswlib
+    HNSW_AVAILABLE = True
+except ImportError:
+    HNSW_AVAILABLE = False
+    logger.warning("hnswlib not available. Similarity corpora will use exact (flat) search.")
+
+
+class VectorCorpus:
+    """
+    A named set of embeddings with incremental insert/delete, persisted to disk.
+
+    Uses an HNSW graph (hnswlib, cosine space) when available, otherwise an exact
+    flat index searched with blocked matrix multiplication. Items are keyed by
+    caller-supplied string ids and carry a small metadata dict.
+
+    The flat backend appends into a preallocated buffer (grown by doubling) and
+    deletes by tombstoning rows, compacting once a quarter of them are dead, so
+    inserts into a bounded corpus stay amortized O(1). Writers on the request
+    path pass persist=False and rely on save_if_dirty() running periodically.
+
+    With quantization='int8' or 'binary' the corpus is always flat and keeps
+    only compact codes in RAM: int8 (one byte per dimension; vectors are
+    L2-normalized, so a fixed scale of 1/127 covers every component and codes
+    never need refitting) or packed sign bits (one bit per dimension). The
+    float32 vectors live in a memory-mapped file next to the codes. A query
+    takes top_k * rerank_factor candidates from the codes and re-ranks them
+    exactly from that file before the threshold is applied, so the returned
+    similarities are exact cosines.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dim: int,
+        path: str,
+        max_items: Optional[int] = None,
+        ef_construction: int = 200,
+        M: int = 16,
+        ef_search: int = 64,
+        quantization: str = "none",
+        rerank_factor: int = 4
+    ):
+        """
+        Args:
+            name: Corpus name
+            dim: Embedding dimension
+            path: Directory holding the index files
+            max_items: Keep only the most recently added items (None = unbounded)
+            ef_construction: HNSW build-time candidate list size
+            M: HNSW graph degree
+            ef_search: HNSW query-time candidate list size
+            quantization: 'none', 'int8' or 'binary' (compact codes, flat backend)
+            rerank_factor: Candidates re-ranked exactly per query = top_k * rerank_factor
+                (quantized corpora)
+        """
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Corpus quantization must be one of {QUANTIZATION_MODES}")
+        self.name = name
+        self.dim = dim
+        self.path = path
+        self.max_items = max_items
+        self.ef_construction = ef_construction
+        self.M = M
+        self.ef_search = ef_search
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self.backend = "hnsw" if HNSW_AVAILABLE and quantization == "none" else "flat"
+
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._items: Dict[str, Dict[str, Any]] = {}  # id -> {"label", "metadata", "added_at"}
+        self._label_to_id: Dict[int, str] = {}
+        self._next_label = 0
+
+        self._index = None
+        self._capacity = 0
+        # Flat backend: rows [0, _rows) of the buffers are in use, dead rows have label -1.
+        # Quantized corpora keep the float32 rows, aligned with the codes, in _full (memory-mapped)
+        self._vector_buf = np.empty((0, self._code_width), dtype=self._row_dtype)
+        self._full: Optional[np.memmap] = None
+        self._label_buf = np.empty((0,), dtype=np.int64)
+        self._rows = 0
+        self._dead = 0
+
+        if os.path.exists(self._meta_path):
+            self._load()
+        elif self.backend == "hnsw":
+            self._init_hnsw(1024)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    @property
+    def _row_dtype(self):
+        return {"int8": np.int8, "binary": np.uint8}.get(self.quantization, np.float32)
+
+    @property
+    def _code_width(self) -> int:
+        return (self.dim + 7) // 8 if self.quantization == "binary" else self.dim
+
+    @property
+    def _int8_scale(self) -> np.ndarray:
+        return np.full(self.dim, 1.0 / 127.0, dtype=np.float32)
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Rows as stored by the flat backend (codes when quantized)"""
+        if self.quantization == "int8":
+            return quantize_int8(vectors, scale=self._int8_scale)[0]
+        if self.quantization == "binary":
+            return quantize_binary(vectors)
+        return vectors
+
+    @property
+    def _full_path(self) -> str:
+        return os.path.join(self.path, "full.f32")
+
+    def _resize_full(self, capacity: int) -> None:
+        """(Re)map the float32 row file at capacity rows; existing rows are kept"""
+        os.makedirs(self.path, exist_ok=True)
+        if self._full is not None:
+            self._full.flush()
+            self._full = None
+        with open(self._full_path, "ab") as f:
+            f.truncate(capacity * self.dim * 4)
+        self._full = np.memmap(self._full_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, "meta.json")
+
+    def _init_hnsw(self, capacity: int) -> None:
+        self._index = hnswlib.Index(space="cosine", dim=self.dim)
+        self._index.init_index(
+            max_elements=capacity,
+            ef_construction=self.ef_construction,
+            M=self.M,
+            allow_replace_deleted=True
+        )
+        self._index.set_ef(self.ef_search)
+        self._capacity = capacity
+
+    def _load(self) -> None:
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.dim = meta["dim"]
+        self.max_items = meta.get("max_items", self.max_items)
+        self.quantization = meta.get("quantization", "none")
+        self.rerank_factor = meta.get("rerank_factor", self.rerank_factor)
+        self._next_label = meta["next_label"]
+        self._items = meta["items"]
+        self._label_to_id = {item["label"]: item_id for item_id, item in self._items.items()}
+
+        saved_backend = meta.get("backend", "flat")
+        if saved_backend == "hnsw" and HNSW_AVAILABLE:
+            capacity = max(meta.get("capacity", 1024), len(self._items) + 1)
+            self._index = hnswlib.Index(space="cosine", dim=self.dim)
+            self._index.load_index(
+                os.path.join(self.path, "index.bin"),
+                max_elements=capacity,
+                allow_replace_deleted=True
+            )
+            self._index.set_ef(self.ef_search)
+            self._capacity = capacity
+        elif saved_backend == "hnsw":
+            # Index was built with hnswlib but it is not installed here; keep serving exactly
+            vectors_path = os.path.join(self.path, "vectors.npy")
+            if not os.path.exists(vectors_path):
+                raise RuntimeError(f"Corpus '{self.name}' needs hnswlib to load")
+            self._load_flat()
+        else:
+            self._load_flat()
+
+        self.backend = "hnsw" if self._index is not None else "flat"
+        logger.info(f"Loaded corpus '{self.name}' ({len(self._items)} items, {self.backend})")
+
+    def _load_flat(self) -> None:
+        self._vector_buf = np.load(os.path.join(self.path, "vectors.npy"))
+        self._label_buf = np.load(os.path.join(self.path, "labels.npy"))
+        self._rows = len(self._label_buf)
+        self._dead = 0
+        if self.quantization != "none" and self._rows:
+            self._load_full()
+
+    def _load_full(self) -> None:
+        """Rebuild the memory-mapped float32 rows from the saved snapshot"""
+        full_path = os.path.join(self.path, "full.npy")
+        if os.path.exists(full_path):
+            saved = np.load(full_path, mmap_mode="r")
+        else:
+            # Saved before full-precision rows were kept; re-rank against the decoded codes
+            logger.warning(f"Corpus '{self.name}' has no full-precision vectors; re-ranking decoded int8 codes")
+            saved = l2_normalize(self._vectors.astype(np.float32) / 127.0)
+        self._resize_full(self._rows)
+        self._full[:] = saved
+
+    @property
+    def _vectors(self) -> np.ndarray:
+        return self._vector_buf[:self._rows]
+
+    @property
+    def _labels(self) -> np.ndarray:
+        return self._label_buf[:self._rows]
+
+    def save(self) -> None:
+        """
+        Write the index and metadata to disk (atomic per file). Only the snapshot
+        is taken under the corpus lock; queries are not blocked while files are written.
+        """
+        with self._save_lock:
+            with self._lock:
+                os.makedirs(self.path, exist_ok=True)
+                if self._index is not None:
+                    tmp = os.path.join(self.path, "index.bin.tmp")
+                    self._index.save_index(tmp)
+                    os.replace(tmp, os.path.join(self.path, "index.bin"))
+                vectors = self._all_vectors()
+                labels = self._all_labels()
+                full = self._all_full() if self.quantization != "none" else None
+                meta = json.dumps({
+                    "name": self.name,
+                    "dim": self.dim,
+                    "backend": self.backend,
+                    "quantization": self.quantization,
+                    "rerank_factor": self.rerank_factor,
+                    "capacity": self._capacity,
+                    "max_items": self.max_items,
+                    "next_label": self._next_label,
+                    "items": self._items
+                })
+                self._dirty = False
+
+            # Normalized vectors are kept alongside so the corpus survives a missing hnswlib
+            self._save_npy("vectors.npy", vectors)
+            self._save_npy("labels.npy", labels)
+            if full is not None:
+                self._save_npy("full.npy", full)
+            tmp = self._meta_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(meta)
+            os.replace(tmp, self._meta_path)
+
+    def save_if_dirty(self) -> bool:
+        """Persist only if items changed since the last save"""
+        if not self._dirty:
+            return False
+        self.save()
+        return True
+
+    def _save_npy(self, filename: str, array: np.ndarray) -> None:
+        tmp = os.path.join(self.path, filename + ".tmp.npy")
+        np.save(tmp, array)
+        os.replace(tmp, os.path.join(self.path, filename))
+
+    def _all_labels(self) -> np.ndarray:
+        return np.array(sorted(self._label_to_id), dtype=np.int64)
+
+    def _live_rows(self) -> np.ndarray:
+        """Flat backend rows of live items, in label order"""
+        live = np.flatnonzero(self._labels >= 0)
+        return live[np.argsort(self._labels[live])]
+
+    def _all_full(self) -> np.ndarray:
+        rows = self._live_rows()
+        if not len(rows):
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.array(self._full[rows], dtype=np.float32)
+
+    def _all_vectors(self) -> np.ndarray:
+        if self._index is None:
+            return self._vectors[self._live_rows()]
+        labels = self._all_labels()
+        if not len(labels):
+            return np.empty((0, self.dim), dtype=np.float32)
+        return np.asarray(self._index.get_items(labels.tolist()), dtype=np.float32)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def add(
+        self,
+        ids: List[str],
+        vectors: np.ndarray,
+        metadata: Optional[List[Dict[str, Any]]] = None,
+        persist: bool = True
+    ) -> int:
+        """
+        Insert (or replace) items. Returns the number of items added.
+        """
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+        if not len(ids):
+            return 0
+
+        vectors = l2_normalize(vectors).reshape(len(ids), -1)
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-d vectors, got {vectors.shape[1]}-d")
+        metadata = metadata or [{} for _ in ids]
+
+        with self._lock:
+            # Replacing an id removes its old vector first
+            self._remove_locked([i for i in ids if i in self._items])
+
+            labels = np.arange(self._next_label, self._next_label + len(ids), dtype=np.int64)
+            self._next_label += len(ids)
+
+            if self._index is not None:
+                needed = len(self._items) + len(ids)
+                if needed > self._capacity:
+                    new_capacity = max(needed, self._capacity * 2)
+                    self._index.resize_index(new_capacity)
+                    self._capacity = new_capacity
+                self._index.add_items(vectors, labels, replace_deleted=True)
+            else:
+                needed = self._rows + len(ids)
+                if needed > len(self._vector_buf):
+                    capacity = max(needed, 2 * len(self._vector_buf), 1024)
+                    vector_buf = np.empty((capacity, self._code_width), dtype=self._row_dtype)
+                    label_buf = np.full((capacity,), -1, dtype=np.int64)
+                    vector_buf[:self._rows] = self._vectors
+                    label_buf[:self._rows] = self._labels
+                    self._vector_buf, self._label_buf = vector_buf, label_buf
+                    if self.quantization != "none":
+                        self._resize_full(capacity)
+                self._vector_buf[self._rows:needed] = self._encode(vectors)
+                if self._full is not None:
+                    self._full[self._rows:needed] = vectors
+                self._label_buf[self._rows:needed] = labels
+                self._rows = needed
+
+            now = time.time()
+            for item_id, label, meta in zip(ids, labels, metadata):
+                self._items[item_id] = {"label": int(label), "metadata": meta, "added_at": now}
+                self._label_to_id[int(label)] = item_id
+
+            if self.max_items and len(self._items) > self.max_items:
+                overflow = len(self._items) - self.max_items
+                self._remove_locked(list(self._items)[:overflow])
+
+            self._dirty = True
+
+        if persist:
+            self.save()
+        return len(ids)
+
+    def remove(self, ids: List[str], persist: bool = True) -> int:
+        """Delete items by id. Returns the number of items removed."""
+        with self._lock:
+            removed = self._remove_locked(ids)
+            if removed:
+                self._dirty = True
+        if removed and persist:
+            self.save()
+        return removed
+
+    def _remove_locked(self, ids: List[str]) -> int:
+        labels = []
+        for item_id in ids:
+            item = self._items.pop(item_id, None)
+            if item is not None:
+                labels.append(item["label"])
+                self._label_to_id.pop(item["label"], None)
+
+        if not labels:
+            return 0
+
+        if self._index is not None:
+            for label in labels:
+                self._index.mark_deleted(label)
+        else:
+            labels_view = self._labels
+            labels_view[np.isin(labels_view, labels)] = -1
+            self._dead += len(labels)
+            if self._dead * 4 > self._rows:
+                self._compact()
+
+        return len(labels)
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows from the flat buffers"""
+        live = np.flatnonzero(self._labels >= 0)
+        count = len(live)
+        self._vector_buf[:count] = self._vectors[live]
+        self._label_buf[:count] = self._labels[live]
+        self._label_buf[count:] = -1
+        if self._full is not None:
+            self._full[:count] = self._full[live]
+        self._rows = count
+        self._dead = 0
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+    def query(
+        self,
+        vectors: np.ndarray,
+        top_k: int = 5,
+        threshold: Optional[float] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Nearest items for each query vector
+
+        Quantized corpora re-rank top_k * rerank_factor candidates from the codes
+        against the full-precision rows, so threshold applies to exact cosines.
+
+        Returns:
+            Per query, a list of {"id", "similarity", "metadata"} sorted by similarity
+        """
+        vectors = l2_normalize(vectors).reshape(-1, self.dim)
+
+        with self._lock:
+            n_items = len(self._items)
+            if n_items == 0:
+                return [[] for _ in range(len(vectors))]
+            k = min(top_k, n_items)
+
+            if self._index is not None:
+                self._index.set_ef(max(self.ef_search, k))
+                labels, distances = self._index.knn_query(vectors, k=k)
+                similarities = 1.0 - distances
+            elif self.quantization != "none":
+                # Dead rows may take some candidate slots; they are dropped before re-ranking
+                candidates = code_candidates(
+                    vectors, self._vectors, self.quantization,
+                    n_candidates=min(self._rows, (k + self._dead) * self.rerank_factor),
+                    scale=self._int8_scale
+                )
+                live = np.where(candidates >= 0, self._labels[np.maximum(candidates, 0)], -1) >= 0
+                rows, similarities = rerank_exact(
+                    vectors, np.where(live, candidates, -1), self._full, k, threshold
+                )
+                labels = np.where(rows >= 0, self._labels[np.maximum(rows, 0)], -1)
+            else:
+                # Dead rows may take some of the top slots; ask for enough to cover them
+                rows, similarities = blocked_top_k(
+                    vectors, self._vectors, top_k=min(k + self._dead, self._rows), threshold=threshold, normalized=True
+                )
+                labels = np.where(rows >= 0, self._labels[np.maximum(rows, 0)], -1)
+
+            results = []
+            for row_labels, row_sims in zip(labels, similarities):
+                matches = []
+                for label, sim in zip(row_labels, row_sims):
+                    item_id = self._label_to_id.get(int(label))
+                    if item_id is None or not np.isfinite(sim):
+                        continue
+                    if threshold is not None and sim < threshold:
+                        continue
+                    matches.append({
+                        "id": item_id,
+                        "similarity": float(sim),
+                        "metadata": self._items[item_id]["metadata"]
+                    })
+                results.append(matches[:k])
+            return results
+
+    def info(self) -> Dict[str, Any]:
+        """Corpus summary"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "dim": self.dim,
+                "backend": self.backend,
+                "quantization": self.quantization,
+                "rerank_factor": self.rerank_factor if self.quantization != "none" else None,
+                "vector_bytes": int(self._vectors.nbytes) if self._index is None else None,
+                "num_items": len(self._items),
+                "max_items": self.max_items
+            }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class CorpusRegistry:
+    """
+    Directory of named corpora, loaded lazily from disk
+    """
+
+    def __init__(self, base_dir: str = "ai_service/data/corpora"):
+        self.base_dir = base_dir
+        self._corpora: Dict[str, VectorCorpus] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        if not name or not name.replace("-", "").replace("_", "").isalnum():
+            raise ValueError("Corpus names may only contain letters, digits, '-' and '_'")
+        return os.path.join(self.base_dir, name)
+
+    def get(self, name: str) -> Optional[VectorCorpus]:
+        """Return a corpus if it exists (in memory or on disk)"""
+        with self._lock:
+            if name in self._corpora:
+                return self._corpora[name]
+            path = self._path(name)
+            if not os.path.exists(os.path.join(path, "meta.json")):
+                return None
+            corpus = VectorCorpus(name=name, dim=0, path=path)
+            self._corpora[name] = corpus
+            return corpus
+
+    def get_or_create(self, name: str, dim: int, **kwargs) -> VectorCorpus:
+        """Return an existing corpus or register a new empty one"""
+        corpus = self.get(name)
+        if corpus is not None:
+            return corpus
+        with self._lock:
+            if name not in self._corpora:
+                logger.info(f"Registering corpus '{name}' (dim={dim})")
+                self._corpora[name] = VectorCorpus(name=name, dim=dim, path=self._path(name), **kwargs)
+            return self._corpora[name]
+
+    def save_dirty(self) -> int:
+        """Persist every loaded corpus changed since its last save; returns how many were written"""
+        with self._lock:
+            corpora = list(self._corpora.values())
+        saved = 0
+        for corpus in corpora:
+            try:
+                saved += corpus.save_if_dirty()
+            except Exception as e:
+                logger.error(f"Saving corpus '{corpus.name}' failed: {e}")
+        return saved
+
+    def drop(self, name: str) -> bool:
+        """Delete a corpus from memory and disk"""
+        path = self._path(name)
+        with self._lock:
+            self._corpora.pop(name, None)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+                return True
+        return False
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of all known corpora"""
+        names = set(self._corpora)
+        if os.path.isdir(self.base_dir):
+            names.update(
+                d for d in os.listdir(self.base_dir)
+                if os.path.exists(os.path.join(self.base_dir, d, "meta.json"))
+            )
+        corpora = [self.get(name) for name in sorted(names)]
+        return [c.info() for c in corpora if c is not None]
+
+
+# Shared registry so the API and the unified processor see the same corpora
+corpus_registry = CorpusRegistry()
@@ -0,0 +1,103 @@
+"""
+Vector Search Utilities
+Vectorized cosine top-k search over embedding matrices with bounded memory
+"""
+from typing import Optional, Tuple
+import numpy as np
+
+
+def l2_normalize(vectors: np.ndarray, eps: float = 1e-12) -> np.ndarray:
+    """
+    L2-normalize rows so that dot products are cosine similarities
+
+    Args:
+        vectors: (n, d) or (d,) array
+        eps: Floor for zero-norm rows (they stay all-zero)
+
+    Returns:
+        float32 array of the same shape with unit-norm rows
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, eps)
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unsorted per-row top-k of a score matrix via argpartition
+    """
+    if scores.shape[1] <= k:
+        idx = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+        return idx, scores
+    idx = np.argpartition(scores, -k, axis=1)[:, -k:]
+    return idx, np.take_along_axis(scores, idx, axis=1)
+
+
+def blocked_top_k(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    top_k: int = 5,
+    threshold: Optional[float] = None,
+    block_size: int = 16384,
+    query_block_size: int = 1024,
+    normalized: bool = False
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cosine top-k of every query against a corpus using blocked matrix multiplication
+
+    Score blocks are at most query_block_size x block_size floats, so memory stays
+    bounded regardless of corpus size. Each block is reduced to its top-k with
+    argpartition and merged into a running top-k per query.
+
+    Args:
+        queries: (q, d) query embeddings
+        corpus: (n, d) corpus embeddings
+        top_k: Number of neighbours per query
+        threshold: Minimum cosine similarity (matches below are dropped)
+        block_size: Corpus rows per block
+        query_block_size: Query rows per block
+        normalized: Set when both inputs are already L2-normalized
+
+    Returns:
+        (indices, scores), both (q, top_k), sorted by descending score.
+        Missing slots (threshold or small corpus) have index -1 and score -inf.
+    """
+    if not normalized:
+        queries = l2_normalize(queries)
+        corpus = l2_normalize(corpus)
+
+    n_queries, n_corpus = len(queries), len(corpus)
+    k = max(1, min(top_k, n_corpus)) if n_corpus else 1
+    best_idx = np.full((n_queries, k), -1, dtype=np.int64)
+    best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+
+    if n_queries == 0 or n_corpus == 0:
+        return best_idx, best_scores
+
+    for q_start in range(0, n_queries, query_block_size):
+        q_block = queries[q_start:q_start + query_block_size]
+        run_idx = best_idx[q_start:q_start + len(q_block)]
+        run_scores = best_scores[q_start:q_start + len(q_block)]
+
+        for c_start in range(0, n_corpus, block_size):
+            scores = q_block @ corpus[c_start:c_start + block_size].T
+            if threshold is not None:
+                scores[scores < threshold] = -np.inf
+
+            blk_idx, blk_scores = _top_k_rows(scores, k)
+            merged_idx = np.concatenate([run_idx, blk_idx + c_start], axis=1)
+            merged_scores = np.concatenate([run_scores, blk_scores], axis=1)
+
+            keep, run_scores = _top_k_rows(merged_scores, k)
+            run_idx = np.take_along_axis(merged_idx, keep, axis=1)
+
+        # Final ordering within each row
+        order = np.argsort(-run_scores, axis=1, kind="stable")
+        run_scores = np.take_along_axis(run_scores, order, axis=1)
+        run_idx = np.take_along_axis(run_idx, order, axis=1)
+        run_idx[~np.isfinite(run_scores)] = -1
+
+        best_idx[q_start:q_start + len(q_block)] = run_idx
+        best_scores[q_start:q_start + len(q_block)] = run_scores
+
+    return best_idx, best_scores
@@ -0,0 +1,215 @@
+"""
+Verdict Store
+Holds verification verdicts that are upgraded asynchronously (e.g. by background fact checks)
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import datetime
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+from ai_service.utils.job_queue import _worker_alive
+
+PENDING_STATUS = "pending_corroboration"
+
+
+class VerdictStore:
+    """
+    Thread-safe store of verdicts keyed by verdict id.
+    Clients can poll (get), block until the verdict changes (wait) or subscribe a callback.
+
+    With a path, verdicts are also written to a SQLite file shared by every worker
+    process: get() falls back to it for verdicts created elsewhere, and a pending
+    verdict keeps its text and owning process so that another process can resume
+    its corroboration after the owner stopped (see recover_orphans()).
+    """
+
+    def __init__(self, max_entries: int = 5000, path: Optional[str] = None, keep_hours: float = 72.0):
+        """
+        Args:
+            max_entries: Verdicts kept in memory (oldest dropped first)
+            path: SQLite database file (None: memory only)
+            keep_hours: Finished verdicts older than this are purged from the file
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.keep_hours = keep_hours
+        self._verdicts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._subscribers: Dict[str, List[Callable[[str, Dict[str, Any]], None]]] = {}
+        self._cond = threading.Condition()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # "pid:start" tells this process apart from an earlier one that had the same pid
+        self._owner = f"{os.getpid()}:{int(time.time() * 1000)}"
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS verdicts (
+                        id TEXT PRIMARY KEY,
+                        verdict TEXT NOT NULL,
+                        pending INTEGER NOT NULL,
+                        text TEXT,
+                        owner TEXT,
+                        updated_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute("CREATE INDEX IF NOT EXISTS verdicts_pending ON verdicts (pending, updated_at)")
+            except sqlite3.Error as e:
+                logger.warning(f"Verdict store has no disk tier ({path}): {e}")
+                self._conn = None
+
+    def create(self, verdict: Dict[str, Any], text: Optional[str] = None) -> str:
+        """
+        Store a new verdict and return its id. text is kept (on disk) while the
+        verdict is pending, so its corroboration can be resumed by another process.
+        """
+        verdict_id = str(uuid.uuid4())
+        self.update(verdict_id, verdict, text=text)
+        return verdict_id
+
+    def update(self, verdict_id: str, verdict: Dict[str, Any], text: Optional[str] = None) -> None:
+        """Replace the stored verdict and notify waiters and subscribers"""
+        verdict = dict(verdict)
+        verdict["verdict_id"] = verdict_id
+        verdict["updated_at"] = datetime.datetime.now().isoformat()
+        self._persist(verdict_id, verdict, text)
+
+        with self._cond:
+            self._verdicts[verdict_id] = verdict
+            self._verdicts.move_to_end(verdict_id)
+            self._versions[verdict_id] = self._versions.get(verdict_id, 0) + 1
+
+            while len(self._verdicts) > self.max_entries:
+                old_id, _ = self._verdicts.popitem(last=False)
+                self._versions.pop(old_id, None)
+                self._subscribers.pop(old_id, None)
+
+            callbacks = list(self._subscribers.get(verdict_id, []))
+            self._cond.notify_all()
+
+        for callback in callbacks:
+            try:
+                callback(verdict_id, verdict)
+            except Exception as e:
+                logger.warning(f"Verdict subscriber failed for {verdict_id}: {e}")
+
+    def _persist(self, verdict_id: str, verdict: Dict[str, Any], text: Optional[str]) -> None:
+        if self._conn is None:
+            return
+        pending = verdict.get("corroboration_status") == PENDING_STATUS
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT INTO verdicts (id, verdict, pending, text, owner, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET verdict = excluded.verdict, pending = excluded.pending, "
+                    "text = CASE WHEN excluded.pending THEN COALESCE(excluded.text, verdicts.text) END, "
+                    "owner = excluded.owner, updated_at = excluded.updated_at",
+                    (verdict_id, json.dumps(verdict, default=str), int(pending), text if pending else None,
+                     self._owner, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Verdict {verdict_id} not persisted: {e}")
+
+    def get(self, verdict_id: str) -> Optional[Dict[str, Any]]:
+        """Return the current verdict (from another process via the file), or None if unknown"""
+        with self._cond:
+            verdict = self._verdicts.get(verdict_id)
+        if verdict is not None or self._conn is None:
+            return verdict
+        try:
+            with self._db_lock:
+                row = self._conn.execute("SELECT verdict FROM verdicts WHERE id = ?", (verdict_id,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Verdict {verdict_id} read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def wait(
+        self,
+        verdict_id: str,
+        timeout: float = 30.0,
+        pending_status: str = "pending_corroboration"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Block until the verdict leaves the pending state or the timeout expires.
+        Returns the latest verdict (pending or not), or None if unknown.
+        """
+        with self._cond:
+            if verdict_id not in self._verdicts:
+                return None
+            self._cond.wait_for(
+                lambda: self._verdicts.get(verdict_id, {}).get("corroboration_status") != pending_status,
+                timeout=timeout
+            )
+            return self._verdicts.get(verdict_id)
+
+    def subscribe(self, verdict_id: str, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Register a callback invoked with (verdict_id, verdict) on every update"""
+        with self._cond:
+            self._subscribers.setdefault(verdict_id, []).append(callback)
+
+    def unsubscribe(self, verdict_id: str, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Remove a callback registered with subscribe()"""
+        with self._cond:
+            callbacks = self._subscribers.get(verdict_id)
+            if callbacks and callback in callbacks:
+                callbacks.remove(callback)
+                if not callbacks:
+                    del self._subscribers[verdict_id]
+
+    def recover_orphans(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Take over pending verdicts whose owning process is gone (e.g. after a restart)
+
+        Returns:
+            (verdict_id, text, verdict) per verdict whose corroboration this process
+            must now run; each is loaded into memory
+        """
+        if self._conn is None:
+            return []
+        owner = self._owner
+        recovered = []
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT id, verdict, text, owner FROM verdicts WHERE pending = 1 AND text IS NOT NULL"
+            ).fetchall()
+            for verdict_id, payload, text, previous in rows:
+                if previous == owner or _worker_alive(previous):
+                    continue
+                # Only one process wins each orphan
+                claimed = self._conn.execute(
+                    "UPDATE verdicts SET owner = ?, updated_at = ? WHERE id = ? AND owner IS ?",
+                    (owner, time.time(), verdict_id, previous)
+                ).rowcount
+                if claimed:
+                    recovered.append((verdict_id, text, json.loads(payload)))
+        with self._cond:
+            for verdict_id, _, verdict in recovered:
+                self._verdicts[verdict_id] = verdict
+        if recovered:
+            logger.info(f"Recovered {len(recovered)} pending verdicts from stopped processes")
+        return recovered
+
+    def purge(self) -> int:
+        """Delete finished verdicts older than keep_hours from the file"""
+        if self._conn is None:
+            return 0
+        cutoff = time.time() - self.keep_hours * 3600
+        with self._db_lock:
+            return self._conn.execute(
+                "DELETE FROM verdicts WHERE pending = 0 AND updated_at < ?", (cutoff,)
+            ).rowcount
+
+
+# Shared store so every pipeline instance (API, unified processor) publishes to the same place
+verdict_store = VerdictStore(path=os.getenv("AI_VERDICT_DB", "ai_service/data/verdicts.sqlite3"))
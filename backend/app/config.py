@@ -8,6 +8,7 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Disaster Info Platform"
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     AI_SERVICE_URL: str = os.getenv("AI_SERVICE_URL")
+    AI_JOB_POLL_INTERVAL: float = float(os.getenv("AI_JOB_POLL_INTERVAL", "2.0"))  # Seconds between AI job status checks
     
     class Config:
         env_file = ".env"
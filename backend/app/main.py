@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from .database import engine, Base
+from .database import engine, Base, add_missing_columns
 from .models.report import Report 
 from .models.summary import Summary
 from .routes import reports, summaries
@@ -7,6 +7,7 @@ from .config import settings
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+add_missing_columns()
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -27,6 +28,16 @@ app.include_router(verification.router, prefix="/verify", tags=["verification"])
 from .routes import news
 app.include_router(news.router, prefix="/news", tags=["news"])
 
+from .services.report_jobs import report_job_poller
+
+@app.on_event("startup")
+def start_report_job_poller():
+    report_job_poller.start()
+
+@app.on_event("shutdown")
+def stop_report_job_poller():
+    report_job_poller.stop()
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Disaster Information Summarization Platform API"}
@@ -20,3 +20,7 @@ class Report(Base):
     submitted_by = Column(String, nullable=True, default="Anonymous")  # User who submitted
     summary = Column(Text, nullable=True)  # AI-generated summary
     confidence_score = Column(Float, nullable=True)  # AI confidence in classification
+    cluster_id = Column(Integer, nullable=True, index=True)  # Written by the archive clustering job
+    ai_job_id = Column(String, nullable=True, index=True)  # AI service job filling the AI fields
+    ai_job_status = Column(String, nullable=True)  # "queued", "running", "succeeded", "failed"
+    verdict_id = Column(String, nullable=True, index=True)  # Set while the AI verdict awaits web corroboration
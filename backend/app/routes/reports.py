@@ -7,81 +7,37 @@ from ..models.report import Report
 from ..schemas.report import ReportCreate, ReportResponse
 from ..services.verification import VerificationService
 from ..services.ai_pipeline import ai_pipeline
+from ..services.report_jobs import apply_ai_result
 
 router = APIRouter()
 
 @router.post("/", response_model=ReportResponse)
 def create_report(report: ReportCreate, db: Session = Depends(get_db)):
-    # 2. Unified AI Processing
-    # Calls classification, summarization, NER, and verification in one go
-    ai_result = ai_pipeline.process_report(report.text, report.source_identifier)
-    
-    # Defaults
-    category = "Other"
-    location = report.location  # Start with user-provided location
-    verification_status = "Pending"
-    is_verified = False
-    text_to_store = report.text  # Default to original text
-    summary = None
-    confidence_score = None
-
-    if ai_result.get("success") and ai_result.get("data"):
-        data = ai_result["data"]
-        
-        # If URL was extracted, use the extracted text or summary instead of URL
-        if data.get("extraction_method") == "url" and data.get("extracted_text"):
-            # Use summary if available (more concise), otherwise use extracted text
-            text_to_store = data.get("summary") or data.get("extracted_text")
-        
-        # Extract AI-generated summary
-        summary = data.get("summary")
-        
-        # Extract confidence score from classification
-        if data.get("confidence"):
-            confidence_score = data.get("confidence")
-        
-        # 1. Category: Prefer user input, fallback to AI 'primary_category' or 'disaster_type'
-        if report.disaster_category:
-            category = report.disaster_category
-        else:
-            category = data.get("primary_category") or data.get("disaster_type") or "Other"
-
-        # 2. Location: Prefer user input, fallback to AI extracted location
-        # Only use AI location if user didn't provide one
-        if not location and data.get("location_entities") and len(data["location_entities"]) > 0:
-            # Take the first location entity found
-            location = data["location_entities"][0]
-        
-        if data.get("verification", {}).get("status"):
-            verification_status = data["verification"]["status"]
-            is_verified = data["verification"].get("is_reliable", False)
-
-    # Title Logic: Prefer user input, then AI extracted title, then summary fallback
-    title_to_store = report.title
-    if not title_to_store:
-        if data.get("title"):
-             title_to_store = data.get("title")
-        elif summary:
-             # Use first sentence of summary
-             title_to_store = summary.split('.')[0][:80]
-             if len(summary) > 80: title_to_store += "..."
-        else:
-             title_to_store = f"{category} Report"
-
     db_report = Report(
-        title=title_to_store,
-        text=text_to_store,  # Use extracted/summarized text instead of URL
+        title=report.title,
+        text=report.text,
         source_type=report.source_type,
         source_identifier=report.source_identifier,
-        location=location,
-        is_verified=is_verified,
-        verification_status=verification_status,
-        disaster_category=category,
-        submitted_by=report.submitted_by or "Anonymous",
-        summary=summary,
-        confidence_score=confidence_score
+        location=report.location,  # Start with user-provided location
+        is_verified=False,
+        verification_status="Pending",
+        disaster_category=report.disaster_category,
+        submitted_by=report.submitted_by or "Anonymous"
     )
-    
+
+    # Unified AI Processing runs as a background job on the AI service;
+    # the report is stored as Pending and its AI fields are filled in by
+    # the report job poller when the job completes
+    job = ai_pipeline.submit_report_job(report.text, report.source_identifier)
+    if job.get("success"):
+        db_report.ai_job_id = job["job_id"]
+        db_report.ai_job_status = job.get("status", "queued")
+    else:
+        # Job queue unavailable: process synchronously as before
+        ai_result = ai_pipeline.process_report(report.text, report.source_identifier)
+        data = ai_result.get("data") if ai_result.get("success") else None
+        apply_ai_result(db_report, data)
+
     db.add(db_report)
     db.commit()
     db.refresh(db_report)
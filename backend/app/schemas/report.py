@@ -23,6 +23,10 @@ class ReportResponse(ReportBase):
     submitted_by: Optional[str] = None
     summary: Optional[str] = None
     confidence_score: Optional[float] = None
+    cluster_id: Optional[int] = None
+    ai_job_id: Optional[str] = None
+    ai_job_status: Optional[str] = None
+    verdict_id: Optional[str] = None
 
     class Config:
         from_attributes = True
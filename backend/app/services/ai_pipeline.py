@@ -112,6 +112,53 @@ class AIPipeline:
             print(f"Error calling AI service (process_report): {e}")
             return {"success": False, "error": str(e)}
 
+    def submit_report_job(self, text: str, source_url: str = None) -> dict:
+        """
+        Queues a report for unified processing and returns the job ID without waiting.
+        """
+        try:
+            payload = {"text": text, "source_url": source_url}
+            response = requests.post(f"{self.base_url}/api/jobs/process", json=payload, timeout=10)
+            response.raise_for_status()
+            return {"success": True, **response.json()}
+        except Exception as e:
+            print(f"Error calling AI service (submit_report_job): {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_job_result(self, job_id: str) -> dict:
+        """
+        Fetches the result of a queued job. "pending" is set while the job is still
+        queued or running, or when the AI service could not be reached.
+        """
+        try:
+            response = requests.get(f"{self.base_url}/api/jobs/{job_id}/result", timeout=10)
+            if response.status_code == 404:
+                return {"success": False, "pending": False, "error": "Job not found"}
+            response.raise_for_status()
+            result = response.json()
+            result["pending"] = response.status_code == 202
+            return result
+        except Exception as e:
+            print(f"Error calling AI service (get_job_result): {e}")
+            return {"success": False, "pending": True, "error": str(e)}
+
+    def get_verdict(self, verdict_id: str) -> dict:
+        """
+        Fetches a verdict that is being corroborated in the background. "pending" is
+        set while corroboration is still running, or when the AI service could not be reached.
+        """
+        try:
+            response = requests.get(f"{self.base_url}/api/verify/verdicts/{verdict_id}", timeout=10)
+            if response.status_code == 404:
+                return {"success": False, "pending": False, "error": "Verdict not found"}
+            response.raise_for_status()
+            verdict = response.json()
+            verdict["pending"] = verdict.get("corroboration_status") == "pending_corroboration"
+            return verdict
+        except Exception as e:
+            print(f"Error calling AI service (get_verdict): {e}")
+            return {"success": False, "pending": True, "error": str(e)}
+
     def upload_report(self, file_content: bytes, filename: str) -> dict:
         """
         Uploads a PDF report to the AI Service for processing.
@@ -0,0 +1,144 @@
+import threading
+from typing import Optional
+
+from ..config import settings
+from ..database import SessionLocal
+from ..models.report import Report
+from .ai_pipeline import ai_pipeline
+
+PENDING_JOB_STATUSES = ("queued", "running")
+
+
+def apply_ai_result(db_report: Report, data: Optional[dict]) -> Report:
+    """
+    Fills the AI fields of a report from a unified processing result.
+    Fields the user provided (title, category, location) are kept; with no
+    result only the fallbacks are applied.
+    """
+    data = data or {}
+
+    # If URL was extracted, use the extracted text or summary instead of URL
+    if data.get("extraction_method") == "url" and data.get("extracted_text"):
+        # Use summary if available (more concise), otherwise use extracted text
+        db_report.text = data.get("summary") or data.get("extracted_text")
+
+    if data.get("summary"):
+        db_report.summary = data["summary"]
+    if data.get("confidence"):
+        db_report.confidence_score = data["confidence"]
+
+    # Category: Prefer user input, fallback to AI 'primary_category' or 'disaster_type'
+    if not db_report.disaster_category:
+        db_report.disaster_category = data.get("primary_category") or data.get("disaster_type") or "Other"
+
+    # Location: Only use AI location if user didn't provide one
+    if not db_report.location and data.get("location_entities"):
+        db_report.location = data["location_entities"][0]
+
+    if data.get("verification", {}).get("status"):
+        db_report.verification_status = data["verification"]["status"]
+        db_report.is_verified = data["verification"].get("is_reliable", False)
+        # A model-only verdict: the poller replaces it once the web fact check completes
+        if data["verification"].get("corroboration_status") == "pending_corroboration":
+            db_report.verdict_id = data["verification"].get("verdict_id")
+
+    # Title Logic: Prefer user input, then AI extracted title, then summary fallback
+    if not db_report.title:
+        summary = db_report.summary
+        if data.get("title"):
+            db_report.title = data["title"]
+        elif summary:
+            # Use first sentence of summary
+            db_report.title = summary.split('.')[0][:80]
+            if len(summary) > 80: db_report.title += "..."
+        else:
+            db_report.title = f"{db_report.disaster_category} Report"
+
+    return db_report
+
+
+def apply_verdict(db_report: Report, verdict: dict) -> Report:
+    """
+    Replaces the preliminary verification of a report with its corroborated verdict.
+    A failed corroboration keeps the preliminary status.
+    """
+    if verdict.get("corroboration_status") == "corroborated" and verdict.get("status"):
+        db_report.verification_status = verdict["status"]
+        db_report.is_verified = verdict.get("is_reliable", False)
+    db_report.verdict_id = None
+    return db_report
+
+
+class ReportJobPoller:
+    """
+    Background thread that checks the AI jobs of pending reports and writes
+    their results into the database once they finish, then re-polls verdicts
+    still awaiting corroboration until they are upgraded.
+    """
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="report-job-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"Error polling AI jobs: {e}")
+
+    def poll_once(self) -> int:
+        """
+        Checks every pending report and pending verdict once. Returns the number of
+        reports finalized or upgraded.
+        """
+        db = SessionLocal()
+        finalized = 0
+        try:
+            reports = db.query(Report).filter(Report.ai_job_status.in_(PENDING_JOB_STATUSES)).all()
+            for db_report in reports:
+                result = ai_pipeline.get_job_result(db_report.ai_job_id)
+                if result.get("pending"):
+                    continue
+
+                if result.get("success"):
+                    apply_ai_result(db_report, result.get("data"))
+                    db_report.ai_job_status = "succeeded"
+                else:
+                    print(f"AI job {db_report.ai_job_id} for report {db_report.id} failed: {result.get('error')}")
+                    apply_ai_result(db_report, None)
+                    db_report.ai_job_status = "failed"
+                db.commit()
+                finalized += 1
+
+            reports = db.query(Report).filter(Report.verdict_id.isnot(None)).all()
+            for db_report in reports:
+                verdict = ai_pipeline.get_verdict(db_report.verdict_id)
+                if verdict.get("pending"):
+                    continue
+                if verdict.get("error"):
+                    # The AI service restarted or evicted the verdict; keep the preliminary one
+                    print(f"Verdict {db_report.verdict_id} for report {db_report.id} lost: {verdict['error']}")
+                apply_verdict(db_report, verdict)
+                db.commit()
+                finalized += 1
+        finally:
+            db.close()
+        return finalized
+
+
+report_job_poller = ReportJobPoller(interval=settings.AI_JOB_POLL_INTERVAL)
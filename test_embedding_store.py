@@ -0,0 +1,112 @@
+"""
+Embedding Store Tests
+Content-addressed put/get, the bounded memory tier, growth past the initial capacity,
+and read-only instances seeing rows written by another store on the same files.
+Runs as a script (python test_embedding_store.py) or under pytest; needs no running services.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+
+from ai_service.utils.embedding_store import EmbeddingStore
+
+
+def make_store(directory, **options):
+    return EmbeddingStore("all-MiniLM-L6-v2", base_dir=directory, **options)
+
+
+def random_embeddings(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_put_get_and_memory_tier():
+    directory = tempfile.mkdtemp(prefix="embeddings-test-")
+    try:
+        store = make_store(directory, dim=16, dtype="float32", memory_items=2, initial_capacity=4)
+        texts = [f"report {i}" for i in range(10)]
+        embeddings = random_embeddings(10)
+        assert store.get_many(texts[:1]) == [None]
+
+        # Growing past initial_capacity remaps the file; duplicates are stored once
+        store.put_many(texts + texts[:3], np.vstack([embeddings, embeddings[:3]]))
+        assert len(store) == 10
+
+        # Only the last two texts written stay in the memory tier; the rest come from disk
+        assert store.stats()["in_memory"] == 2
+        found = store.get_many(["report 1", "report 2"] + texts[3:])
+        assert all(np.array_equal(f, e) for f, e in zip(found, embeddings[[1, 2] + list(range(3, 10))]))
+        stats = store.stats()
+        assert stats["memory_hits"] == 2 and stats["disk_hits"] == 7 and stats["misses"] == 1
+        assert stats["in_memory"] == 2
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_reopen_and_read_only_share_rows():
+    directory = tempfile.mkdtemp(prefix="embeddings-test-")
+    try:
+        writer = make_store(directory, dim=16)
+        embeddings = random_embeddings(5, seed=1)
+        writer.put_many([f"flood {i}" for i in range(5)], embeddings)
+
+        # Reopened without a dim: shape and dtype come from the store's metadata
+        reader = make_store(directory, read_only=True)
+        assert reader.dim == 16 and reader.dtype == np.float16 and len(reader) == 5
+        vector = reader.get_many(["flood 3"])[0]
+        assert vector.dtype == np.float32
+        assert np.allclose(vector, embeddings[3], atol=1e-2)
+
+        # Rows the writer appends later are picked up on the next miss
+        writer.put_many(["landslide"], random_embeddings(1, seed=2))
+        assert reader.get_many(["landslide"])[0] is not None
+
+        # A read-only store never writes
+        reader.put_many(["only in memory"], random_embeddings(1, seed=3))
+        assert len(make_store(directory)) == 6
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_keys_are_stable_across_processes():
+    directory = tempfile.mkdtemp(prefix="embeddings-test-")
+    try:
+        make_store(directory, dim=16).put_many(["earthquake in Gorkha"], random_embeddings(1, seed=4))
+        # A different hash seed, as in another uvicorn worker or after a restart
+        script = (
+            "import sys; from ai_service.utils.embedding_store import EmbeddingStore; "
+            "store = EmbeddingStore('all-MiniLM-L6-v2', base_dir=sys.argv[1], read_only=True); "
+            "print(store.get_many(['earthquake in Gorkha'])[0] is not None)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script, directory],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": "12345", "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+        ).stdout.strip()
+        assert output.splitlines()[-1] == "True"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING EMBEDDING STORE")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,186 @@
+"""
+Job Queue Tests
+Lease expiry and reclaim, retry backoff up to max_attempts, recovery after a restart,
+and that only the worker holding a job's lease can finish it.
+Runs as a script (python test_job_queue.py) or under pytest; needs no running services.
+"""
+import os
+import time
+import shutil
+import tempfile
+import threading
+
+from ai_service.utils.job_queue import JobQueue, JobWorkerPool
+
+
+def make_queue(**options):
+    directory = tempfile.mkdtemp(prefix="jobs-test-")
+    queue = JobQueue(path=os.path.join(directory, "jobs.sqlite3"), **options)
+    return queue, directory
+
+
+def test_lease_expiry_reclaim():
+    queue, directory = make_queue(lease_seconds=0.2)
+    try:
+        job_id = queue.submit("process_report", {"text": "flood"})
+        first = queue.claim("worker-a")
+        assert first["job_id"] == job_id and first["attempts"] == 1
+
+        # Still leased to worker-a: nobody else can take it
+        assert queue.claim("worker-b") is None
+
+        time.sleep(0.3)
+        second = queue.claim("worker-b")
+        assert second is not None and second["job_id"] == job_id
+        assert second["attempts"] == 2
+        assert second["payload"] == {"text": "flood"}
+
+        # worker-a lost the lease: its late result is dropped
+        assert queue.complete(job_id, {"ok": False}, "worker-a") is False
+        assert queue.fail(job_id, "late error", "worker-a") == "lost"
+        assert queue.get(job_id)["status"] == "running"
+
+        assert queue.complete(job_id, {"ok": True}, "worker-b") is True
+        job = queue.get(job_id)
+        assert job["status"] == "succeeded" and job["result"] == {"ok": True}
+        # A finished job is never reclaimed, even after its old lease would have expired
+        time.sleep(0.3)
+        assert queue.claim("worker-c") is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_retry_backoff_until_max_attempts():
+    queue, directory = make_queue(max_attempts=3, retry_backoff=0.1)
+    try:
+        job_id = queue.submit("process_report", {"text": "landslide"})
+
+        assert queue.claim("worker")["attempts"] == 1
+        assert queue.fail(job_id, "error 1", "worker") == "queued"
+        # Backoff: not ready again until retry_backoff has passed
+        assert queue.claim("worker") is None
+        time.sleep(0.15)
+        assert queue.claim("worker")["attempts"] == 2
+
+        assert queue.fail(job_id, "error 2", "worker") == "queued"
+        # The delay doubles per attempt (0.2 s now)
+        time.sleep(0.15)
+        assert queue.claim("worker") is None
+        time.sleep(0.1)
+        assert queue.claim("worker")["attempts"] == 3
+
+        assert queue.fail(job_id, "error 3", "worker") == "failed"
+        job = queue.get(job_id)
+        assert job["status"] == "failed"
+        assert job["attempts"] == 3 and job["error"] == "error 3"
+        time.sleep(0.5)
+        assert queue.claim("worker") is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_expired_lease_counts_as_attempt():
+    queue, directory = make_queue(max_attempts=2, lease_seconds=0.1)
+    try:
+        poison = queue.submit("process_report", {"text": "crashes the worker"})
+        other = queue.submit("process_report", {"text": "fine"})
+        assert queue.claim("worker-a")["job_id"] == poison
+        time.sleep(0.15)
+        assert queue.claim("worker-b")["job_id"] == poison
+        time.sleep(0.15)
+
+        # Out of attempts: the expired lease fails the job and the next one is claimed
+        assert queue.claim("worker-c")["job_id"] == other
+        job = queue.get(poison)
+        assert job["status"] == "failed" and job["attempts"] == 2
+        assert "lease expired / worker died" in job["error"]
+        assert queue.complete(poison, {"ok": True}, "worker-b") is False
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_recover_requeues_jobs_of_dead_workers():
+    queue, directory = make_queue()
+    try:
+        dead = queue.submit("process_report", {"n": 1})
+        alive = queue.submit("process_report", {"n": 2})
+        own = queue.submit("process_report", {"n": 3})
+        queue.claim("999999999:job-worker-0")        # no such process
+        queue.claim(f"{os.getppid()}:job-worker-0")  # a live process other than ours
+        queue.claim(f"{os.getpid()}:job-worker-0")   # an earlier process that had our pid
+
+        assert queue.recover() == 2
+        assert queue.get(dead)["status"] == "queued"
+        assert queue.get(alive)["status"] == "running"
+        assert queue.get(own)["status"] == "queued"
+
+        # Re-queued jobs are claimable right away, without waiting for their lease
+        reclaimed = {queue.claim("worker")["job_id"], queue.claim("worker")["job_id"]}
+        assert reclaimed == {dead, own}
+        assert queue.stats()["counts"]["running"] == 3
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_recover_fails_jobs_out_of_attempts():
+    queue, directory = make_queue(max_attempts=1)
+    try:
+        job_id = queue.submit("process_report", {"n": 1})
+        queue.claim("999999999:job-worker-0")
+        assert queue.recover() == 0
+        job = queue.get(job_id)
+        assert job["status"] == "failed" and "worker died" in job["error"]
+        assert queue.claim("worker") is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_worker_pool_retries_failed_attempts():
+    queue, directory = make_queue(max_attempts=3, retry_backoff=0.05)
+    calls = []
+    done = threading.Event()
+
+    def handler(payload):
+        calls.append(payload["text"])
+        if len(calls) < 2:
+            raise RuntimeError("model not loaded")
+        done.set()
+        return {"summary": payload["text"].upper()}
+
+    pool = JobWorkerPool(queue, {"process_report": handler}, workers=1, poll_interval=0.05)
+    try:
+        job_id = queue.submit("process_report", {"text": "flood"})
+        pool.start()
+        assert done.wait(5)
+        deadline = time.time() + 5
+        while queue.get(job_id)["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.02)
+
+        job = queue.get(job_id)
+        assert job["status"] == "succeeded" and job["attempts"] == 2
+        assert job["result"] == {"summary": "FLOOD"}
+        assert pool.stats()["failed_attempts"] == 1
+    finally:
+        pool.stop()
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING JOB QUEUE")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,110 @@
+"""
+Model Cache Tests
+LRU order, per-entry TTL, the approximate byte budget, counters and thread safety.
+Runs as a script (python test_model_cache.py) or under pytest; needs no running services.
+"""
+import time
+import threading
+
+import numpy as np
+
+from ai_service.utils import ModelCache, model_caches, approx_size
+
+
+def test_lru_eviction_order():
+    cache = ModelCache(max_size=3, max_bytes=None, register=False)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    # A hit makes "a" the most recently used, so "b" goes first
+    assert cache.get("a") == "A"
+    cache.set("d", "D")
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == ["A", "C", "D"]
+
+    # Overwriting an entry refreshes it without growing the cache
+    cache.set("c", "C2")
+    cache.set("e", "E")
+    assert len(cache) == 3 and cache.get("a") is None and cache.get("c") == "C2"
+
+    stats = cache.stats()
+    assert stats["evictions"] == 2
+    assert stats["hits"] == 5 and stats["misses"] == 2
+    assert stats["hit_rate"] == round(5 / 7, 4)
+
+
+def test_ttl_expiry():
+    cache = ModelCache(max_size=10, ttl=0.2, register=False)
+    cache.set("verdict", {"status": "Likely Real"})
+    cache.set("pinned", "kept", ttl=60)
+    assert cache.get("verdict") == {"status": "Likely Real"}
+
+    time.sleep(0.25)
+    assert cache.get("verdict") is None
+    assert cache.get("pinned") == "kept"
+    stats = cache.stats()
+    assert stats["expirations"] == 1 and stats["entries"] == 1
+
+
+def test_byte_budget():
+    vector = np.zeros(1000, dtype=np.float32)
+    size = approx_size(vector)
+    cache = ModelCache(max_size=100, max_bytes=3 * size, register=False)
+    for i in range(5):
+        cache.set(f"embedding {i}", vector.copy())
+    assert len(cache) == 3 and cache.bytes == 3 * size
+    assert cache.get("embedding 0") is None and cache.get("embedding 4") is not None
+
+    # A value larger than the whole budget is not cached and evicts nothing
+    cache.set("huge", np.zeros(10000, dtype=np.float32))
+    assert cache.get("huge") is None and len(cache) == 3
+
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_registered_for_stats():
+    cache = ModelCache(name="test-registered")
+    assert model_caches["test-registered"] is cache
+    ModelCache(name="test-unregistered", register=False)
+    assert "test-unregistered" not in model_caches
+
+
+def test_concurrent_access_keeps_counters_consistent():
+    cache = ModelCache(max_size=50, max_bytes=None, register=False)
+
+    def worker(offset):
+        for i in range(2000):
+            key = f"k{(i + offset) % 200}"
+            if cache.get(key) is None:
+                cache.set(key, i)
+
+    threads = [threading.Thread(target=worker, args=(n * 7,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert len(cache) <= 50
+    assert stats["hits"] + stats["misses"] == 8 * 2000
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING MODEL CACHE")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,145 @@
+"""
+Result Cache Tests
+Stable keys, sharing through the SQLite tier, warm-up, and purge / trim scoped to a
+cache's own namespace and version.
+Runs as a script (python test_result_cache.py) or under pytest; needs no running services.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+import numpy as np
+
+from ai_service.utils.result_cache import ResultCache
+
+
+def make_cache(directory, namespace="classify", version="model-v1", **options):
+    options.setdefault("warm_items", 0)
+    return ResultCache(namespace, version, path=os.path.join(directory, "results.sqlite3"), **options)
+
+
+def disk_rows(cache):
+    return cache._conn.execute(
+        "SELECT namespace, version, key FROM results ORDER BY namespace, version, key"
+    ).fetchall()
+
+
+def test_keys_are_stable():
+    directory = tempfile.mkdtemp(prefix="results-test-")
+    try:
+        cache = make_cache(directory)
+        key = cache.key("Flood in  Kathmandu\n", 5, 0.3)
+        assert key == cache.key(" Flood in Kathmandu", 5, 0.3)
+        assert key != cache.key("Flood in Kathmandu", 5, 0.4)
+        assert key != make_cache(directory, version="model-v2").key("Flood in Kathmandu", 5, 0.3)
+        assert key != make_cache(directory, namespace="summarize").key("Flood in Kathmandu", 5, 0.3)
+
+        # A different hash seed, as in another uvicorn worker or after a restart
+        script = (
+            "import sys; from ai_service.utils.result_cache import ResultCache; "
+            "cache = ResultCache('classify', 'model-v1', path=sys.argv[1], warm_items=0); "
+            "print(cache.key('Flood in Kathmandu', 5, 0.3))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", script, os.path.join(directory, "other.sqlite3")],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": "12345", "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+        ).stdout.strip()
+        assert output.splitlines()[-1] == key
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_disk_tier_is_shared_and_warms():
+    directory = tempfile.mkdtemp(prefix="results-test-")
+    try:
+        writer = make_cache(directory)
+        key = writer.key("Landslide blocks highway")
+        writer.set(key, {"category": "Disaster", "score": np.float32(0.75), "ranks": np.arange(3)})
+        writer.set(writer.key("local only"), {"category": "Other"}, persist=False)
+
+        # Another worker process: a disk hit, promoted to its memory tier
+        reader = make_cache(directory)
+        assert reader.get(key) == {"category": "Disaster", "score": 0.75, "ranks": [0, 1, 2]}
+        assert reader.get(key) is not None
+        assert reader.stats()["disk"]["hits"] == 1 and reader.memory.stats()["hits"] == 1
+        assert reader.get(writer.key("local only")) is None
+
+        # A new process warms from disk; another model version sees nothing
+        warmed = make_cache(directory, warm_items=10)
+        assert len(warmed.memory) == 1
+        other_version = make_cache(directory, version="model-v2", warm_items=10)
+        assert len(other_version.memory) == 0
+        assert other_version.get(other_version.key("Landslide blocks highway")) is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_ttl_applies_to_both_tiers():
+    directory = tempfile.mkdtemp(prefix="results-test-")
+    try:
+        cache = make_cache(directory, namespace="verify", ttl=0.2)
+        key = cache.key("Bridge collapsed")
+        cache.set(key, {"status": "Unverified"})
+        assert make_cache(directory, namespace="verify").get(key) == {"status": "Unverified"}
+        time.sleep(0.25)
+        assert cache.get(key) is None
+        assert make_cache(directory, namespace="verify").get(key) is None
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_purge_is_scoped_to_namespace_and_version():
+    directory = tempfile.mkdtemp(prefix="results-test-")
+    try:
+        current = make_cache(directory, version="v2", max_rows=2, max_age_days=1)
+        previous = make_cache(directory, version="v1")
+        summaries = make_cache(directory, namespace="summarize", version="v2")
+
+        for i in range(4):
+            current.set(f"current-{i}", i)
+            previous.set(f"previous-{i}", i)
+            summaries.set(f"summary-{i}", i)
+        # One old row per cache, as if written long ago
+        current._conn.execute(
+            "UPDATE results SET created_at = ? WHERE key IN ('current-0', 'previous-0', 'summary-0')",
+            (time.time() - 2 * 86400,)
+        )
+
+        # current: drops old rows of its namespace (any version) and trims only its own version
+        assert current.purge() == 2 + 1
+        rows = disk_rows(current)
+        assert [k for ns, v, k in rows if ns == "classify" and v == "v2"] == ["current-2", "current-3"]
+        assert [k for ns, v, k in rows if ns == "classify" and v == "v1"] == ["previous-1", "previous-2", "previous-3"]
+        # Other namespaces are never touched
+        assert [k for ns, v, k in rows if ns == "summarize"] == [f"summary-{i}" for i in range(4)]
+
+        # clear() drops only this version
+        previous.clear()
+        assert {(ns, v) for ns, v, k in disk_rows(current)} == {("classify", "v2"), ("summarize", "v2")}
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING RESULT CACHE")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,165 @@
+"""
+Single-Flight Tests
+Coalescing of concurrent identical computations, replay within the idempotency window,
+and the stable content digest the request keys are built from.
+Runs as a script (python test_single_flight.py) or under pytest; needs no running services.
+"""
+import os
+import sys
+import time
+import threading
+import subprocess
+
+from ai_service.utils import stable_digest
+from ai_service.utils.single_flight import SingleFlight
+
+
+def run_concurrently(fn, callers):
+    """Call fn from `callers` threads released at the same moment; returns their results"""
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+    errors = [None] * callers
+
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return results, errors
+
+
+def test_concurrent_calls_coalesce():
+    flights = SingleFlight(window=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"summary": "flood in Kathmandu", "locations": ["Kathmandu"]}
+
+    results, errors = run_concurrently(lambda: flights.do("report:1", compute), 8)
+    assert errors == [None] * 8
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+
+    # Every caller gets its own copy
+    results[0]["locations"].append("Lalitpur")
+    assert results[1]["locations"] == ["Kathmandu"]
+
+    stats = flights.stats()
+    assert stats["computed"] == 1 and stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_failure_reaches_waiters_and_is_not_stored():
+    flights = SingleFlight(window=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("model crashed")
+
+    results, errors = run_concurrently(lambda: flights.do("report:2", compute), 4)
+    assert len(calls) == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert flights.stats()["stored"] == 0
+
+    # The next caller computes again
+    assert flights.do("report:2", lambda: "recovered") == "recovered"
+
+
+def test_replay_within_window():
+    flights = SingleFlight(window=0.3)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"count": len(calls)}
+
+    assert flights.do("report:3", compute) == {"count": 1}
+    replay = flights.do("report:3", compute)
+    assert replay == {"count": 1} and len(calls) == 1
+    assert flights.stats()["replayed"] == 1
+
+    # A replayed copy is independent of the stored result
+    replay["count"] = 99
+    assert flights.lookup("report:3") == {"count": 1}
+
+    time.sleep(0.35)
+    assert flights.lookup("report:3") is None
+    assert flights.do("report:3", compute) == {"count": 2}
+
+
+def test_store_predicate_and_purge():
+    flights = SingleFlight(window=0.2, max_entries=2)
+
+    # Results the predicate rejects (e.g. degraded ones) are never replayed
+    flights.do("degraded", lambda: {"degraded_fields": ["summary"]}, store=lambda result: False)
+    assert flights.lookup("degraded") is None
+
+    for key in ("a", "b", "c"):
+        flights.do(key, lambda: key)
+    # Oldest stored result dropped beyond max_entries
+    assert flights.lookup("a") is None and flights.lookup("c") == "c"
+
+    time.sleep(0.25)
+    assert flights.purge() == 2
+    assert flights.stats()["stored"] == 0
+
+
+def test_join_does_not_lead():
+    flights = SingleFlight(window=60)
+    assert flights.join("report:4") is None
+
+    future, leader = flights.begin("report:4")
+    assert leader
+    joined = flights.join("report:4")
+    assert joined is future
+    flights.finish("report:4", {"status": "Verified"})
+    assert SingleFlight.result(joined, timeout=1) == {"status": "Verified"}
+
+
+def test_request_keys_are_stable_across_processes():
+    parts = ("Flood in Kathmandu", "https://example.com/flood", None)
+    key = stable_digest(*parts)
+    # A different hash seed, as in another uvicorn worker or after a restart
+    other = subprocess.run(
+        [sys.executable, "-c", "from ai_service.utils import stable_digest; "
+         "print(stable_digest('Flood in Kathmandu', 'https://example.com/flood', None))"],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONHASHSEED": "12345", "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+    ).stdout.strip()
+    assert other == key
+
+    # None, "" and shifted boundaries between parts give different keys
+    assert stable_digest("a", None) != stable_digest("a", "")
+    assert stable_digest("ab", "c") != stable_digest("a", "bc")
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING SINGLE-FLIGHT")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,206 @@
+"""
+Vector Index Tests
+Persistent similarity corpora: insert/replace, eviction beyond max_items, removal,
+save and reload, the registry, and the quantized first pass with exact re-ranking
+from the memory-mapped full-precision vectors.
+Runs as a script (python test_vector_index.py) or under pytest; needs no running services.
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from ai_service.utils.vector_index import VectorCorpus, CorpusRegistry
+
+
+def make_corpus(directory, name="reports", dim=64, **options):
+    return VectorCorpus(name=name, dim=dim, path=os.path.join(directory, name), **options)
+
+
+def clustered_vectors(n, dim=64, seed=0):
+    """Unit vectors around n // 10 topic centres, like embeddings of related reports"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, n // 10), dim))
+    vectors = centres[rng.integers(0, len(centres), n)] + 0.4 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def exact_similarity(query, vectors, index):
+    query = query / np.linalg.norm(query)
+    return float(vectors[index] @ query)
+
+
+def test_add_replace_and_evict():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        vectors = clustered_vectors(30, seed=4)
+        corpus = make_corpus(directory, max_items=20)
+        assert corpus.query(vectors[0])[0] == []
+
+        assert corpus.add([f"r{i}" for i in range(30)], vectors, [{"n": i} for i in range(30)], persist=False) == 30
+        # Only the 20 most recently added items are kept
+        assert len(corpus) == 20
+        top = corpus.query(vectors[25], top_k=1)[0][0]
+        assert top["id"] == "r25" and top["metadata"] == {"n": 25}
+        assert abs(top["similarity"] - 1.0) < 1e-5
+        assert all(m["id"] != "r0" for m in corpus.query(vectors[0], top_k=20)[0])
+
+        # Re-adding an id replaces its vector and metadata
+        corpus.add(["r25"], vectors[29:30], [{"n": "moved"}], persist=False)
+        assert len(corpus) == 20
+        matches = corpus.query(vectors[29], top_k=2)[0]
+        assert {m["id"] for m in matches} == {"r25", "r29"}
+        assert corpus.query(vectors[25], top_k=1, threshold=0.999)[0] == []
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_remove_persist_and_reload():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        vectors = clustered_vectors(50, seed=5)
+        ids = [f"r{i}" for i in range(50)]
+        corpus = make_corpus(directory, max_items=100)
+        corpus.add(ids, vectors, [{"text": f"report {i}"} for i in range(50)], persist=False)
+        assert corpus.save_if_dirty() is True
+        assert corpus.save_if_dirty() is False
+
+        assert corpus.remove(["r3", "r7", "missing"]) == 2
+        assert corpus.remove(["r3"]) == 0
+        assert all(m["id"] not in ("r3", "r7") for m in corpus.query(vectors[3], top_k=50)[0])
+
+        reloaded = make_corpus(directory, dim=0)
+        assert reloaded.dim == 64 and reloaded.max_items == 100 and len(reloaded) == 48
+        top = reloaded.query(vectors[10], top_k=1)[0][0]
+        assert top["id"] == "r10" and top["metadata"] == {"text": "report 10"}
+        assert reloaded.query(vectors[3], top_k=1, threshold=0.999)[0] == []
+
+        # Labels continue after a reload, so new items never collide with old ones
+        reloaded.add(["fresh"], vectors[3:4])
+        assert reloaded.query(vectors[3], top_k=1)[0][0]["id"] == "fresh"
+        assert reloaded.query(vectors[10], top_k=1)[0][0]["id"] == "r10"
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_registry_lists_and_drops_corpora():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        registry = CorpusRegistry(base_dir=directory)
+        corpus = registry.get_or_create("recent_reports", dim=64)
+        assert registry.get_or_create("recent_reports", dim=64) is corpus
+        corpus.add(["a"], clustered_vectors(1, seed=6), persist=False)
+        assert registry.save_dirty() == 1 and registry.save_dirty() == 0
+
+        # A fresh registry (another process, or after a restart) finds it on disk
+        other = CorpusRegistry(base_dir=directory)
+        assert [c["name"] for c in other.list()] == ["recent_reports"]
+        assert len(other.get("recent_reports")) == 1
+        assert other.get("unknown") is None
+
+        try:
+            registry.get_or_create("../escape", dim=64)
+            assert False, "invalid name accepted"
+        except ValueError:
+            pass
+
+        assert other.drop("recent_reports") is True
+        assert other.get("recent_reports") is None
+        assert other.drop("recent_reports") is False
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_quantized_query_reranks_exactly():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        vectors = clustered_vectors(2000)
+        ids = [f"r{i}" for i in range(len(vectors))]
+        rng = np.random.default_rng(1)
+        targets = rng.choice(len(vectors), 10, replace=False)
+        queries = vectors[targets] + 0.05 * rng.normal(size=(10, 64)).astype(np.float32)
+
+        for mode in ("int8", "binary"):
+            corpus = make_corpus(directory, name=mode, quantization=mode, rerank_factor=8)
+            corpus.add(ids, vectors, persist=False)
+            info = corpus.info()
+            assert info["quantization"] == mode and info["rerank_factor"] == 8
+            # Only codes are held in RAM: 1 byte (int8) or 1 bit (binary) per dimension
+            assert info["vector_bytes"] == len(vectors) * (64 if mode == "int8" else 8)
+
+            results = corpus.query(queries, top_k=3, threshold=0.9)
+            for target, query, matches in zip(targets, queries, results):
+                assert matches and matches[0]["id"] == f"r{target}", mode
+                for match in matches:
+                    # Similarities are exact cosines, and the threshold applies to them
+                    exact = exact_similarity(query, vectors, int(match["id"][1:]))
+                    assert abs(match["similarity"] - exact) < 1e-5, mode
+                    assert match["similarity"] >= 0.9
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_quantized_corpus_survives_remove_and_reload():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        vectors = clustered_vectors(400, seed=2)
+        ids = [f"r{i}" for i in range(len(vectors))]
+        corpus = make_corpus(directory, quantization="int8")
+        corpus.add(ids, vectors)
+
+        # Tombstoned rows (below the compaction ratio) and compacted rows both stay aligned
+        corpus.remove(ids[:50])
+        assert corpus.query(vectors[10], top_k=1)[0][0]["id"] != "r10"
+        corpus.remove(ids[50:150])
+        assert corpus.query(vectors[200], top_k=1)[0][0]["id"] == "r200"
+        corpus.add(["new"], vectors[:1], persist=False)
+        corpus.save()
+
+        reloaded = make_corpus(directory, dim=0)
+        assert len(reloaded) == 251
+        assert reloaded.quantization == "int8" and reloaded.rerank_factor == 4
+        top = reloaded.query(vectors[0], top_k=1)[0][0]
+        assert top["id"] == "new" and abs(top["similarity"] - 1.0) < 1e-5
+        top = reloaded.query(vectors[300], top_k=1)[0][0]
+        assert top["id"] == "r300" and abs(top["similarity"] - 1.0) < 1e-5
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def test_int8_corpus_saved_without_full_precision_still_loads():
+    directory = tempfile.mkdtemp(prefix="corpus-test-")
+    try:
+        vectors = clustered_vectors(100, seed=3)
+        corpus = make_corpus(directory, quantization="int8")
+        corpus.add([f"r{i}" for i in range(len(vectors))], vectors)
+        # As written before full-precision vectors were kept next to the codes
+        os.remove(os.path.join(directory, "reports", "full.npy"))
+        os.remove(os.path.join(directory, "reports", "full.f32"))
+
+        reloaded = make_corpus(directory, dim=0)
+        top = reloaded.query(vectors[42], top_k=1)[0][0]
+        assert top["id"] == "r42" and abs(top["similarity"] - 1.0) < 0.02
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING VECTOR INDEX")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)
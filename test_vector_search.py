@@ -0,0 +1,104 @@
+"""
+Vector Search Tests
+Blocked top-k cosine search against a brute-force reference: block boundaries,
+thresholds, small corpora and unnormalized input.
+Runs as a script (python test_vector_search.py) or under pytest; needs no running services.
+"""
+import numpy as np
+
+from ai_service.utils.vector_search import blocked_top_k
+
+
+def brute_force(queries, corpus, top_k, threshold=None):
+    """Full score matrix and a complete sort per query"""
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    c = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    scores = q @ c.T
+    indices, best = [], []
+    for row in scores:
+        order = np.argsort(-row, kind="stable")[:top_k]
+        if threshold is not None:
+            order = order[row[order] >= threshold]
+        indices.append(order)
+        best.append(row[order])
+    return indices, best
+
+
+def assert_matches(indices, scores, expected_indices, expected_scores):
+    for i, (exp_idx, exp_scores) in enumerate(zip(expected_indices, expected_scores)):
+        found = indices[i] >= 0
+        assert list(indices[i][found]) == list(exp_idx), (i, indices[i][found], exp_idx)
+        assert np.allclose(scores[i][found], exp_scores, atol=1e-5)
+        assert np.all(np.isneginf(scores[i][~found]))
+
+
+def test_matches_brute_force_across_blocks():
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(37, 24)).astype(np.float32)
+    corpus = rng.normal(size=(1000, 24)).astype(np.float32)
+
+    # Block sizes that do not divide the inputs, so partial blocks are merged too
+    indices, scores = blocked_top_k(queries, corpus, top_k=7, block_size=97, query_block_size=10)
+    assert indices.shape == (37, 7) and scores.shape == (37, 7)
+    assert_matches(indices, scores, *brute_force(queries, corpus, 7))
+
+
+def test_threshold_drops_weak_matches():
+    rng = np.random.default_rng(1)
+    corpus = rng.normal(size=(500, 16)).astype(np.float32)
+    # Queries near known rows, plus one unrelated query
+    queries = np.vstack([corpus[[3, 250]] + 0.05 * rng.normal(size=(2, 16)), rng.normal(size=(1, 16))])
+    queries = queries.astype(np.float32)
+
+    indices, scores = blocked_top_k(queries, corpus, top_k=5, threshold=0.6, block_size=64)
+    assert_matches(indices, scores, *brute_force(queries, corpus, 5, threshold=0.6))
+    assert indices[0][0] == 3 and indices[1][0] == 250
+    assert np.all(scores[indices >= 0] >= 0.6)
+
+
+def test_small_and_empty_corpus():
+    rng = np.random.default_rng(2)
+    queries = rng.normal(size=(4, 8)).astype(np.float32)
+    corpus = rng.normal(size=(3, 8)).astype(np.float32)
+
+    # top_k larger than the corpus returns every row
+    indices, scores = blocked_top_k(queries, corpus, top_k=10, block_size=2)
+    assert indices.shape == (4, 3)
+    assert_matches(indices, scores, *brute_force(queries, corpus, 3))
+
+    indices, scores = blocked_top_k(queries, np.zeros((0, 8), dtype=np.float32), top_k=5)
+    assert np.all(indices == -1) and np.all(np.isneginf(scores))
+
+
+def test_normalized_flag_skips_normalization():
+    rng = np.random.default_rng(3)
+    queries = rng.normal(size=(5, 12)).astype(np.float32)
+    corpus = rng.normal(size=(200, 12)).astype(np.float32)
+    q = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    c = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+    raw = blocked_top_k(queries * 3.0, corpus * 0.5, top_k=4)
+    pre = blocked_top_k(q, c, top_k=4, normalized=True)
+    assert np.array_equal(raw[0], pre[0])
+    assert np.allclose(raw[1], pre[1], atol=1e-5)
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("TESTING VECTOR SEARCH")
+    print("=" * 70)
+    failures = 0
+    for name, test in list(globals().items()):
+        if not name.startswith("test_"):
+            continue
+        try:
+            test()
+            print(f"✅ {name}")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {name}: assertion failed {e}")
+        except Exception as e:
+            failures += 1
+            print(f"❌ {name}: {type(e).__name__}: {e}")
+    print("=" * 70)
+    raise SystemExit(1 if failures else 0)